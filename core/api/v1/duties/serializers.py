@@ -1,6 +1,8 @@
 from rest_framework.serializers import (
     Serializer,
     CharField,
+    ChoiceField,
+    ListField,
     SerializerMethodField,
     DateField,
     BooleanField,
@@ -8,6 +10,9 @@ from rest_framework.serializers import (
     DateTimeField,
 )
 
+from core.apps.duties.models import SwapPeopleRequest
+from core.apps.duties.services import SwapInboxService
+
 
 class ResidentSerializer(Serializer):
     pk = IntegerField()
@@ -34,6 +39,7 @@ class SwapDutiesRequestSerializer(Serializer):
     first_duty = KitchenDutySerializer(many=False)
     second_duty = KitchenDutySerializer(many=False)
 
+    status = IntegerField()
     accepted = BooleanField()
     canceled = BooleanField()
     declined = BooleanField()
@@ -52,12 +58,45 @@ class SwapPeopleRequestSerializer(Serializer):
     to_swap = ResidentSerializer()
     duty = KitchenDutySerializer(many=False)
 
+    status = IntegerField()
     accepted = BooleanField()
     canceled = BooleanField()
     declined = BooleanField()
     created_at = DateTimeField()
 
 
+class SwapInboxSerializer(Serializer):
+    """Входящая заявка: на замену или на обмен, в зависимости от поля type"""
+
+    def to_representation(self, instance):
+        if isinstance(instance, SwapPeopleRequest):
+            data = SwapPeopleRequestSerializer(instance).data
+            data["type"] = SwapInboxService.SWAP_PEOPLE
+        else:
+            data = SwapDutiesRequestSerializer(instance).data
+            data["type"] = SwapInboxService.SWAP_DUTIES
+        return data
+
+
 class CreateSwapPeopleRequestSerializer(Serializer):
     to_swap_duty_pk = IntegerField()
     to_swap_user_pk = IntegerField()
+
+
+class SwapRequestsBatchSerializer(Serializer):
+    ids = ListField(child=IntegerField(), min_length=1, max_length=200)
+    operation = ChoiceField(choices=("accept", "decline", "cancel"))
+
+
+class SwapRequestsBatchResultSerializer(Serializer):
+    pk = IntegerField()
+    success = BooleanField()
+    status = IntegerField(allow_null=True)
+    detail = CharField(allow_null=True)
+
+
+class DutyStatsSerializer(Serializer):
+    resident = ResidentSerializer(source="user")
+    academic_year = IntegerField()
+    duties_count = IntegerField()
+    finished_duties_count = IntegerField()
@@ -1,9 +1,12 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
 from core.api.v1.duties.views import (
     DutyRecordsViewSet,
+    DutyStatsViewSet,
     SwapDutiesViewSet,
     SwapPeopleViewSet,
+    SwapEventsView,
     SwapRequestsViewSet,
 )
 
@@ -13,5 +16,8 @@ router.register("records", DutyRecordsViewSet, basename="duty-records")
 router.register("swap-duties", SwapDutiesViewSet, basename="duty-swaps")
 router.register("swap-people", SwapPeopleViewSet, basename="people-swaps")
 router.register("swap-requests", SwapRequestsViewSet, basename="requests-swaps")
+router.register("stats", DutyStatsViewSet, basename="duty-stats")
 
-urlpatterns = [] + router.urls
+urlpatterns = [
+    path("events/", SwapEventsView.as_view(), name="swap-events"),
+] + router.urls
@@ -3,24 +3,45 @@ from rest_framework.mixins import ListModelMixin, CreateModelMixin
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.status import HTTP_201_CREATED, HTTP_200_OK
 
+import json
 from datetime import datetime, timedelta
-from django.db.models import Q
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Prefetch, Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
 from drf_spectacular.utils import extend_schema
 
 from core.api.v1.duties.serializers import (
     CreateSwapDutiesRequestSerializer,
     CreateSwapPeopleRequestSerializer,
+    DutyStatsSerializer,
     KitchenDutySerializer,
     SwapDutiesRequestSerializer,
+    SwapInboxSerializer,
     SwapPeopleRequestSerializer,
+    SwapRequestsBatchResultSerializer,
+    SwapRequestsBatchSerializer,
 )
+from core.api.v1.pagination import (
+    DutyRecordsPagination,
+    SwapInboxPagination,
+    SwapRequestsPagination,
+)
+from core.apps.common.events import get_event_broker, user_channel
+from core.apps.duties.choices import SWAP_REQUEST_PENDING
 from core.apps.duties.models import KitchenDuty, SwapDutiesRequest, SwapPeopleRequest
-from core.apps.duties.services import SwapDutiesService, SwapPeopleService
-from core.apps.duties.services.kitchen_duty import KitchenDutyService
-from core.apps.users.services import UserService
+from core.apps.duties.services import (
+    SWAP_REQUEST_STATUS_FILTERS,
+    DutyStatsService,
+    SwapDutiesService,
+    SwapInboxService,
+    SwapPeopleService,
+)
+from core.apps.users.models import CustomUser
 
 
 class DutyRecordsViewSet(ListModelMixin, GenericViewSet):
@@ -28,12 +49,26 @@ class DutyRecordsViewSet(ListModelMixin, GenericViewSet):
     serializer_class = KitchenDutySerializer
     authentication_classes = (SessionAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = DutyRecordsPagination
+
+    people_prefetch = Prefetch(
+        "people",
+        queryset=CustomUser.objects.select_related("room").only(
+            "pk", "surname", "name", "second_name", "room__number"
+        ),
+    )
+    prefetch_plans = {
+        "list": (people_prefetch,),
+        "my_duties": (people_prefetch,),
+        "nearest_duty": (people_prefetch,),
+        "duties_to_swap": (people_prefetch,),
+    }
 
     def get_queryset(self):
         today = datetime.today()
         queryset = self.queryset.filter(
             Q(date__gte=today), Q(date__lte=today + timedelta(days=28))
-        )
+        ).prefetch_related(*self.prefetch_plans.get(self.action, ()))
         if self.action == "my_duties":
             queryset = queryset.filter(people=self.request.user)
         if self.action == "nearest_duty":
@@ -70,39 +105,71 @@ class DutyRecordsViewSet(ListModelMixin, GenericViewSet):
     @action(methods=("GET",), detail=False, url_path="nearest")
     def nearest_duty(self, request, *args, **kwargs):
         """Получить ближайшее дежурство текущего пользователя."""
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return Response(serializer.data)
+
+
+class DutyStatsViewSet(ListModelMixin, GenericViewSet):
+    serializer_class = DutyStatsSerializer
+    authentication_classes = (SessionAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        year = self.request.query_params.get("year")
+        if year is not None and not year.isdigit():
+            raise ValidationError({"year": "Год должен быть числом"})
+        queryset = (
+            DutyStatsService.get_for_year(int(year) if year else None)
+            .select_related("user__room")
+            .order_by("-duties_count", "user__room__number")
+        )
+        if self.action == "my_stats":
+            queryset = queryset.filter(user=self.request.user)
+        return queryset
+
+    @extend_schema(tags=["DutyStats"])
+    def list(self, request, *args, **kwargs):
+        """
+        Получить статистику дежурств проживающих за учебный год.
+
+        Год начала учебного года передается параметром year, по умолчанию текущий.
+        """
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(tags=["DutyStats"])
+    @action(methods=("GET",), detail=False, url_path="my")
+    def my_stats(self, request, *args, **kwargs):
+        """Получить статистику дежурств текущего пользователя за учебный год."""
         return super().list(request, *args, **kwargs)
 
 
 class SwapRequestsViewSet(ListModelMixin, GenericViewSet):
-    queryset = SwapDutiesRequest.objects.order_by("-created_at")
+    serializer_class = SwapInboxSerializer
     authentication_classes = (SessionAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = SwapInboxPagination
 
-    def get_serializer(self, serializer_class, *args, **kwargs):
-        return serializer_class(*args, **kwargs)
+    def get_queryset(self):
+        status = self.request.query_params.get("status")
+        if status is not None and status not in SWAP_REQUEST_STATUS_FILTERS:
+            raise ValidationError(
+                {
+                    "status": "Статус должен быть одним из: "
+                    + ", ".join(SWAP_REQUEST_STATUS_FILTERS)
+                }
+            )
+        return SwapInboxService.get_branches(self.request.user, status)
 
     @extend_schema(tags=["SwapRequests"])
     def list(self, request, *args, **kwargs):
-        """Получить список всех запросов на обмен и на замену."""
-        swap_people_queryset = SwapPeopleRequest.objects.filter(
-            to_swap=request.user
-        ).order_by("-created_at")
-        swap_duties_queryset = SwapDutiesRequest.objects.filter(
-            second_user=request.user
-        ).order_by("-created_at")
-
-        swap_people_serializer = self.get_serializer(
-            SwapPeopleRequestSerializer, swap_people_queryset, many=True
-        )
-        swap_duties_serializer = self.get_serializer(
-            SwapDutiesRequestSerializer, swap_duties_queryset, many=True
-        )
+        """
+        Получить входящие запросы на обмен и на замену, сначала новые.
 
-        data = sorted(
-            swap_duties_serializer.data + swap_people_serializer.data,
-            key=lambda x: x["created_at"],
-        )
-        return Response(data)
+        Статус фильтруется параметром status: pending, accepted, declined, canceled.
+        """
+        rows = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(SwapInboxService.get_requests(rows), many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 class SwapDutiesViewSet(CreateModelMixin, ListModelMixin, GenericViewSet):
@@ -110,6 +177,7 @@ class SwapDutiesViewSet(CreateModelMixin, ListModelMixin, GenericViewSet):
     serializer_class = SwapDutiesRequestSerializer
     authentication_classes = (SessionAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = SwapRequestsPagination
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -120,7 +188,9 @@ class SwapDutiesViewSet(CreateModelMixin, ListModelMixin, GenericViewSet):
         if self.action == "list":
             return self.queryset.filter(first_user=self.request.user)
         if self.action == "get_incoming_requests":
-            return self.queryset.filter(second_user=self.request.user)
+            return self.queryset.filter(
+                second_user=self.request.user, status=SWAP_REQUEST_PENDING
+            )
         return self.queryset
 
     @extend_schema(tags=["SwapDuties"])
@@ -135,15 +205,11 @@ class SwapDutiesViewSet(CreateModelMixin, ListModelMixin, GenericViewSet):
         initiator = request.user
         data = self.get_serializer(request.data).data
 
-        initiator_duty = KitchenDutyService.get_by_id(id=data.get("initiator_duty_pk"))
-        to_swap_duty = KitchenDutyService.get_by_id(id=data.get("to_swap_duty_pk"))
-        to_swap_user = UserService.get_by_id(id=data.get("to_swap_resident_pk"))
-
         swap_request = SwapDutiesService.create(
-            initiator_duty=initiator_duty,
+            initiator_duty=data.get("initiator_duty_pk"),
             initiator=initiator,
-            target_duty=to_swap_duty,
-            target=to_swap_user,
+            target_duty=data.get("to_swap_duty_pk"),
+            target=data.get("to_swap_resident_pk"),
         )
 
         serializer = SwapDutiesRequestSerializer(swap_request)
@@ -157,9 +223,34 @@ class SwapDutiesViewSet(CreateModelMixin, ListModelMixin, GenericViewSet):
     @extend_schema(tags=["SwapDuties"])
     @action(methods=("GET",), detail=False, url_path="incoming")
     def get_incoming_requests(self, request, *args, **kwargs):
-        """Получить входящие запросы на обмен дежурствами для текущего пользователя."""
+        """Получить ожидающие ответа входящие запросы на обмен дежурствами для текущего пользователя."""
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        tags=["SwapDuties"],
+        request=SwapRequestsBatchSerializer,
+        responses=SwapRequestsBatchResultSerializer(many=True),
+    )
+    @action(methods=("POST",), detail=False, url_path="batch")
+    def batch(self, request, *args, **kwargs):
+        """
+        Принять, отклонить или отменить несколько заявок одним запросом.
+
+        Принимает список ids и operation (accept, decline, cancel), возвращает
+        результат по каждой заявке: success, status и detail с причиной ошибки.
+        """
+        serializer = SwapRequestsBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = SwapDutiesService.batch(
+            request.user,
+            ids=serializer.validated_data["ids"],
+            operation=serializer.validated_data["operation"],
+        )
+
+        serializer = SwapRequestsBatchResultSerializer(results, many=True)
+        return Response(serializer.data, status=HTTP_200_OK)
+
     @extend_schema(tags=["SwapDuties"])
     @action(methods=("POST",), detail=True, url_path="accept")
     def accept_swap_duties_request(self, request, pk, *args, **kwargs):
@@ -217,6 +308,7 @@ class SwapPeopleViewSet(CreateModelMixin, ListModelMixin, GenericViewSet):
     serializer_class = SwapPeopleRequestSerializer
     authentication_classes = (SessionAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = SwapRequestsPagination
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -230,7 +322,9 @@ class SwapPeopleViewSet(CreateModelMixin, ListModelMixin, GenericViewSet):
         if self.action == "list":
             return self.queryset.filter(current_user=self.request.user)
         if self.action == "get_incoming_requests":
-            return self.queryset.filter(to_swap=self.request.user)
+            return self.queryset.filter(
+                to_swap=self.request.user, status=SWAP_REQUEST_PENDING
+            )
         return self.queryset
 
     @extend_schema(tags=["SwapPeople"])
@@ -246,13 +340,10 @@ class SwapPeopleViewSet(CreateModelMixin, ListModelMixin, GenericViewSet):
         initiator = request.user
         data = self.get_serializer(request.data).data
 
-        to_swap_user = UserService.get_by_id(id=data.get("to_swap_user_pk"))
-        to_swap_duty = KitchenDutyService.get_by_id(id=data.get("to_swap_duty_pk"))
-
-        swap_people_service = SwapPeopleService(initiator)
-
-        swap_request = swap_people_service.create(
-            initiator=initiator, target=to_swap_user, initiator_duty=to_swap_duty
+        swap_request = SwapPeopleService.create(
+            initiator=initiator,
+            target=data.get("to_swap_user_pk"),
+            initiator_duty=data.get("to_swap_duty_pk"),
         )
 
         serializer = self.serializer_class(swap_request)
@@ -266,9 +357,34 @@ class SwapPeopleViewSet(CreateModelMixin, ListModelMixin, GenericViewSet):
     @extend_schema(tags=["SwapPeople"])
     @action(methods=("GET",), detail=False, url_path="incoming")
     def get_incoming_requests(self, request, *args, **kwargs):
-        """Получить список входящих запросов на замену для текущего пользователя."""
+        """Получить список ожидающих ответа входящих запросов на замену для текущего пользователя."""
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        tags=["SwapPeople"],
+        request=SwapRequestsBatchSerializer,
+        responses=SwapRequestsBatchResultSerializer(many=True),
+    )
+    @action(methods=("POST",), detail=False, url_path="batch")
+    def batch(self, request, *args, **kwargs):
+        """
+        Принять, отклонить или отменить несколько заявок одним запросом.
+
+        Принимает список ids и operation (accept, decline, cancel), возвращает
+        результат по каждой заявке: success, status и detail с причиной ошибки.
+        """
+        serializer = SwapRequestsBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = SwapPeopleService.batch(
+            request.user,
+            ids=serializer.validated_data["ids"],
+            operation=serializer.validated_data["operation"],
+        )
+
+        serializer = SwapRequestsBatchResultSerializer(results, many=True)
+        return Response(serializer.data, status=HTTP_200_OK)
+
     @extend_schema(tags=["SwapPeople"])
     @action(methods=("POST",), detail=True, url_path="accept")
     def accept_swap_people_request(self, request, pk, *args, **kwargs):
@@ -319,3 +435,48 @@ class SwapPeopleViewSet(CreateModelMixin, ListModelMixin, GenericViewSet):
 
         serializer = self.get_serializer(swap_request)
         return Response(serializer.data, status=HTTP_200_OK)
+
+
+class SwapEventsView(View):
+    """
+    Поток событий по заявкам текущего пользователя (Server-Sent Events).
+
+    Асинхронное представление, обслуживается через ASGI: одно открытое
+    соединение заменяет периодический опрос /incoming/. Каждое событие
+    содержит event (created, accepted, declined, canceled), type
+    (swap_duties или swap_people), id и status заявки. При отсутствии
+    событий раз в keepalive_interval секунд отправляется комментарий,
+    чтобы прокси не закрывали соединение. Под WSGI бесконечный поток
+    не может быть отдан, поэтому такие запросы отклоняются с кодом 501.
+    """
+
+    keepalive_interval = 15
+    retry_interval = 5000
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse(
+                {"detail": "Поток событий доступен только через ASGI."}, status=501
+            )
+        user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse(
+                {"detail": "Учетные данные не были предоставлены."}, status=403
+            )
+        response = StreamingHttpResponse(
+            self.stream(user_channel(user.pk)), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self, channel: str):
+        subscription = await get_event_broker().subscribe(channel)
+        async with subscription:
+            yield f"retry: {self.retry_interval}\n\n"
+            while True:
+                event = await subscription.get(timeout=self.keepalive_interval)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
@@ -1,20 +1,27 @@
-from rest_framework.serializers import ModelSerializer, SerializerMethodField
+from rest_framework.serializers import BooleanField, ModelSerializer
 
 from core.apps.laundry.models import LaundryRecord
 
 
 class LaundrySerializer(ModelSerializer):
-    is_owned = SerializerMethodField()
+    """
+    Запись прачечной.
+
+    is_owned берется из аннотации LaundryService.annotate_is_owned,
+    is_available считается по owner_id, поэтому владелец не загружается.
+    """
+
+    is_available = BooleanField(read_only=True)
+    is_owned = BooleanField(read_only=True)
+
     class Meta:
         model = LaundryRecord
         fields = (
             'pk',
+            'machine',
             'record_date',
             'time_start',
             'time_end',
             'is_available',
             'is_owned'
         )
-
-    def get_is_owned(self, obj):
-        return self.context.get('request').user == obj.owner
\ No newline at end of file
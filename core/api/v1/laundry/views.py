@@ -5,14 +5,21 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import ValidationError
 from django.utils import timezone
+from datetime import date, time
 import logging
 
 from drf_spectacular.utils import extend_schema
 
 from core.api.v1.laundry.serializers import LaundrySerializer
+from core.api.v1.pagination import LaundryRecordsPagination
 from core.apps.laundry.models import LaundryRecord
-from core.apps.laundry.services import LaundryService, create_laundry_records_for_today
+from core.apps.laundry.services import (
+    LAUNDRY_NEXT_FREE_COUNT,
+    LaundryService,
+    LaundryWaitlistService,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -23,16 +30,47 @@ class LaundryRecordViewSet(ListModelMixin, GenericViewSet):
     serializer_class = LaundrySerializer
     authentication_classes = (SessionAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = LaundryRecordsPagination
+
+    def get_queryset(self):
+        return LaundryService.annotate_is_owned(
+            super().get_queryset(), self.request.user
+        )
 
     def filter_queryset(self, queryset):
         if self.action == "today_records_list":
             today = timezone.now().date()
             return queryset.filter(record_date=today)
+        if self.action == "list":
+            if date_from := self._get_date_param("date_from"):
+                queryset = queryset.filter(record_date__gte=date_from)
+            if date_to := self._get_date_param("date_to"):
+                queryset = queryset.filter(record_date__lte=date_to)
         return queryset
 
+    def _get_date_param(self, name: str, data=None) -> date | None:
+        """
+        Получить дату из параметра запроса :name.
+
+        :param data: Где искать параметр, по умолчанию в query_params.
+        :raises ValidationError: Если дата не в формате ГГГГ-ММ-ДД.
+        """
+        value = (self.request.query_params if data is None else data).get(name)
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise ValidationError({name: "Дата должна быть в формате ГГГГ-ММ-ДД"})
+
     @extend_schema(tags=["Laundry"])
     def list(self, request, *args, **kwargs):
-        """Получить список всех записей."""
+        """
+        Получить список записей.
+
+        Период фильтруется параметрами date_from и date_to (ГГГГ-ММ-ДД). Записи старше
+        LAUNDRY_ARCHIVE_AFTER_DAYS дней переносятся в архив и в список не входят.
+        """
         return super().list(request, *args, **kwargs)
 
     @extend_schema(tags=["Laundry"])
@@ -41,12 +79,8 @@ class LaundryRecordViewSet(ListModelMixin, GenericViewSet):
         """
         Получить список записей на сегодняшний день.
 
-        :side effect: При отсуствии записей, происходит создание новых на сегодня.
+        Записи создаются заранее задачей create_laundry_records.
         """
-        if not self.filter_queryset(self.get_queryset()):
-            logging.info("Запуск создания записей на сегодня")
-            create_laundry_records_for_today()
-            logging.info("Записи на сегодня успешно созданы")
         return super().list(request, *args, **kwargs)
 
     @extend_schema(tags=["Laundry"])
@@ -56,7 +90,7 @@ class LaundryRecordViewSet(ListModelMixin, GenericViewSet):
         Зарезервировать запись.
 
         :param id: ID записи.
-        :raises RecordStateException: Если запись уже занята.
+        :raises RecordConflictException: Если запись уже занята (409).
         """
         record = LaundryService.get_by_id(id=pk)
 
@@ -73,7 +107,9 @@ class LaundryRecordViewSet(ListModelMixin, GenericViewSet):
         Освободить запись.
 
         :param id: ID записи.
-        :raises RecordStateException: Если запись уже свободна.
+        Если кто-то стоит в очереди на этот день, запись сразу передается ему.
+
+        :raises RecordConflictException: Если запись уже свободна (409).
         :raises PermissionDenied: Если запись не принадлежит текущему пользователю.
         """
         record = LaundryService.get_by_id(id=pk)
@@ -84,11 +120,129 @@ class LaundryRecordViewSet(ListModelMixin, GenericViewSet):
 
         return Response({"detail": "Запись успешно освобождена"})
 
+    @extend_schema(tags=["Laundry"])
+    @action(methods=("POST",), detail=True, url_path="check-in")
+    def check_in(self, request, pk, *args, **kwargs):
+        """
+        Отметить приход на запись.
+
+        Если в настройках прачечной задано время на отметку, записи без
+        отметки после него освобождаются и считаются неявкой.
+
+        :param id: ID записи.
+        :raises RecordStateException: Если сейчас не день записи или она закончилась (400).
+        :raises RecordConflictException: Если приход уже отмечен (409).
+        :raises PermissionDenied: Если запись не принадлежит текущему пользователю.
+        """
+        record = LaundryService.get_by_id(id=pk)
+
+        laundry_service = LaundryService(current_user=request.user, record=record)
+
+        laundry_service.check_in()
+
+        return Response({"detail": "Приход отмечен"})
+
+    @extend_schema(tags=["Laundry"])
+    @action(methods=("GET",), detail=False, url_path="next-free")
+    def next_free_records(self, request, *args, **kwargs):
+        """
+        Получить ближайшие свободные записи, начиная с текущего момента.
+
+        Количество задается параметром count (по умолчанию 5, не больше 50),
+        окно времени суток - параметрами time_from и time_to (ЧЧ:ММ).
+        """
+        records = LaundryService.annotate_is_owned(
+            LaundryService.get_next_free_records(
+                timezone.localtime(),
+                count=self._get_count_param(),
+                time_from=self._get_time_param("time_from"),
+                time_to=self._get_time_param("time_to"),
+            ),
+            request.user,
+        )
+
+        serializer = self.get_serializer(records, many=True)
+
+        return Response(serializer.data, HTTP_200_OK)
+
+    def _get_count_param(self) -> int:
+        """
+        Получить количество записей из параметра count.
+
+        :raises ValidationError: Если count не число от 1 до 50.
+        """
+        value = self.request.query_params.get("count")
+        if not value:
+            return LAUNDRY_NEXT_FREE_COUNT
+        if not value.isdigit() or not 1 <= int(value) <= 50:
+            raise ValidationError({"count": "Количество должно быть числом от 1 до 50"})
+        return int(value)
+
+    def _get_time_param(self, name: str) -> time | None:
+        """
+        Получить время суток из параметра запроса :name.
+
+        :raises ValidationError: Если время не в формате ЧЧ:ММ.
+        """
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return time.fromisoformat(value)
+        except ValueError:
+            raise ValidationError({name: "Время должно быть в формате ЧЧ:ММ"})
+
+    @extend_schema(tags=["Laundry"])
+    @action(methods=("POST",), detail=False, url_path="waitlist/join")
+    def join_waitlist(self, request, *args, **kwargs):
+        """
+        Встать в очередь на записи дня record_date (ГГГГ-ММ-ДД, по умолчанию сегодня).
+
+        Первая освободившаяся запись этого дня передается первому в очереди,
+        он получает событие promoted в /duties/events/.
+
+        :raises WaitlistConflictException: Если на этот день есть свободные
+            записи, которые еще не начались, или пользователь уже в очереди (409).
+        """
+        record_date = self._get_waitlist_date()
+        position = LaundryWaitlistService.join(
+            request.user, record_date, timezone.localtime()
+        )
+
+        return Response({"detail": "Вы в очереди", "position": position})
+
+    @extend_schema(tags=["Laundry"])
+    @action(methods=("POST",), detail=False, url_path="waitlist/leave")
+    def leave_waitlist(self, request, *args, **kwargs):
+        """
+        Выйти из очереди на записи дня record_date (ГГГГ-ММ-ДД, по умолчанию сегодня).
+
+        :raises NotFound: Если пользователь не в очереди.
+        """
+        record_date = self._get_waitlist_date()
+        LaundryWaitlistService.leave(request.user, record_date)
+
+        return Response({"detail": "Вы вышли из очереди"})
+
+    def _get_waitlist_date(self) -> date:
+        """
+        Получить день очереди из тела запроса.
+
+        :raises ValidationError: Если день уже прошел.
+        """
+        today = timezone.now().date()
+        record_date = self._get_date_param("record_date", self.request.data) or today
+        if record_date < today:
+            raise ValidationError({"record_date": "День уже прошел"})
+        return record_date
+
     @extend_schema(tags=["Laundry"])
     @action(methods=("GET",), detail=False, url_path="today/my")
     def my_records_today(self, request, *args, **kwargs):
         """Получить список сегодняшних записей, зарезервированных текущим пользователем."""
-        records = LaundryService.get_users_records_today(request.user)
+        records = LaundryService.annotate_is_owned(
+            LaundryService.get_users_records_today(request.user), request.user
+        )
 
         serializer = self.get_serializer(records, many=True)
 
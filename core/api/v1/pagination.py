@@ -0,0 +1,256 @@
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+from datetime import date, datetime, time
+
+from django.core.exceptions import ValidationError
+from django.db.models import Field, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу сортировки (keyset).
+
+    Курсор хранит значения полей :ordering последней записи страницы, поэтому
+    следующая страница выбирается условием по индексу, а не смещением, и ее
+    стоимость не зависит от количества записей перед ней.
+
+    Режим совместимости: если клиент не передал ни page_size, ни cursor,
+    ответ остается полным списком без пагинации, как до ее введения. С
+    page_size ответ оборачивается в {"next", "previous", "results"}, с одним
+    cursor остается списком страницы, а ссылки на соседние страницы
+    передаются в заголовке Link.
+    """
+
+    ordering: tuple[str, ...] = ("-id",)
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Некорректный курсор"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list:
+        self.base_url = request.build_absolute_uri()
+        self.envelope = self.page_size_query_param in request.query_params
+        position, reverse = self.decode_cursor(request, queryset)
+        self.next_position = self.previous_position = None
+        if not self.envelope and position is None:
+            # Старые клиенты не читают Link, поэтому получают все записи
+            self.page_size = None
+            return list(self.get_page_queryset(queryset, self.ordering, None))
+        self.page_size = self.get_page_size(request)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+        queryset = self.get_page_queryset(queryset, ordering, position)
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        has_next = has_more if not reverse else position is not None
+        has_previous = position is not None if not reverse else has_more
+        self.next_position = (
+            self._position(results[-1]) if results and has_next else None
+        )
+        self.previous_position = (
+            self._position(results[0]) if results and has_previous else None
+        )
+        return results
+
+    def get_page_queryset(
+        self, queryset: QuerySet, ordering: tuple[str, ...], position: list | None
+    ) -> QuerySet:
+        """Отсортировать :queryset и оставить записи после :position"""
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+        return queryset
+
+    def get_paginated_response(self, data) -> Response:
+        if self.envelope:
+            return Response(
+                {
+                    "next": self.get_next_link(),
+                    "previous": self.get_previous_link(),
+                    "results": data,
+                }
+            )
+        links = [
+            f'<{url}>; rel="{rel}"'
+            for url, rel in (
+                (self.get_next_link(), "next"),
+                (self.get_previous_link(), "prev"),
+            )
+            if url
+        ]
+        return Response(data, headers={"Link": ", ".join(links)} if links else None)
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_next_link(self) -> str | None:
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def encode_cursor(self, position: list, reverse: bool) -> str:
+        """Построить ссылку на страницу после (или перед) записью с ключом :position"""
+        payload = json.dumps({"p": position, "r": int(reverse)}, separators=(",", ":"))
+        cursor = b64encode(payload.encode(), altchars=b"-_").decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, queryset: QuerySet) -> tuple[list | None, bool]:
+        """
+        Получить ключ и направление из курсора запроса.
+
+        Значения ключа приводятся к типам полей сортировки :queryset, чтобы
+        поддельный курсор не дошел до запроса к базе данных.
+
+        :raises NotFound: Если курсор поврежден.
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(b64decode(cursor, altchars=b"-_", validate=True))
+            position, reverse = payload["p"], bool(payload["r"])
+        except (BinasciiError, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [
+                field.to_python(value)
+                for field, value in zip(self.get_ordering_fields(queryset), position)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_ordering_fields(self, queryset: QuerySet) -> list[Field]:
+        """Поля :queryset (в том числе аннотации) для каждого поля :ordering"""
+        annotations = queryset.query.annotations
+        fields = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            if name in annotations:
+                fields.append(annotations[name].output_field)
+            else:
+                fields.append(queryset.model._meta.get_field(name))
+        return fields
+
+    def _position(self, instance) -> list:
+        """Значения полей сортировки записи или строки values() в виде, пригодном для JSON"""
+        position = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            if isinstance(instance, dict):
+                value = instance[name]
+            else:
+                value = getattr(instance, name)
+            if isinstance(value, (date, datetime, time)):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    @staticmethod
+    def _invert(field: str) -> str:
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _after(ordering: tuple[str, ...], position: list) -> Q:
+        """
+        Условие "строго после :position" для сортировки :ordering.
+
+        Раскрывает сравнение кортежей в (a > x) OR (a = x AND b > y) OR ...
+        и добавляет a >= x, чтобы запрос оставался диапазонным сканированием
+        составного индекса.
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        first = ordering[0]
+        bound = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{bound}": position[0]}) & condition
+
+
+class DutyRecordsPagination(KeysetPagination):
+    ordering = ("-date", "-id")
+
+
+class SwapRequestsPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class LaundryRecordsPagination(KeysetPagination):
+    ordering = ("record_date", "time_start", "id")
+
+
+class RepairProposalsPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class SwapInboxPagination(KeysetPagination):
+    """
+    Пагинация объединения нескольких запросов через UNION ALL.
+
+    Принимает кортеж запросов с одинаковыми полями values(). Условие курсора
+    и лимит применяются к каждой ветке отдельно, поэтому каждая читает по
+    индексу не больше page_size + 1 строк, а база данных сливает их по порядку.
+    Без пагинации ветки объединяются целиком.
+    """
+
+    ordering = ("-created_at", "-id", "-type")
+
+    def get_page_queryset(
+        self,
+        queryset: tuple[QuerySet, ...],
+        ordering: tuple[str, ...],
+        position: list | None,
+    ) -> QuerySet:
+        branches = [
+            super(SwapInboxPagination, self).get_page_queryset(
+                branch, ordering, position
+            )
+            for branch in queryset
+        ]
+        if self.page_size is not None:
+            branches = [branch[: self.page_size + 1] for branch in branches]
+        return branches[0].union(*branches[1:], all=True).order_by(*ordering)
+
+    def get_ordering_fields(self, queryset: tuple[QuerySet, ...]) -> list[Field]:
+        return super().get_ordering_fields(queryset[0])
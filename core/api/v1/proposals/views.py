@@ -8,6 +8,7 @@ from rest_framework.authentication import SessionAuthentication
 
 from drf_spectacular.utils import extend_schema
 
+from core.api.v1.pagination import RepairProposalsPagination
 from core.api.v1.proposals.serializers import RepairProposalSerializer
 from core.apps.proposals.models import RepairProposal
 
@@ -17,6 +18,7 @@ class RepairProposalsViewSet(ListModelMixin, CreateModelMixin, GenericViewSet):
     serializer_class = RepairProposalSerializer
     authentication_classes = (SessionAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = RepairProposalsPagination
 
     def get_queryset(self):
         if self.action == "my_proposals":
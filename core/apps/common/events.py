@@ -0,0 +1,185 @@
+import asyncio
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from functools import cache
+
+from django.conf import settings
+from django.db import transaction
+import redis
+import redis.asyncio
+
+
+class EventSubscription(ABC):
+    """Подписка на события одного канала"""
+
+    @abstractmethod
+    async def get(self, timeout: float) -> dict | None:
+        """
+        Дождаться следующего события.
+
+        :returns: Событие или None, если за :timeout секунд событий не было.
+        """
+        ...
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Отписаться от канала"""
+        ...
+
+    async def __aenter__(self) -> "EventSubscription":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+class BaseEventBroker(ABC):
+    """
+    Брокер событий для подписчиков по каналам.
+
+    Публикация синхронная и вызывается из сервисов, подписка асинхронная
+    и используется в потоковых ответах ASGI.
+    """
+
+    @abstractmethod
+    def publish(self, channel: str, event: dict) -> None:
+        """Отправить :event всем подписчикам :channel"""
+        ...
+
+    @abstractmethod
+    async def subscribe(self, channel: str) -> EventSubscription:
+        """Подписаться на события :channel"""
+        ...
+
+
+class LocalEventSubscription(EventSubscription):
+    def __init__(self, broker: "LocalEventBroker", channel: str) -> None:
+        self._broker = broker
+        self._channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    async def get(self, timeout: float) -> dict | None:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        self._broker._remove(self._channel, self)
+
+
+class LocalEventBroker(BaseEventBroker):
+    """
+    Брокер событий в памяти процесса.
+
+    Подходит для разработки и развертывания в один процесс: события,
+    опубликованные в другом процессе (например, в воркере Celery),
+    подписчикам не доставляются.
+    """
+
+    def __init__(self) -> None:
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, event: dict) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.queue.put_nowait, event
+                )
+            except RuntimeError:
+                # Цикл событий подписчика уже закрыт
+                self._remove(channel, subscription)
+
+    async def subscribe(self, channel: str) -> LocalEventSubscription:
+        subscription = LocalEventSubscription(self, channel)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def _remove(self, channel: str, subscription: LocalEventSubscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(channel)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[channel]
+
+
+class RedisEventSubscription(EventSubscription):
+    def __init__(self, client, pubsub) -> None:
+        self._client = client
+        self._pubsub = pubsub
+
+    async def get(self, timeout: float) -> dict | None:
+        message = await self._pubsub.get_message(
+            ignore_subscribe_messages=True, timeout=timeout
+        )
+        if message is None:
+            return None
+        return json.loads(message["data"])
+
+    async def close(self) -> None:
+        await self._pubsub.aclose()
+        await self._client.aclose()
+
+
+class RedisEventBroker(BaseEventBroker):
+    """
+    Брокер событий через Redis pub/sub.
+
+    События доставляются между процессами, поэтому подходит для нескольких
+    воркеров ASGI и публикации из Celery.
+    """
+
+    def __init__(self, url: str) -> None:
+        self._url = url
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, channel: str, event: dict) -> None:
+        self._client.publish(channel, json.dumps(event))
+
+    async def subscribe(self, channel: str) -> RedisEventSubscription:
+        client = redis.asyncio.Redis.from_url(self._url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        return RedisEventSubscription(client, pubsub)
+
+
+@cache
+def get_event_broker() -> BaseEventBroker:
+    """
+    Получить брокер событий процесса.
+
+    Если задан EVENTS_REDIS_URL, используется Redis, иначе брокер в памяти.
+    """
+    if url := getattr(settings, "EVENTS_REDIS_URL", None):
+        return RedisEventBroker(url)
+    return LocalEventBroker()
+
+
+def user_channel(user_id: int) -> str:
+    """Имя канала событий пользователя"""
+    return f"user:{user_id}"
+
+
+def publish_user_event(user_ids: list[int], event: dict) -> None:
+    """
+    Отправить :event пользователям после фиксации текущей транзакции.
+
+    Если транзакция откатится, событие не отправляется. Ошибка брокера
+    не влияет на уже выполненное действие и только пишется в лог.
+    """
+
+    def publish() -> None:
+        broker = get_event_broker()
+        for user_id in dict.fromkeys(user_ids):
+            broker.publish(user_channel(user_id), event)
+
+    transaction.on_commit(publish, robust=True)
@@ -10,3 +10,8 @@ def get_current_year_dates() -> tuple[date]:
         start_date = date(year=today.year - 1, month=today.month, day=today.day)
         end_date = date(year=today.year, month=today.month, day=today.day)
     return (start_date, end_date)
+
+
+def get_academic_year(day: date) -> int:
+    """Возвращает год начала учебного года, к которому относится дата"""
+    return day.year if day.month >= 9 else day.year - 1
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from core.apps.duties.models import (
+    DutyStats,
     KitchenDuty,
     KitchenDutyConfig,
     SwapDutiesRequest,
@@ -26,3 +27,10 @@ class SwapDutiesRequestAdmin(admin.ModelAdmin):
 @admin.register(KitchenDutyConfig)
 class KitchenDutyConfigAdmin(admin.ModelAdmin):
     model = KitchenDutyConfig
+
+
+@admin.register(DutyStats)
+class DutyStatsAdmin(admin.ModelAdmin):
+    model = DutyStats
+    list_display = ("user", "academic_year", "duties_count", "finished_duties_count")
+    list_filter = ("academic_year",)
@@ -0,0 +1,11 @@
+SWAP_REQUEST_PENDING = 0
+SWAP_REQUEST_ACCEPTED = 1
+SWAP_REQUEST_DECLINED = 2
+SWAP_REQUEST_CANCELED = 3
+
+SWAP_REQUEST_STATUS_CHOICES = (
+    (SWAP_REQUEST_PENDING, "Ожидает ответа"),
+    (SWAP_REQUEST_ACCEPTED, "Принята"),
+    (SWAP_REQUEST_DECLINED, "Отклонена"),
+    (SWAP_REQUEST_CANCELED, "Отменена"),
+)
@@ -0,0 +1,24 @@
+from typing import Any
+from django.core.management.base import BaseCommand, CommandParser
+
+from core.apps.duties.services import DutyStatsService
+
+
+class Command(BaseCommand):
+    help = "Пересчитать статистику дежурств проживающих с нуля"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--year",
+            type=int,
+            default=None,
+            help="Год начала учебного года, по умолчанию пересчитываются все года",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        stats_count = DutyStatsService.rebuild(academic_year=options["year"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Статистика дежурств пересчитана: {stats_count} записей"
+            )
+        )
@@ -0,0 +1,59 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:28
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_duties(apps, schema_editor):
+    """Объединяет дежурства с одинаковой датой в одно, перенося людей и заявки"""
+    KitchenDuty = apps.get_model("duties", "KitchenDuty")
+    SwapDutiesRequest = apps.get_model("duties", "SwapDutiesRequest")
+    SwapPeopleRequest = apps.get_model("duties", "SwapPeopleRequest")
+    through_model = KitchenDuty.people.through
+
+    duplicates = (
+        KitchenDuty.objects.values("date")
+        .annotate(duties_count=Count("id"), kept_id=Min("id"))
+        .filter(duties_count__gt=1)
+    )
+    for duplicate in duplicates:
+        kept_id = duplicate["kept_id"]
+        extra_ids = list(
+            KitchenDuty.objects.filter(date=duplicate["date"])
+            .exclude(id=kept_id)
+            .values_list("id", flat=True)
+        )
+        kept_people = set(
+            through_model.objects.filter(kitchenduty_id=kept_id).values_list(
+                "customuser_id", flat=True
+            )
+        )
+        extra_people = set(
+            through_model.objects.filter(kitchenduty_id__in=extra_ids).values_list(
+                "customuser_id", flat=True
+            )
+        )
+        through_model.objects.bulk_create(
+            through_model(kitchenduty_id=kept_id, customuser_id=pupil_id)
+            for pupil_id in extra_people - kept_people
+        )
+        if KitchenDuty.objects.filter(id__in=extra_ids, finished=True).exists():
+            KitchenDuty.objects.filter(id=kept_id).update(finished=True)
+        SwapDutiesRequest.objects.filter(first_duty_id__in=extra_ids).update(
+            first_duty_id=kept_id
+        )
+        SwapDutiesRequest.objects.filter(second_duty_id__in=extra_ids).update(
+            second_duty_id=kept_id
+        )
+        SwapPeopleRequest.objects.filter(duty_id__in=extra_ids).update(duty_id=kept_id)
+        KitchenDuty.objects.filter(id__in=extra_ids).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("duties", "0009_alter_swapdutiesrequest_options"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_duties, migrations.RunPython.noop),
+    ]
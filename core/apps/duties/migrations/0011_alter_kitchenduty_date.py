@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("duties", "0010_merge_duplicate_kitchen_duties"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="kitchenduty",
+            name="date",
+            field=models.DateField(unique=True, verbose_name="Дата дежурства"),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("duties", "0011_alter_kitchenduty_date"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DutyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "academic_year",
+                    models.PositiveSmallIntegerField(
+                        verbose_name="Учебный год (год начала)"
+                    ),
+                ),
+                (
+                    "duties_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Назначено дежурств"
+                    ),
+                ),
+                (
+                    "finished_duties_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Завершено дежурств"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="duty_stats",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Проживающий",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Статистика дежурств",
+                "verbose_name_plural": "Статистика дежурств",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dutystats",
+            constraint=models.UniqueConstraint(
+                fields=("user", "academic_year"), name="unique_user_academic_year"
+            ),
+        ),
+    ]
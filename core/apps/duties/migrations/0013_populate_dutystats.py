@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db.models import Case, Count, Q, When
+from django.db.models.functions import ExtractYear
+
+
+def populate_duty_stats(apps, schema_editor):
+    """Заполняет статистику дежурств по уже существующим дежурствам"""
+    KitchenDuty = apps.get_model("duties", "KitchenDuty")
+    DutyStats = apps.get_model("duties", "DutyStats")
+
+    rows = (
+        KitchenDuty.people.through.objects.annotate(
+            academic_year=Case(
+                When(
+                    kitchenduty__date__month__gte=9,
+                    then=ExtractYear("kitchenduty__date"),
+                ),
+                default=ExtractYear("kitchenduty__date") - 1,
+            )
+        )
+        .values("customuser_id", "academic_year")
+        .annotate(
+            duties_count=Count("pk"),
+            finished_duties_count=Count("pk", filter=Q(kitchenduty__finished=True)),
+        )
+    )
+    DutyStats.objects.bulk_create(
+        DutyStats(
+            user_id=row["customuser_id"],
+            academic_year=row["academic_year"],
+            duties_count=row["duties_count"],
+            finished_duties_count=row["finished_duties_count"],
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("duties", "0012_dutystats"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_duty_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("duties", "0013_populate_dutystats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="kitchenduty",
+            index=models.Index(fields=["date", "id"], name="kitchenduty_date_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="swapdutiesrequest",
+            index=models.Index(
+                fields=["first_user", "created_at", "id"],
+                name="swapduties_first_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="swapdutiesrequest",
+            index=models.Index(
+                fields=["second_user", "created_at", "id"],
+                name="swapduties_second_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="swappeoplerequest",
+            index=models.Index(
+                fields=["current_user", "created_at", "id"],
+                name="swappeople_current_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="swappeoplerequest",
+            index=models.Index(
+                fields=["to_swap", "created_at", "id"],
+                name="swappeople_to_swap_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("duties", "0014_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="swapdutiesrequest",
+            name="status",
+            field=models.PositiveSmallIntegerField(
+                choices=[
+                    (0, "Ожидает ответа"),
+                    (1, "Принята"),
+                    (2, "Отклонена"),
+                    (3, "Отменена"),
+                ],
+                default=0,
+                verbose_name="Статус заявки",
+            ),
+        ),
+        migrations.AddField(
+            model_name="swappeoplerequest",
+            name="status",
+            field=models.PositiveSmallIntegerField(
+                choices=[
+                    (0, "Ожидает ответа"),
+                    (1, "Принята"),
+                    (2, "Отклонена"),
+                    (3, "Отменена"),
+                ],
+                default=0,
+                verbose_name="Статус заявки",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+# Порядок совпадает с проверками is_mutable: принятая заявка остается принятой,
+# даже если у нее по ошибке выставлены и другие флаги
+STATUS_FLAGS = (("accepted", 1), ("declined", 2), ("canceled", 3))
+
+
+def flags_to_status(apps, schema_editor):
+    """Переносит состояние заявок из флагов в поле status"""
+    for model_name in ("SwapDutiesRequest", "SwapPeopleRequest"):
+        model = apps.get_model("duties", model_name)
+        for flag, status in reversed(STATUS_FLAGS):
+            model.objects.filter(**{flag: True}).update(status=status)
+
+
+def status_to_flags(apps, schema_editor):
+    """Восстанавливает флаги заявок из поля status"""
+    for model_name in ("SwapDutiesRequest", "SwapPeopleRequest"):
+        model = apps.get_model("duties", model_name)
+        for flag, status in STATUS_FLAGS:
+            model.objects.filter(status=status).update(**{flag: True})
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("duties", "0015_swap_requests_status"),
+    ]
+
+    operations = [
+        migrations.RunPython(flags_to_status, status_to_flags),
+    ]
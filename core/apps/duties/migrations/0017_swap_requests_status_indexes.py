@@ -0,0 +1,70 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("duties", "0016_populate_swap_requests_status"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="swapdutiesrequest",
+            name="accepted",
+        ),
+        migrations.RemoveField(
+            model_name="swapdutiesrequest",
+            name="canceled",
+        ),
+        migrations.RemoveField(
+            model_name="swapdutiesrequest",
+            name="declined",
+        ),
+        migrations.RemoveField(
+            model_name="swappeoplerequest",
+            name="accepted",
+        ),
+        migrations.RemoveField(
+            model_name="swappeoplerequest",
+            name="canceled",
+        ),
+        migrations.RemoveField(
+            model_name="swappeoplerequest",
+            name="declined",
+        ),
+        migrations.AddIndex(
+            model_name="swapdutiesrequest",
+            index=models.Index(
+                condition=models.Q(("status", 0)),
+                fields=["second_user", "created_at", "id"],
+                name="swapduties_second_pending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="swapdutiesrequest",
+            index=models.Index(
+                condition=models.Q(("status", 0)),
+                fields=["first_user", "created_at", "id"],
+                name="swapduties_first_pending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="swappeoplerequest",
+            index=models.Index(
+                condition=models.Q(("status", 0)),
+                fields=["to_swap", "created_at", "id"],
+                name="swappeople_to_swap_pending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="swappeoplerequest",
+            index=models.Index(
+                condition=models.Q(("status", 0)),
+                fields=["current_user", "created_at", "id"],
+                name="swappeople_current_pending_idx",
+            ),
+        ),
+    ]
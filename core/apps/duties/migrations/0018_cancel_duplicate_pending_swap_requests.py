@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+PENDING = 0
+CANCELED = 3
+
+# Поля, по которым ожидающая заявка считается повтором
+DUPLICATE_FIELDS = {
+    "SwapDutiesRequest": ("first_user", "second_user", "first_duty", "second_duty"),
+    "SwapPeopleRequest": ("current_user", "to_swap", "duty"),
+}
+
+
+def cancel_duplicates(apps, schema_editor):
+    """Отменяет повторные ожидающие заявки, оставляя самую раннюю"""
+    for model_name, fields in DUPLICATE_FIELDS.items():
+        model = apps.get_model("duties", model_name)
+        seen = set()
+        duplicates = []
+        rows = (
+            model.objects.filter(status=PENDING)
+            .order_by("created_at", "pk")
+            .values_list("pk", *(f"{field}_id" for field in fields))
+        )
+        for pk, *key in rows.iterator():
+            if tuple(key) in seen:
+                duplicates.append(pk)
+            seen.add(tuple(key))
+        model.objects.filter(pk__in=duplicates).update(status=CANCELED)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("duties", "0017_swap_requests_status_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(cancel_duplicates, migrations.RunPython.noop),
+    ]
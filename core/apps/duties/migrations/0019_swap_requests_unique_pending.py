@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("duties", "0018_cancel_duplicate_pending_swap_requests"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="swapdutiesrequest",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", 0)),
+                fields=("first_user", "second_user", "first_duty", "second_duty"),
+                name="swapduties_unique_pending",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="swappeoplerequest",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", 0)),
+                fields=("current_user", "to_swap", "duty"),
+                name="swappeople_unique_pending",
+            ),
+        ),
+    ]
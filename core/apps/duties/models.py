@@ -1,6 +1,13 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from core.apps.duties.choices import (
+    SWAP_REQUEST_ACCEPTED,
+    SWAP_REQUEST_CANCELED,
+    SWAP_REQUEST_DECLINED,
+    SWAP_REQUEST_PENDING,
+    SWAP_REQUEST_STATUS_CHOICES,
+)
 from core.apps.users.models import CustomUser
 
 
@@ -18,7 +25,7 @@ class KitchenDutyConfig(models.Model):
 class KitchenDuty(models.Model):
     """Дежурства по кухням"""
 
-    date = models.DateField(verbose_name="Дата дежурства")
+    date = models.DateField(verbose_name="Дата дежурства", unique=True)
     people = models.ManyToManyField(
         UserModel,
         verbose_name="Ответственные",
@@ -29,9 +36,10 @@ class KitchenDuty(models.Model):
     class Meta:
         verbose_name = "Дежурство по кухням"
         verbose_name_plural = "Дежурства по кухням"
+        indexes = [models.Index(fields=("date", "id"), name="kitchenduty_date_id_idx")]
 
     def __str__(self) -> str:
-        return f'{self.date}: {(', '.join(str(pupil) for pupil in self.people.all()))}'
+        return f"{self.date}: {(', '.join(str(pupil) for pupil in self.people.all()))}"
 
     def finish(self):
         """Завершить дежурство, только для удобства тестов"""
@@ -67,17 +75,58 @@ class SwapDutiesRequest(models.Model):
         related_name="addressed_swap_duties_requests",
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
-    accepted = models.BooleanField(default=False, verbose_name="Принята?")
-    declined = models.BooleanField(default=False, verbose_name="Отклонена?")
-    canceled = models.BooleanField(default=False, verbose_name="Отменена?")
+    status = models.PositiveSmallIntegerField(
+        verbose_name="Статус заявки",
+        choices=SWAP_REQUEST_STATUS_CHOICES,
+        default=SWAP_REQUEST_PENDING,
+    )
 
     @property
     def is_mutable(self) -> bool:
-        return not self.accepted and not self.declined and not self.canceled
+        return self.status == SWAP_REQUEST_PENDING
+
+    @property
+    def accepted(self) -> bool:
+        return self.status == SWAP_REQUEST_ACCEPTED
+
+    @property
+    def declined(self) -> bool:
+        return self.status == SWAP_REQUEST_DECLINED
+
+    @property
+    def canceled(self) -> bool:
+        return self.status == SWAP_REQUEST_CANCELED
 
     class Meta:
         verbose_name = "Запрос на обмен"
         verbose_name_plural = "Запросы на обмен"
+        indexes = [
+            models.Index(
+                fields=("first_user", "created_at", "id"),
+                name="swapduties_first_created_idx",
+            ),
+            models.Index(
+                fields=("second_user", "created_at", "id"),
+                name="swapduties_second_created_idx",
+            ),
+            models.Index(
+                fields=("second_user", "created_at", "id"),
+                condition=models.Q(status=SWAP_REQUEST_PENDING),
+                name="swapduties_second_pending_idx",
+            ),
+            models.Index(
+                fields=("first_user", "created_at", "id"),
+                condition=models.Q(status=SWAP_REQUEST_PENDING),
+                name="swapduties_first_pending_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("first_user", "second_user", "first_duty", "second_duty"),
+                condition=models.Q(status=SWAP_REQUEST_PENDING),
+                name="swapduties_unique_pending",
+            ),
+        ]
 
 
 class SwapPeopleRequest(models.Model):
@@ -97,10 +146,85 @@ class SwapPeopleRequest(models.Model):
         related_name="addressed_swap_people_requests",
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
-    accepted = models.BooleanField(default=False, verbose_name="Принята?")
-    declined = models.BooleanField(default=False, verbose_name="Отклонена?")
-    canceled = models.BooleanField(default=False, verbose_name="Отменена?")
+    status = models.PositiveSmallIntegerField(
+        verbose_name="Статус заявки",
+        choices=SWAP_REQUEST_STATUS_CHOICES,
+        default=SWAP_REQUEST_PENDING,
+    )
+
+    @property
+    def is_mutable(self) -> bool:
+        return self.status == SWAP_REQUEST_PENDING
 
     @property
-    def is_mutable(self):
-        return not (self.canceled or self.declined or self.accepted)
+    def accepted(self) -> bool:
+        return self.status == SWAP_REQUEST_ACCEPTED
+
+    @property
+    def declined(self) -> bool:
+        return self.status == SWAP_REQUEST_DECLINED
+
+    @property
+    def canceled(self) -> bool:
+        return self.status == SWAP_REQUEST_CANCELED
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=("current_user", "created_at", "id"),
+                name="swappeople_current_created_idx",
+            ),
+            models.Index(
+                fields=("to_swap", "created_at", "id"),
+                name="swappeople_to_swap_created_idx",
+            ),
+            models.Index(
+                fields=("to_swap", "created_at", "id"),
+                condition=models.Q(status=SWAP_REQUEST_PENDING),
+                name="swappeople_to_swap_pending_idx",
+            ),
+            models.Index(
+                fields=("current_user", "created_at", "id"),
+                condition=models.Q(status=SWAP_REQUEST_PENDING),
+                name="swappeople_current_pending_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("current_user", "to_swap", "duty"),
+                condition=models.Q(status=SWAP_REQUEST_PENDING),
+                name="swappeople_unique_pending",
+            ),
+        ]
+
+
+class DutyStats(models.Model):
+    """Статистика дежурств проживающего за учебный год"""
+
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        verbose_name="Проживающий",
+        related_name="duty_stats",
+    )
+    academic_year = models.PositiveSmallIntegerField(
+        verbose_name="Учебный год (год начала)"
+    )
+    duties_count = models.PositiveIntegerField(
+        default=0, verbose_name="Назначено дежурств"
+    )
+    finished_duties_count = models.PositiveIntegerField(
+        default=0, verbose_name="Завершено дежурств"
+    )
+
+    class Meta:
+        verbose_name = "Статистика дежурств"
+        verbose_name_plural = "Статистика дежурств"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("user", "academic_year"), name="unique_user_academic_year"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} ({self.academic_year}): {self.duties_count}"
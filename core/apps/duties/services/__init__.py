@@ -1,5 +1,9 @@
+from .allocation import *  # noqa: F403
 from .base import *  # noqa: F403
+from .stats import *  # noqa: F403
 from .kitchen_duty import *  # noqa: F403
 from .swap_duties import *  # noqa: F403
+from .swap_cycles import *  # noqa: F403
+from .swap_inbox import *  # noqa: F403
 from .swap_people import *  # noqa: F403
 from .utils import *  # noqa: F403
@@ -0,0 +1,207 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from heapq import heapify, heappop, heappush
+from itertools import count
+from typing import Iterable, Mapping
+
+
+@dataclass(eq=False)
+class DutyCandidate:
+    """Проживающий, участвующий в распределении дежурств"""
+
+    pk: int
+    room_id: int | None = None
+    duties_count: int = 0
+    duty_dates: set[date] = field(default_factory=set)
+
+
+class BaseDutyConstraint(ABC):
+    """
+    Базовый класс для ограничений при распределении дежурств.
+    """
+
+    @property
+    def lookbehind_days(self) -> int:
+        """Сколько дней до начала графика нужно знать для проверки ограничения"""
+        return 0
+
+    @abstractmethod
+    def is_allowed(
+        self, candidate: DutyCandidate, day: date, assigned: list[DutyCandidate]
+    ) -> bool:
+        """
+        Проверить, можно ли назначить проживающего на дежурство.
+
+        :param candidate: Проживающий, которого хотят назначить.
+        :param day: Дата дежурства.
+        :param assigned: Проживающие, уже назначенные на эту дату.
+        """
+        ...
+
+
+class MinimumGapConstraint(BaseDutyConstraint):
+    """Между двумя дежурствами одного проживающего должно пройти не меньше :min_days дней"""
+
+    def __init__(self, min_days: int) -> None:
+        self._min_days = min_days
+
+    @property
+    def lookbehind_days(self) -> int:
+        return self._min_days - 1
+
+    def is_allowed(
+        self, candidate: DutyCandidate, day: date, assigned: list[DutyCandidate]
+    ) -> bool:
+        for offset in range(1, self._min_days):
+            delta = timedelta(days=offset)
+            if (
+                day - delta in candidate.duty_dates
+                or day + delta in candidate.duty_dates
+            ):
+                return False
+        return True
+
+
+class NoBackToBackConstraint(MinimumGapConstraint):
+    """Проживающий не может дежурить два дня подряд"""
+
+    def __init__(self) -> None:
+        super().__init__(min_days=2)
+
+
+class DistinctRoomsConstraint(BaseDutyConstraint):
+    """В один день не могут дежурить двое проживающих из одной комнаты"""
+
+    def is_allowed(
+        self, candidate: DutyCandidate, day: date, assigned: list[DutyCandidate]
+    ) -> bool:
+        if candidate.room_id is None:
+            return True
+        return all(pupil.room_id != candidate.room_id for pupil in assigned)
+
+
+class BaseDutyAllocator(ABC):
+    """
+    Базовый класс для алгоритмов распределения дежурств.
+    """
+
+    def __init__(self, constraints: Iterable[BaseDutyConstraint] = ()) -> None:
+        """
+        :param constraints: Ограничения, которые проверяются при каждом назначении.
+        """
+        self._constraints = tuple(constraints)
+
+    @property
+    def lookbehind_days(self) -> int:
+        """Сколько дней до начала графика нужно знать для проверки ограничений"""
+        return max(
+            (constraint.lookbehind_days for constraint in self._constraints), default=0
+        )
+
+    def is_allowed(
+        self, candidate: DutyCandidate, day: date, assigned: list[DutyCandidate]
+    ) -> bool:
+        """Проверить, удовлетворяет ли назначение всем ограничениям"""
+        if day in candidate.duty_dates:
+            return False
+        return all(
+            constraint.is_allowed(candidate, day, assigned)
+            for constraint in self._constraints
+        )
+
+    @abstractmethod
+    def allocate(
+        self,
+        candidates: Iterable[DutyCandidate],
+        demand: Mapping[date, int],
+        assigned: Mapping[date, Iterable[int]] | None = None,
+    ) -> dict[date, list[int]]:
+        """
+        Распределить дежурства.
+
+        :param candidates: Проживающие в порядке приоритета.
+        :param demand: Сколько дежурных нужно добавить на каждую дату.
+        :param assigned: Проживающие, которые уже назначены на даты из :demand.
+        :returns: Идентификаторы новых назначенных проживающих по датам.
+        """
+        ...
+
+
+class HeapDutyAllocator(BaseDutyAllocator):
+    """
+    Распределяет дежурства через очередь с приоритетом по количеству дежурств.
+
+    На каждую дату выбираются проживающие с наименьшим текущим количеством
+    дежурств, после назначения их приоритет пересчитывается, поэтому нагрузка
+    выравнивается внутри всего графика. При равном количестве раньше
+    назначается тот, кто дольше не дежурил.
+    """
+
+    def __init__(
+        self, constraints: Iterable[BaseDutyConstraint] = (), strict: bool = False
+    ) -> None:
+        """
+        :param constraints: Ограничения, которые проверяются при каждом назначении.
+        :param strict: Если False, то при нехватке подходящих проживающих
+            день добирается без учета ограничений.
+        """
+        super().__init__(constraints)
+        self._strict = strict
+
+    def allocate(
+        self,
+        candidates: Iterable[DutyCandidate],
+        demand: Mapping[date, int],
+        assigned: Mapping[date, Iterable[int]] | None = None,
+    ) -> dict[date, list[int]]:
+        sequence = count()
+        heap = [
+            (candidate.duties_count, next(sequence), candidate)
+            for candidate in candidates
+        ]
+        heapify(heap)
+        candidates_by_pk = {entry[-1].pk: entry[-1] for entry in heap}
+        assigned = assigned or {}
+
+        schedule = {}
+        for day in sorted(demand):
+            present = [
+                candidates_by_pk[pk]
+                for pk in assigned.get(day, ())
+                if pk in candidates_by_pk
+            ]
+            chosen = []
+            skipped = []
+            while heap and len(chosen) < demand[day]:
+                entry = heappop(heap)
+                if self.is_allowed(entry[-1], day, present + chosen):
+                    chosen.append(entry[-1])
+                else:
+                    skipped.append(entry)
+
+            if not self._strict:
+                remaining = []
+                for entry in skipped:
+                    if len(chosen) < demand[day] and day not in entry[-1].duty_dates:
+                        chosen.append(entry[-1])
+                    else:
+                        remaining.append(entry)
+                skipped = remaining
+
+            for entry in skipped:
+                heappush(heap, entry)
+            for candidate in chosen:
+                candidate.duties_count += 1
+                candidate.duty_dates.add(day)
+                heappush(heap, (candidate.duties_count, next(sequence), candidate))
+
+            schedule[day] = [candidate.pk for candidate in chosen]
+        return schedule
+
+
+def get_default_duty_allocator() -> BaseDutyAllocator:
+    """Алгоритм распределения, который используется при генерации графика"""
+    return HeapDutyAllocator(
+        constraints=(NoBackToBackConstraint(), DistinctRoomsConstraint())
+    )
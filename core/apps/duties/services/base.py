@@ -1,17 +1,136 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterable, Literal
 
-from core.apps.duties.models import SwapDutiesRequest, SwapPeopleRequest
+from django.db import IntegrityError
+from django.db.models import Exists, OuterRef, Q, Subquery
+from django.db.transaction import atomic
+from rest_framework.exceptions import APIException, NotFound
+
+from core.apps.common.events import publish_user_event
+from core.apps.duties.choices import (
+    SWAP_REQUEST_ACCEPTED,
+    SWAP_REQUEST_CANCELED,
+    SWAP_REQUEST_DECLINED,
+    SWAP_REQUEST_PENDING,
+)
+from core.apps.duties.exceptions import DutySwapException, SwapRequestStatusException
+from core.apps.duties.models import KitchenDuty, SwapDutiesRequest, SwapPeopleRequest
 from core.apps.users.models import CustomUser as UserModel
 
 
 type SwapRequest = SwapPeopleRequest | SwapDutiesRequest
 
 
+SWAP_REQUEST_STATUS_FILTERS = {
+    "pending": Q(status=SWAP_REQUEST_PENDING),
+    "accepted": Q(status=SWAP_REQUEST_ACCEPTED),
+    "declined": Q(status=SWAP_REQUEST_DECLINED),
+    "canceled": Q(status=SWAP_REQUEST_CANCELED),
+}
+
+
+SWAP_REQUEST_EVENTS = {
+    SWAP_REQUEST_ACCEPTED: "accepted",
+    SWAP_REQUEST_DECLINED: "declined",
+    SWAP_REQUEST_CANCELED: "canceled",
+}
+
+
+type SwapRequestOperation = Literal["accept", "decline", "cancel"]
+
+
+@dataclass
+class SwapBatchResult:
+    """Результат действия над одной заявкой из пакета"""
+
+    pk: int
+    success: bool
+    status: int | None = None
+    detail: str | None = None
+
+
 class BaseSwapRequestService(ABC):
     """
     Базовый класс для сервисов обмена.
+
+    Изменение заявки выполняется в транзакции: сначала блокируются
+    затронутые дежурства в порядке возрастания id, затем сама заявка,
+    и только после этого проверяется ее статус. Статус меняется условным
+    UPDATE, поэтому из параллельных действий над заявкой проходит одно.
+
+    О создании заявки и каждой смене статуса обоим участникам отправляется
+    событие после фиксации транзакции.
     """
 
+    model: type[SwapRequest]
+    request_type: str
+    _object: SwapRequest
+
+    @classmethod
+    def batch(
+        cls,
+        user: UserModel,
+        ids: Iterable[int],
+        operation: SwapRequestOperation,
+    ) -> list[SwapBatchResult]:
+        """
+        Выполнить :operation над несколькими заявками в одной транзакции.
+
+        Заявки загружаются одним запросом, действие над каждой выполняется
+        во вложенной транзакции, поэтому ошибка по одной заявке не отменяет
+        остальные.
+        Перед действиями все дежурства заявок блокируются одним запросом,
+        затем все заявки, каждые в порядке возрастания id. Порядок тот же,
+        что у одиночных действий и у исполнения циклов обмена, поэтому
+        пересекающиеся пакеты не блокируют друг друга взаимно.
+
+        :param operation: accept, decline или cancel.
+        :returns: Результаты в порядке :ids.
+        """
+        ids = list(dict.fromkeys(ids))
+        results = []
+        with atomic():
+            requests = cls.model.objects.in_bulk(ids)
+            cls._lock_duties(
+                *(
+                    duty_id
+                    for request in requests.values()
+                    for duty_id in cls(user, request).get_duty_ids()
+                )
+            )
+            list(
+                cls.model.objects.select_for_update()
+                .filter(pk__in=requests)
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+            for pk in ids:
+                if (request := requests.get(pk)) is None:
+                    results.append(
+                        SwapBatchResult(
+                            pk=pk, success=False, detail="Заявка не найдена"
+                        )
+                    )
+                    continue
+                try:
+                    getattr(cls(user, request), operation)()
+                except APIException as exception:
+                    request.refresh_from_db(fields=["status"])
+                    results.append(
+                        SwapBatchResult(
+                            pk=pk,
+                            success=False,
+                            status=request.status,
+                            detail=str(exception.detail),
+                        )
+                    )
+                else:
+                    results.append(
+                        SwapBatchResult(pk=pk, success=True, status=request.status)
+                    )
+        return results
+
     def create(self, *args, **kwargs) -> SwapRequest:
         """Создать заявку"""
         ...
@@ -30,3 +149,120 @@ class BaseSwapRequestService(ABC):
     def cancel(self, user: UserModel) -> None:
         """Отменить заявку"""
         ...
+
+    @abstractmethod
+    def get_participants(self) -> tuple[int, int]:
+        """Получить id инициатора и адресата заявки"""
+        ...
+
+    @abstractmethod
+    def get_duty_ids(self) -> tuple[int, ...]:
+        """Получить id дежурств, которые меняет заявка"""
+        ...
+
+    @classmethod
+    def publish_event(
+        cls, pk: int, status: int, event: str, user_ids: Iterable[int]
+    ) -> None:
+        """
+        Отправить событие по заявке пользователям :user_ids.
+
+        :param event: created, accepted, declined или canceled.
+        """
+        publish_user_event(
+            list(user_ids),
+            {"event": event, "type": cls.request_type, "id": pk, "status": status},
+        )
+
+    def _notify(self, event: str) -> None:
+        """Отправить событие по текущей заявке обоим участникам"""
+        self.publish_event(
+            self._object.pk, self._object.status, event, self.get_participants()
+        )
+
+    @staticmethod
+    def _get_membership(
+        duty_ids: Iterable[int], initiator_id: int, target_id: int
+    ) -> dict[int, dict]:
+        """
+        Проверить дежурства и участников заявки одним запросом.
+
+        Для каждого найденного дежурства возвращает initiator_on_duty и
+        target_on_duty (стоит ли участник на дежурстве), а также
+        target_is_resident (None, если пользователя :target_id нет).
+
+        :raises NotFound: Если дежурство или пользователь :target_id не найдены.
+        :returns: Результат проверки по id дежурства.
+        """
+        duty_ids = set(duty_ids)
+        people = KitchenDuty.people.through.objects.filter(
+            kitchenduty_id=OuterRef("pk")
+        )
+        rows = (
+            KitchenDuty.objects.filter(pk__in=duty_ids)
+            .annotate(
+                initiator_on_duty=Exists(people.filter(customuser_id=initiator_id)),
+                target_on_duty=Exists(people.filter(customuser_id=target_id)),
+                target_is_resident=Subquery(
+                    UserModel.objects.filter(pk=target_id).values("resident")
+                ),
+            )
+            .values("pk", "initiator_on_duty", "target_on_duty", "target_is_resident")
+        )
+        membership = {row.pop("pk"): row for row in rows}
+        if len(membership) != len(duty_ids):
+            raise NotFound("Дежурство не найдено")
+        if any(row["target_is_resident"] is None for row in membership.values()):
+            raise NotFound("Пользователь не найден")
+        return membership
+
+    @classmethod
+    def _create_pending(cls, **fields) -> SwapRequest:
+        """
+        Создать заявку со статусом ожидания.
+
+        :raises DutySwapException: Если такая же заявка уже ожидает ответа.
+        """
+        try:
+            with atomic():
+                return cls.model.objects.create(**fields)
+        except IntegrityError:
+            raise DutySwapException("Такая заявка уже ожидает ответа")
+
+    @staticmethod
+    def _lock_duties(*duty_ids: int) -> dict[int, KitchenDuty]:
+        """
+        Заблокировать дежурства до конца транзакции.
+
+        Блокировки берутся в порядке возрастания id, поэтому встречные
+        обмены одних и тех же дежурств не приводят к взаимной блокировке.
+
+        :returns: Актуальные дежурства по id.
+        """
+        duties = KitchenDuty.objects.select_for_update().filter(pk__in=duty_ids)
+        return {duty.pk: duty for duty in duties.order_by("pk")}
+
+    def _lock_request(self) -> None:
+        """Заблокировать заявку до конца транзакции и перечитать ее статус"""
+        self._object.status = (
+            type(self._object)
+            .objects.select_for_update()
+            .values_list("status", flat=True)
+            .get(pk=self._object.pk)
+        )
+
+    def _set_status(self, status: int) -> None:
+        """
+        Перевести заявку из ожидания в :status.
+
+        :raises SwapRequestStatusException: Если заявка уже не ожидает ответа.
+        """
+        updated = (
+            type(self._object)
+            .objects.filter(pk=self._object.pk, status=SWAP_REQUEST_PENDING)
+            .update(status=status)
+        )
+        if not updated:
+            raise SwapRequestStatusException
+        self._object.status = status
+        self._notify(SWAP_REQUEST_EVENTS[status])
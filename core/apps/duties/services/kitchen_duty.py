@@ -1,5 +1,8 @@
+from django.db.transaction import atomic
+
 from core.apps.duties.exceptions import DutyIsLockedException, DutySwapException
 from core.apps.duties.models import KitchenDuty
+from core.apps.duties.services.stats import DutyStatsService
 from core.apps.users.models import CustomUser as UserModel
 
 
@@ -13,21 +16,29 @@ class KitchenDutyService:
 
     def finish(self) -> None:
         """Завершает дежурство, запрещая его редактировать"""
-        self._object.finished = True
-        self._object.save()
+        with atomic():
+            finished = KitchenDuty.objects.filter(
+                pk=self._object.pk, finished=False
+            ).update(finished=True)
+            self._object.finished = True
+            if finished:
+                DutyStatsService.duty_finished(self._object)
 
     def swap_pupils(self, current: UserModel, new: UserModel) -> None:
         if self._object.finished:
             raise DutyIsLockedException(
                 f"Дежурство {self._object} окончено и недоступно для изменения"
             )
-        if current not in self._object.people.all() or new in self._object.people.all():
+        people = {person.pk for person in self._object.people.all()}
+        if current.pk not in people or new.pk in people:
             raise DutySwapException(
                 f"Невозможно провести замену дежурного {current} на {new}"
             )
         self._swap_pupils(current, new)
 
     def _swap_pupils(self, current: UserModel, new: UserModel) -> None:
-        self._object.people.remove(current)
-        self._object.people.add(new)
-        self._object.save()
+        with atomic():
+            self._object.people.remove(current)
+            self._object.people.add(new)
+            self._object.save()
+            DutyStatsService.pupils_swapped(self._object, current, new)
@@ -0,0 +1,146 @@
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Iterable, Mapping
+
+from django.db.models import Case, Count, F, Q, QuerySet, When
+from django.db.models.functions import ExtractYear, Greatest
+from django.db.transaction import atomic
+
+from core.apps.common.services import get_academic_year
+from core.apps.duties.models import DutyStats, KitchenDuty
+from core.apps.users.models import CustomUser as UserModel
+
+
+class DutyStatsService:
+    """
+    Сервис для работы со статистикой дежурств проживающих.
+
+    Статистика обновляется инкрементально при изменениях дежурств,
+    чтобы не агрегировать всю историю дежурств при каждом чтении.
+    """
+
+    @classmethod
+    def get_for_year(cls, academic_year: int | None = None) -> QuerySet[DutyStats]:
+        """
+        Получить статистику за учебный год.
+
+        :param academic_year: Год начала учебного года, по умолчанию текущий.
+        """
+        if academic_year is None:
+            academic_year = get_academic_year(date.today())
+        return DutyStats.objects.filter(academic_year=academic_year)
+
+    @classmethod
+    def duties_assigned(cls, schedule: Mapping[date, Iterable[int]]) -> None:
+        """
+        Учесть назначенные дежурства.
+
+        :param schedule: Идентификаторы назначенных проживающих по датам.
+        """
+        cls._apply(
+            "duties_count",
+            Counter(
+                (pupil_id, get_academic_year(day))
+                for day, people in schedule.items()
+                for pupil_id in people
+            ),
+        )
+
+    @classmethod
+    def duty_finished(cls, duty: KitchenDuty) -> None:
+        """Учесть завершение дежурства всеми его дежурными"""
+        cls.duties_finished(
+            (pupil_id, duty.date)
+            for pupil_id in duty.people.values_list("pk", flat=True)
+        )
+
+    @classmethod
+    def duties_finished(cls, assignments: Iterable[tuple[int, date]]) -> None:
+        """
+        Учесть завершение нескольких дежурств.
+
+        :param assignments: Пары (идентификатор дежурного, дата дежурства).
+        """
+        cls._apply(
+            "finished_duties_count",
+            Counter(
+                (pupil_id, get_academic_year(day)) for pupil_id, day in assignments
+            ),
+        )
+
+    @classmethod
+    def pupils_swapped(
+        cls, duty: KitchenDuty, current: UserModel, new: UserModel
+    ) -> None:
+        """Перенести дежурство из статистики :current в статистику :new"""
+        academic_year = get_academic_year(duty.date)
+        deltas = {(current.pk, academic_year): -1, (new.pk, academic_year): 1}
+        cls._apply("duties_count", deltas)
+        if duty.finished:
+            cls._apply("finished_duties_count", deltas)
+
+    @classmethod
+    def rebuild(cls, academic_year: int | None = None) -> int:
+        """
+        Пересчитать статистику с нуля по дежурствам.
+
+        :param academic_year: Пересчитать только этот учебный год.
+        :returns: Количество записей статистики.
+        """
+        through_model = KitchenDuty.people.through
+        assignments = through_model.objects.annotate(
+            academic_year=Case(
+                When(
+                    kitchenduty__date__month__gte=9,
+                    then=ExtractYear("kitchenduty__date"),
+                ),
+                default=ExtractYear("kitchenduty__date") - 1,
+            )
+        )
+        stats = DutyStats.objects.all()
+        if academic_year is not None:
+            assignments = assignments.filter(academic_year=academic_year)
+            stats = stats.filter(academic_year=academic_year)
+        rows = assignments.values("customuser_id", "academic_year").annotate(
+            duties_count=Count("pk"),
+            finished_duties_count=Count("pk", filter=Q(kitchenduty__finished=True)),
+        )
+
+        with atomic():
+            stats.delete()
+            created = DutyStats.objects.bulk_create(
+                DutyStats(
+                    user_id=row["customuser_id"],
+                    academic_year=row["academic_year"],
+                    duties_count=row["duties_count"],
+                    finished_duties_count=row["finished_duties_count"],
+                )
+                for row in rows
+            )
+        return len(created)
+
+    @classmethod
+    def _apply(cls, field_name: str, deltas: Mapping[tuple[int, int], int]) -> None:
+        """
+        Изменить счетчик :field_name на величины из :deltas.
+
+        Недостающие записи создаются одним запросом, изменения группируются
+        по величине, поэтому количество запросов не зависит от числа людей.
+        """
+        if not deltas:
+            return
+        DutyStats.objects.bulk_create(
+            (
+                DutyStats(user_id=user_id, academic_year=academic_year)
+                for user_id, academic_year in deltas
+            ),
+            ignore_conflicts=True,
+        )
+        grouped = defaultdict(list)
+        for (user_id, academic_year), delta in deltas.items():
+            if delta:
+                grouped[(academic_year, delta)].append(user_id)
+        for (academic_year, delta), user_ids in grouped.items():
+            DutyStats.objects.filter(
+                academic_year=academic_year, user_id__in=user_ids
+            ).update(**{field_name: Greatest(F(field_name) + delta, 0)})
@@ -0,0 +1,221 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Mapping
+
+from django.db.transaction import atomic
+
+from core.apps.duties.choices import SWAP_REQUEST_ACCEPTED, SWAP_REQUEST_PENDING
+from core.apps.duties.exceptions import DutyIsLockedException, DutySwapException
+from core.apps.duties.models import KitchenDuty, SwapDutiesRequest
+from core.apps.duties.services.base import BaseSwapRequestService
+from core.apps.duties.services.kitchen_duty import KitchenDutyService
+from core.apps.duties.services.swap_duties import SwapDutiesService
+from core.apps.users.models import CustomUser as UserModel
+
+
+SWAP_CYCLE_MAX_LENGTH = 4
+
+
+@dataclass(frozen=True)
+class SwapHolding:
+    """Проживающий на конкретном дежурстве"""
+
+    user_id: int
+    duty_id: int
+
+
+@dataclass(frozen=True)
+class SwapEdge:
+    """Заявка на обмен: :source готов отдать свое дежурство за дежурство :target"""
+
+    request_id: int
+    source: SwapHolding
+    target: SwapHolding
+
+
+def find_swap_cycles(
+    edges: Iterable[SwapEdge],
+    max_length: int = SWAP_CYCLE_MAX_LENGTH,
+    duty_people: Mapping[int, Iterable[int]] | None = None,
+) -> list[list[SwapEdge]]:
+    """
+    Найти непересекающиеся циклы обмена длиной от 2 до :max_length.
+
+    Цикл A -> B -> C -> A означает, что A получает дежурство B, B получает
+    дежурство C, а C получает дежурство A. Циклы ищутся жадно в порядке
+    :edges, для каждой вершины сначала самые короткие, поэтому более старые
+    заявки исполняются раньше. Проживающие и дежурства в найденных циклах
+    не повторяются.
+
+    :param edges: Ожидающие заявки в порядке приоритета.
+    :param duty_people: Текущие дежурные по дежурствам, заявки, по которым
+        проживающий получил бы дежурство, на котором уже стоит, пропускаются.
+    """
+    duty_people = {
+        duty_id: set(people) for duty_id, people in (duty_people or {}).items()
+    }
+    adjacency = defaultdict(list)
+    for edge in edges:
+        if (
+            edge.source.user_id == edge.target.user_id
+            or edge.source.duty_id == edge.target.duty_id
+            or edge.source.user_id in duty_people.get(edge.target.duty_id, ())
+        ):
+            continue
+        adjacency[edge.source].append(edge)
+
+    used_users = set()
+    used_duties = set()
+
+    def is_free(holding: SwapHolding) -> bool:
+        return holding.user_id not in used_users and holding.duty_id not in used_duties
+
+    def find_cycle(start: SwapHolding, length: int) -> list[SwapEdge] | None:
+        stack = [(start, [], {start.user_id}, {start.duty_id})]
+        while stack:
+            holding, path, users, duties = stack.pop()
+            for edge in reversed(adjacency.get(holding, ())):
+                target = edge.target
+                if target == start and len(path) + 1 == length:
+                    return path + [edge]
+                if (
+                    len(path) + 1 >= length
+                    or target.user_id in users
+                    or target.duty_id in duties
+                    or not is_free(target)
+                ):
+                    continue
+                stack.append(
+                    (
+                        target,
+                        path + [edge],
+                        users | {target.user_id},
+                        duties | {target.duty_id},
+                    )
+                )
+        return None
+
+    cycles = []
+    for start in list(adjacency):
+        if not is_free(start):
+            continue
+        for length in range(2, max_length + 1):
+            if cycle := find_cycle(start, length):
+                cycles.append(cycle)
+                for edge in cycle:
+                    used_users.add(edge.source.user_id)
+                    used_duties.add(edge.source.duty_id)
+                break
+    return cycles
+
+
+class SwapCycleService:
+    """
+    Сервис для исполнения обменов дежурствами по цепочкам заявок.
+
+    Ожидающие заявки на обмен образуют граф, каждый найденный цикл
+    исполняется отдельной транзакцией: все заявки цикла принимаются вместе
+    или не принимается ни одна.
+    """
+
+    @classmethod
+    def match(cls, max_length: int = SWAP_CYCLE_MAX_LENGTH) -> int:
+        """
+        Найти и исполнить циклы обмена среди ожидающих заявок.
+
+        :returns: Количество исполненных циклов.
+        """
+        edges = cls.get_pending_edges()
+        duty_ids = {edge.source.duty_id for edge in edges} | {
+            edge.target.duty_id for edge in edges
+        }
+        cycles = find_swap_cycles(edges, max_length, cls.get_duty_people(duty_ids))
+        return sum(cls.execute_cycle(cycle) for cycle in cycles)
+
+    @classmethod
+    def get_pending_edges(cls) -> list[SwapEdge]:
+        """Получить ожидающие заявки на обмен будущих дежурств одним запросом"""
+        today = date.today()
+        rows = (
+            SwapDutiesRequest.objects.filter(
+                status=SWAP_REQUEST_PENDING,
+                first_duty__finished=False,
+                first_duty__date__gte=today,
+                second_duty__finished=False,
+                second_duty__date__gte=today,
+            )
+            .order_by("created_at", "pk")
+            .values_list(
+                "pk",
+                "first_user_id",
+                "first_duty_id",
+                "second_user_id",
+                "second_duty_id",
+            )
+        )
+        return [
+            SwapEdge(
+                request_id=pk,
+                source=SwapHolding(user_id=first_user_id, duty_id=first_duty_id),
+                target=SwapHolding(user_id=second_user_id, duty_id=second_duty_id),
+            )
+            for pk, first_user_id, first_duty_id, second_user_id, second_duty_id in rows
+        ]
+
+    @classmethod
+    def get_duty_people(cls, duty_ids: Iterable[int]) -> dict[int, set[int]]:
+        """Получить текущих дежурных по дежурствам одним запросом"""
+        duty_people = defaultdict(set)
+        rows = KitchenDuty.people.through.objects.filter(
+            kitchenduty_id__in=duty_ids
+        ).values_list("kitchenduty_id", "customuser_id")
+        for duty_id, user_id in rows:
+            duty_people[duty_id].add(user_id)
+        return duty_people
+
+    @classmethod
+    def execute_cycle(cls, cycle: list[SwapEdge]) -> bool:
+        """
+        Исполнить цикл обмена.
+
+        Дежурства и заявки блокируются в том же порядке, что и при принятии
+        одной заявки, после чего состояние проверяется заново. Если какая-то
+        заявка уже не ожидает ответа или дежурные сменились, цикл пропускается.
+
+        :returns: True, если цикл исполнен.
+        """
+        request_ids = [edge.request_id for edge in cycle]
+        try:
+            with atomic():
+                duties = BaseSwapRequestService._lock_duties(
+                    *(edge.source.duty_id for edge in cycle)
+                )
+                pending = list(
+                    SwapDutiesRequest.objects.select_for_update()
+                    .filter(pk__in=request_ids, status=SWAP_REQUEST_PENDING)
+                    .order_by("pk")
+                    .values_list("pk", flat=True)
+                )
+                if len(pending) != len(cycle) or len(duties) != len(cycle):
+                    return False
+                users = UserModel.objects.in_bulk(
+                    [edge.source.user_id for edge in cycle]
+                )
+                for previous, edge in zip(cycle[-1:] + cycle[:-1], cycle):
+                    KitchenDutyService(duties[edge.source.duty_id]).swap_pupils(
+                        users[edge.source.user_id], users[previous.source.user_id]
+                    )
+                SwapDutiesRequest.objects.filter(pk__in=request_ids).update(
+                    status=SWAP_REQUEST_ACCEPTED
+                )
+                for edge in cycle:
+                    SwapDutiesService.publish_event(
+                        edge.request_id,
+                        SWAP_REQUEST_ACCEPTED,
+                        "accepted",
+                        (edge.source.user_id, edge.target.user_id),
+                    )
+        except (DutySwapException, DutyIsLockedException):
+            return False
+        return True
@@ -1,5 +1,10 @@
 from django.db.transaction import atomic
 
+from core.apps.duties.choices import (
+    SWAP_REQUEST_ACCEPTED,
+    SWAP_REQUEST_CANCELED,
+    SWAP_REQUEST_DECLINED,
+)
 from core.apps.duties.exceptions import DutySwapException, SwapRequestStatusException
 from core.apps.duties.models import KitchenDuty, SwapDutiesRequest
 from core.apps.duties.services import BaseSwapRequestService, KitchenDutyService
@@ -12,6 +17,10 @@ class SwapDutiesService(BaseSwapRequestService):
     Сервис для работы с заявками на обмен дежурствами.
     """
 
+    model = SwapDutiesRequest
+
+    request_type = "swap_duties"
+
     def __init__(self, current_user: UserModel, object: SwapDutiesRequest) -> None:
         """
         :param current_user: Текущий пользователь при работе сервиса.
@@ -28,29 +37,57 @@ class SwapDutiesService(BaseSwapRequestService):
     def create(
         cls,
         initiator: UserModel,
-        initiator_duty: KitchenDuty,
-        target: UserModel,
-        target_duty: KitchenDuty,
+        initiator_duty: KitchenDuty | int,
+        target: UserModel | int,
+        target_duty: KitchenDuty | int,
     ) -> SwapDutiesRequest:
         """
         Создать запрос на обмен дежурствами.
 
+        Существование дежурств и пользователя, роль и дежурства участников
+        проверяются одним запросом.
+
         :param initiator: Пользователь, который создает запрос.
-        :param initiator_duty: Дежурство инициатора заявки.
-        :param target: Пользователь, которому направлен запрос.
-        :param target_duty: Дежурство, на которое направлен запрос.
+        :param initiator_duty: Дежурство инициатора заявки или его id.
+        :param target: Пользователь, которому направлен запрос, или его id.
+        :param target_duty: Дежурство, на которое направлен запрос, или его id.
+        :raises NotFound: Если дежурство или target не найдены.
+        :raises RoleViolationException: Если пользователи не являются проживающими.
+        :raises DutySwapException: Если пользователи или дежурства идентичны.
+        :raises DutySwapException: Если участники не стоят на своих дежурствах
+            или уже стоят на дежурстве друг друга.
+        :raises DutySwapException: Если такая же заявка уже ожидает ответа.
         """
-        if not cls.user_is_resident(initiator) or not cls.user_is_resident(target):
+        initiator_duty_id = getattr(initiator_duty, "pk", initiator_duty)
+        target_duty_id = getattr(target_duty, "pk", target_duty)
+        target_id = getattr(target, "pk", target)
+        if not cls.user_is_resident(initiator):
             raise RoleViolationException("Пользователи должны быть жителями общежития")
-        if initiator == target:
+        if initiator.pk == target_id:
             raise DutySwapException(
                 "Невозможно создать заявку на обмен между идентичными пользователями"
             )
-        if initiator_duty == target_duty:
+        if initiator_duty_id == target_duty_id:
             raise DutySwapException(
                 "Невозможно создать заявку на обмен между идентичными дежурствами"
             )
-        return cls._create(initiator, initiator_duty, target, target_duty)
+        membership = cls._get_membership(
+            (initiator_duty_id, target_duty_id), initiator.pk, target_id
+        )
+        own, other = membership[initiator_duty_id], membership[target_duty_id]
+        if not own["target_is_resident"]:
+            raise RoleViolationException("Пользователи должны быть жителями общежития")
+        if not own["initiator_on_duty"] or other["initiator_on_duty"]:
+            raise DutySwapException(
+                f"Дежурный {initiator} должен стоять только на дежурстве {initiator_duty}"
+            )
+        if not other["target_on_duty"] or own["target_on_duty"]:
+            raise DutySwapException(
+                f"Дежурный {target} должен стоять только на дежурстве {target_duty}"
+            )
+        request = cls._create(initiator, initiator_duty_id, target_id, target_duty_id)
+        cls(initiator, request)._notify("created")
+        return request
 
     def accept(self) -> None:
         """
@@ -59,16 +96,25 @@ class SwapDutiesService(BaseSwapRequestService):
         :param user: Пользователь, который принимает запрос. Используется для валидации.
         :raises SwapRequestStatusException: Если статус запроса не позволяет принять его.
         :raises DutySwapException: Если запрос не направлен пользователю.
+        :raises DutySwapException: Если дежурные уже не принадлежат своим дежурствам.
+        :raises DutyIsLockedException: Если одно из дежурств завершено.
         """
-        if not self.request_is_mutable():
-            raise SwapRequestStatusException(
-                "Невозможно принять заявку из-за ее текущего статуса"
-            )
-        if not self.is_target_user(self._user):
-            raise DutySwapException(
-                f"Пользователь {self._user} не может принять заявку {self._object}, так как не имеет к ней доступа"
+        with atomic():
+            duties = self._lock_duties(
+                self._object.first_duty_id, self._object.second_duty_id
             )
-        self._swap_duties()
+            self._lock_request()
+            if not self.request_is_mutable():
+                raise SwapRequestStatusException(
+                    "Невозможно принять заявку из-за ее текущего статуса"
+                )
+            if not self.is_target_user(self._user):
+                raise DutySwapException(
+                    f"Пользователь {self._user} не может принять заявку {self._object}, так как не имеет к ней доступа"
+                )
+            self._object.first_duty = duties[self._object.first_duty_id]
+            self._object.second_duty = duties[self._object.second_duty_id]
+            self._swap_duties()
 
     def cancel(self) -> None:
         """
@@ -77,15 +123,17 @@ class SwapDutiesService(BaseSwapRequestService):
         :param owner: Владелец заявки. Используется для валидации.
         :raises SwapRequestStatusException: Если статус запроса не позволяет отменить его.
         """
-        if not self.request_is_mutable():
-            raise SwapRequestStatusException(
-                "Невозможно отклонить запрос из-за его текущего статуса"
-            )
-        if not self.is_owner_user(self._user):
-            raise DutySwapException(
-                f"Пользователь {self._user} не может отменить запрос {self._object}, так как не имеет к ней доступа"
-            )
-        self._cancel()
+        with atomic():
+            self._lock_request()
+            if not self.request_is_mutable():
+                raise SwapRequestStatusException(
+                    "Невозможно отклонить запрос из-за его текущего статуса"
+                )
+            if not self.is_owner_user(self._user):
+                raise DutySwapException(
+                    f"Пользователь {self._user} не может отменить запрос {self._object}, так как не имеет к ней доступа"
+                )
+            self._cancel()
 
     def decline(self) -> None:
         """
@@ -95,23 +143,31 @@ class SwapDutiesService(BaseSwapRequestService):
         :raises SwapRequestStatusException: Если статус запроса не позволяет отклонить его.
         :raise DutySwapException: Если запрос не направлен пользователю.
         """
-        if not self.request_is_mutable():
-            raise SwapRequestStatusException(
-                "Невозможно отклонить запрос из-за его текущего статуса"
-            )
-        if not self.is_target_user(self._user):
-            raise DutySwapException(
-                f"Пользователь {self._user} не может отклонить заявку {self._object}, так как не имеет к ней доступа"
-            )
-        self._decline()
+        with atomic():
+            self._lock_request()
+            if not self.request_is_mutable():
+                raise SwapRequestStatusException(
+                    "Невозможно отклонить запрос из-за его текущего статуса"
+                )
+            if not self.is_target_user(self._user):
+                raise DutySwapException(
+                    f"Пользователь {self._user} не может отклонить заявку {self._object}, так как не имеет к ней доступа"
+                )
+            self._decline()
 
     def is_target_user(self, user: UserModel) -> bool:
         """Проверить, является ли пользователь целью запроса"""
-        return self._object.second_user == user
+        return self._object.second_user_id == user.pk
 
     def is_owner_user(self, user: UserModel) -> bool:
         """Проверить, является ли пользователь владельцем запроса"""
-        return self._object.first_user == user
+        return self._object.first_user_id == user.pk
+
+    def get_participants(self) -> tuple[int, int]:
+        return self._object.first_user_id, self._object.second_user_id
+
+    def get_duty_ids(self) -> tuple[int, ...]:
+        return self._object.first_duty_id, self._object.second_duty_id
 
     def request_is_mutable(self) -> bool:
         """Проверить, можно ли изменять запрос"""
@@ -127,37 +183,38 @@ class SwapDutiesService(BaseSwapRequestService):
     def _create(
         cls,
         initiator: UserModel,
-        initiator_duty: KitchenDuty,
-        target: UserModel,
-        target_duty: KitchenDuty,
+        initiator_duty_id: int,
+        target_id: int,
+        target_duty_id: int,
     ) -> SwapDutiesRequest:
-        return SwapDutiesRequest.objects.create(
-            first_duty=initiator_duty,
+        return cls._create_pending(
+            first_duty_id=initiator_duty_id,
             first_user=initiator,
-            second_duty=target_duty,
-            second_user=target,
+            second_duty_id=target_duty_id,
+            second_user_id=target_id,
         )
 
     def _cancel(self):
         """Отменить запрос на обмен дежурствами"""
-        self._object.canceled = True
-        self._object.save()
+        self._set_status(SWAP_REQUEST_CANCELED)
 
     def _decline(self):
         """Отклонить запрос на обмен дежурствами"""
-        self._object.declined = True
-        self._object.save()
+        self._set_status(SWAP_REQUEST_DECLINED)
 
     def _swap_duties(self) -> None:
-        """Произвести обмен дежурствами"""
+        """
+        Произвести обмен дежурствами.
+
+        Вызывается внутри транзакции accept, после блокировки обоих дежурств.
+        """
         initiator_duty_service = KitchenDutyService(self._object.first_duty)
         target_duty_service = KitchenDutyService(self._object.second_duty)
         with atomic():
-            initiator_duty_service._swap_pupils(
+            initiator_duty_service.swap_pupils(
                 self._object.first_user, self._object.second_user
             )
-            target_duty_service._swap_pupils(
+            target_duty_service.swap_pupils(
                 self._object.second_user, self._object.first_user
             )
-            self._object.accepted = True
-            self._object.save()
+            self._set_status(SWAP_REQUEST_ACCEPTED)
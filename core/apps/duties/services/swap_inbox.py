@@ -0,0 +1,92 @@
+from typing import Iterable, Mapping
+
+from django.db.models import CharField, Prefetch, QuerySet, Value
+
+from core.apps.duties.models import SwapDutiesRequest, SwapPeopleRequest
+from core.apps.duties.services.base import SWAP_REQUEST_STATUS_FILTERS, SwapRequest
+from core.apps.users.models import CustomUser as UserModel
+
+
+class SwapInboxService:
+    """
+    Сервис для входящих заявок пользователя: на обмен и на замену вместе.
+
+    Заявки обоих типов объединяются в базе данных через UNION ALL, в Python
+    загружаются только заявки текущей страницы вместе со связанными записями.
+    """
+
+    SWAP_PEOPLE = "swap_people"
+    SWAP_DUTIES = "swap_duties"
+
+    @classmethod
+    def get_branches(
+        cls, user: UserModel, status: str | None = None
+    ) -> tuple[QuerySet, QuerySet]:
+        """
+        Получить запросы для ключей входящих заявок каждого типа.
+
+        Каждая строка содержит id, created_at и type, ветки объединяются
+        при пагинации, чтобы условие курсора применялось к каждой отдельно.
+
+        :param status: Один из ключей SWAP_REQUEST_STATUS_FILTERS.
+        """
+        branches = (
+            SwapPeopleRequest.objects.filter(to_swap=user).annotate(
+                type=Value(cls.SWAP_PEOPLE, output_field=CharField())
+            ),
+            SwapDutiesRequest.objects.filter(second_user=user).annotate(
+                type=Value(cls.SWAP_DUTIES, output_field=CharField())
+            ),
+        )
+        if status is not None:
+            branches = tuple(
+                branch.filter(SWAP_REQUEST_STATUS_FILTERS[status])
+                for branch in branches
+            )
+        return tuple(branch.values("id", "created_at", "type") for branch in branches)
+
+    @classmethod
+    def get_requests(cls, rows: Iterable[Mapping]) -> list[SwapRequest]:
+        """
+        Загрузить заявки по ключам из get_branches с сохранением порядка.
+
+        Выполняет по одному запросу на тип заявки и предзагрузку дежурных.
+        """
+        rows = list(rows)
+        ids = {cls.SWAP_PEOPLE: [], cls.SWAP_DUTIES: []}
+        for row in rows:
+            ids[row["type"]].append(row["id"])
+
+        people = UserModel.objects.select_related("room")
+        requests = {}
+        if ids[cls.SWAP_PEOPLE]:
+            queryset = (
+                SwapPeopleRequest.objects.filter(pk__in=ids[cls.SWAP_PEOPLE])
+                .select_related("current_user__room", "to_swap__room", "duty")
+                .prefetch_related(Prefetch("duty__people", queryset=people))
+            )
+            requests.update(
+                ((cls.SWAP_PEOPLE, request.pk), request) for request in queryset
+            )
+        if ids[cls.SWAP_DUTIES]:
+            queryset = (
+                SwapDutiesRequest.objects.filter(pk__in=ids[cls.SWAP_DUTIES])
+                .select_related(
+                    "first_user__room",
+                    "second_user__room",
+                    "first_duty",
+                    "second_duty",
+                )
+                .prefetch_related(
+                    Prefetch("first_duty__people", queryset=people),
+                    Prefetch("second_duty__people", queryset=people),
+                )
+            )
+            requests.update(
+                ((cls.SWAP_DUTIES, request.pk), request) for request in queryset
+            )
+        return [
+            requests[key]
+            for key in ((row["type"], row["id"]) for row in rows)
+            if key in requests
+        ]
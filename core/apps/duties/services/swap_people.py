@@ -1,5 +1,10 @@
 from django.db.transaction import atomic
 
+from core.apps.duties.choices import (
+    SWAP_REQUEST_ACCEPTED,
+    SWAP_REQUEST_CANCELED,
+    SWAP_REQUEST_DECLINED,
+)
 from core.apps.duties.exceptions import DutySwapException, SwapRequestStatusException
 from core.apps.duties.models import KitchenDuty, SwapPeopleRequest
 from core.apps.duties.services import BaseSwapRequestService, KitchenDutyService
@@ -12,6 +17,10 @@ class SwapPeopleService(BaseSwapRequestService):
     Сервис для работы с заявками на замену людей.
     """
 
+    model = SwapPeopleRequest
+
+    request_type = "swap_people"
+
     def __init__(
         self, current_user: UserModel, object: SwapPeopleRequest = None
     ) -> None:
@@ -28,36 +37,53 @@ class SwapPeopleService(BaseSwapRequestService):
 
     @classmethod
     def create(
-        cls, initiator: UserModel, initiator_duty: KitchenDuty, target: UserModel
+        cls,
+        initiator: UserModel,
+        initiator_duty: KitchenDuty | int,
+        target: UserModel | int,
     ) -> SwapPeopleRequest:
         """
         Создать новый запрос на замену.
 
+        Существование дежурства и пользователя, роль и дежурства участников
+        проверяются одним запросом.
+
+        :param initiator_duty: Дежурство инициатора или его id.
+        :param target: Пользователь, которому направлен запрос, или его id.
         :returns: SwapPeopleRequest
+        :raises NotFound: Если дежурство или target не найдены
         :raises RoleViolationException: Если нарушены роли пользователей
         :raises DutySwapException: Если пользователи идентичны
-        :raises DutySwapException: Если initiator уже принадлежит к target_duty
-        :raises DutySwapException: Если target не принадлежит к target_duty
+        :raises DutySwapException: Если initiator не принадлежит к initiator_duty
+        :raises DutySwapException: Если target уже принадлежит к initiator_duty
+        :raises DutySwapException: Если такая же заявка уже ожидает ответа
         """
-        if not cls.user_is_resident(initiator) or not cls.user_is_resident(target):
+        duty_id = getattr(initiator_duty, "pk", initiator_duty)
+        target_id = getattr(target, "pk", target)
+        if not cls.user_is_resident(initiator):
             raise RoleViolationException(
                 "Невозможно создать запрос, если один из пользователей не является проживающим"
             )
-        if initiator == target:
+        if initiator.pk == target_id:
             raise DutySwapException(
                 "Невозможно создать запрос на замену между идентичными пользователями."
             )
-        if not initiator_duty.people.contains(initiator):
+        membership = cls._get_membership([duty_id], initiator.pk, target_id)[duty_id]
+        if not membership["target_is_resident"]:
+            raise RoleViolationException(
+                "Невозможно создать запрос, если один из пользователей не является проживающим"
+            )
+        if not membership["initiator_on_duty"]:
             raise DutySwapException(
                 f"Дежурный {initiator} не принадлежит дежурству {initiator_duty}"
             )
-        if initiator_duty.people.contains(target):
+        if membership["target_on_duty"]:
             raise DutySwapException(
                 f"Дежурный {target} уже принадлежит к дежурству {initiator_duty}"
             )
-        return cls._create(
-            initiator=initiator, initiator_duty=initiator_duty, target=target
-        )
+        request = cls._create(initiator=initiator, duty_id=duty_id, target_id=target_id)
+        cls(initiator, request)._notify("created")
+        return request
 
     def accept(self) -> None:
         """
@@ -67,15 +93,19 @@ class SwapPeopleService(BaseSwapRequestService):
         :raises DutySwapException: Если текущий пользователь не имеет доступа
         :raises DutyIsLockedException: Если дежурство завершено
         """
-        if not self.request_is_mutable():
-            raise SwapRequestStatusException(
-                "Дежурство {self._object} невозможно изменить"
-            )
-        if not self.is_target_user(self._user):
-            raise DutySwapException(
-                f"Пользователь {self._user} не может принять заявку {self}, так как она не направлена ему"
-            )
-        self._accept()
+        with atomic():
+            duties = self._lock_duties(self._object.duty_id)
+            self._lock_request()
+            if not self.request_is_mutable():
+                raise SwapRequestStatusException(
+                    "Дежурство {self._object} невозможно изменить"
+                )
+            if not self.is_target_user(self._user):
+                raise DutySwapException(
+                    f"Пользователь {self._user} не может принять заявку {self}, так как она не направлена ему"
+                )
+            self._object.duty = duties[self._object.duty_id]
+            self._accept()
 
     def decline(self) -> None:
         """
@@ -85,15 +115,17 @@ class SwapPeopleService(BaseSwapRequestService):
         :raises SwapRequestStatusException: Если запрос невозможно модифицировать
         :raises DutySwapException: Если текущий пользователь не имеет доступа
         """
-        if not self.request_is_mutable():
-            raise SwapRequestStatusException(
-                "Дежурство {self._object} невозможно изменить"
-            )
-        if not self.is_target_user(self._user):
-            raise DutySwapException(
-                f"Пользователь {self._user} не может отклонить заявку {self}, так как она не направлена ему"
-            )
-        self._decline()
+        with atomic():
+            self._lock_request()
+            if not self.request_is_mutable():
+                raise SwapRequestStatusException(
+                    "Дежурство {self._object} невозможно изменить"
+                )
+            if not self.is_target_user(self._user):
+                raise DutySwapException(
+                    f"Пользователь {self._user} не может отклонить заявку {self}, так как она не направлена ему"
+                )
+            self._decline()
 
     def cancel(self) -> None:
         """
@@ -102,15 +134,17 @@ class SwapPeopleService(BaseSwapRequestService):
         :raises SwapRequestStatusException: Если запрос невозможно модифицировать
         :raises DutySwapException: Если текущий пользователь не имеет доступа
         """
-        if not self.request_is_mutable():
-            raise SwapRequestStatusException(
-                "Дежурство {self._object} невозможно изменить"
-            )
-        if not self.is_owner_user(self._user):
-            raise DutySwapException(
-                f"Пользователь {self._user} не может отменить заявку {self}, так как она не направлена ему"
-            )
-        self._cancel()
+        with atomic():
+            self._lock_request()
+            if not self.request_is_mutable():
+                raise SwapRequestStatusException(
+                    "Дежурство {self._object} невозможно изменить"
+                )
+            if not self.is_owner_user(self._user):
+                raise DutySwapException(
+                    f"Пользователь {self._user} не может отменить заявку {self}, так как она не направлена ему"
+                )
+            self._cancel()
 
     @classmethod
     def user_is_resident(cls, user: UserModel) -> bool:
@@ -120,11 +154,17 @@ class SwapPeopleService(BaseSwapRequestService):
 
     def is_owner_user(self, user: UserModel) -> bool:
         """Проверить, является ли текущий пользователь владельцем запроса"""
-        return self._object.current_user == user
+        return self._object.current_user_id == user.pk
 
     def is_target_user(self, user: UserModel) -> bool:
         """Проверить, является ли текущий пользователь целью запроса"""
-        return self._object.to_swap == user
+        return self._object.to_swap_id == user.pk
+
+    def get_participants(self) -> tuple[int, int]:
+        return self._object.current_user_id, self._object.to_swap_id
+
+    def get_duty_ids(self) -> tuple[int, ...]:
+        return (self._object.duty_id,)
 
     def request_is_mutable(self) -> bool:
         """Проверить можно ли изменять запрос на замену"""
@@ -132,27 +172,24 @@ class SwapPeopleService(BaseSwapRequestService):
 
     @classmethod
     def _create(
-        cls, initiator: UserModel, initiator_duty: KitchenDuty, target: UserModel
+        cls, initiator: UserModel, duty_id: int, target_id: int
     ) -> SwapPeopleRequest:
         """Создать новый запрос на замену."""
-        return SwapPeopleRequest.objects.create(
-            duty=initiator_duty, current_user=initiator, to_swap=target
+        return cls._create_pending(
+            duty_id=duty_id, current_user=initiator, to_swap_id=target_id
         )
 
     def _accept(self) -> None:
         """Принять запрос на замену."""
         duty_service = KitchenDutyService(self._object.duty)
         with atomic():
-            self._object.accepted = True
-            self._object.save()
+            self._set_status(SWAP_REQUEST_ACCEPTED)
             duty_service.swap_pupils(self._object.current_user, self._object.to_swap)
 
     def _decline(self) -> None:
         """Отклонить запрос на замену."""
-        self._object.declined = True
-        self._object.save()
+        self._set_status(SWAP_REQUEST_DECLINED)
 
     def _cancel(self) -> None:
         """Отменить запрос на замену."""
-        self._object.canceled = True
-        self._object.save()
+        self._set_status(SWAP_REQUEST_CANCELED)
@@ -1,45 +1,200 @@
-from datetime import date
-from itertools import cycle
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Iterable, Mapping
 
-from django.db.models import Count, Q
+from django.db.models import FilteredRelation, Q
+from django.db.models.functions import Coalesce
 from django.db.transaction import atomic
 
 from core.apps.common.exceptions import NotConfiguredException
-from core.apps.common.services import get_current_year_dates
+from core.apps.common.services import get_academic_year
 from core.apps.common.utils import date_range
-from core.apps.duties.models import KitchenDuty, KitchenDutyConfig
+from core.apps.duties.choices import SWAP_REQUEST_CANCELED, SWAP_REQUEST_PENDING
+from core.apps.duties.models import (
+    KitchenDuty,
+    KitchenDutyConfig,
+    SwapDutiesRequest,
+    SwapPeopleRequest,
+)
+from core.apps.duties.services.allocation import (
+    BaseDutyAllocator,
+    DutyCandidate,
+    get_default_duty_allocator,
+)
+from core.apps.duties.services.stats import DutyStatsService
 from core.apps.users.models import CustomUser as UserModel
 
 
-def generate_duty_schedule(date_start: date, date_end: date) -> list[KitchenDuty]:
-    """Создает записи дежурства на даты от :date_start до :date_end"""
+@dataclass
+class ScheduledDuty:
+    """Уже существующее дежурство в графике"""
+
+    pk: int
+    finished: bool
+    people: list[int] = field(default_factory=list)
+
+
+def generate_duty_schedule(
+    date_start: date, date_end: date, allocator: BaseDutyAllocator | None = None
+) -> list[KitchenDuty]:
+    """
+    Создает записи дежурства на даты от :date_start до :date_end.
+
+    Генерация идемпотентна: создаются только отсутствующие даты, а в
+    незавершенные дежурства, где людей меньше KitchenDutyConfig.people_per_day,
+    добавляются недостающие дежурные. Уже укомплектованные дни не изменяются.
+    Текущее состояние графика читается одним запросом, новый график
+    записывается пакетно.
+
+    :param allocator: Алгоритм распределения дежурных, по умолчанию
+        используется get_default_duty_allocator().
+    :returns: Созданные и дополненные дежурства.
+    """
     if not (config := KitchenDutyConfig.objects.first()):
         raise NotConfiguredException("Конфигурация для графиков дежурств отсутствует")
-    year_start, year_end = get_current_year_dates()
-    people = cycle(
-        pupil
-        for pupil in UserModel.objects.prefetch_related("kitchen_duties")
-        .annotate(
-            finished_duties_this_year=Count(
-                "kitchen_duties",
-                filter=Q(
-                    Q(kitchen_duties__finished=True)
-                    & Q(kitchen_duties__date__gte=year_start)
-                    & Q(kitchen_duties__date__lte=year_end)
-                ),
-            )
-        )
-        .order_by("finished_duties_this_year", "room__number")
+    allocator = allocator or get_default_duty_allocator()
+    existing = get_existing_schedule(
+        date_start - timedelta(days=allocator.lookbehind_days), date_end
+    )
+
+    demand = {}
+    for day in date_range(date_start, date_end):
+        if day not in existing:
+            demand[day] = config.people_per_day
+        elif not existing[day].finished:
+            if (missing := config.people_per_day - len(existing[day].people)) > 0:
+                demand[day] = missing
+    if not demand:
+        return []
+
+    candidates = get_duty_candidates(
+        date_start, {day: duty.people for day, duty in existing.items()}
     )
+    schedule = allocator.allocate(
+        candidates,
+        demand,
+        assigned={day: existing[day].people for day in demand if day in existing},
+    )
+    return _write_duty_schedule(schedule, existing)
+
 
+def finish_past_duties(today: date | None = None) -> int:
+    """
+    Завершить все незавершенные дежурства, дата которых раньше :today.
+
+    Дежурства закрываются одним UPDATE, статистика дежурных обновляется пакетно.
+
+    :param today: Дата, до которой закрываются дежурства, по умолчанию сегодня.
+    :returns: Количество завершенных дежурств.
+    """
+    today = today or date.today()
     with atomic():
-        print("Starting schedule creation")
-        for day in date_range(date_start, date_end):
-            duty_item = KitchenDuty.objects.create(date=day)
+        duty_ids = list(
+            KitchenDuty.objects.select_for_update()
+            .filter(date__lt=today, finished=False)
+            .values_list("pk", flat=True)
+        )
+        if not duty_ids:
+            return 0
+        assignments = KitchenDuty.people.through.objects.filter(
+            kitchenduty_id__in=duty_ids
+        ).values_list("customuser_id", "kitchenduty__date")
+        finished_count = KitchenDuty.objects.filter(pk__in=duty_ids).update(
+            finished=True
+        )
+        DutyStatsService.duties_finished(assignments)
+    return finished_count
 
-            for _ in range(config.people_per_day):
-                duty_item.people.add(next(people))
 
-            duty_item.save()
+def expire_stale_swap_requests(today: date | None = None) -> dict[str, int]:
+    """
+    Отменить ожидающие заявки, дежурства которых уже прошли или завершены.
 
-    print("Schedule successfully created")
+    Каждый тип заявок отменяется одним UPDATE, после чего заявки выпадают
+    из частичных индексов ожидающих заявок.
+
+    :param today: Дата, дежурства раньше которой считаются прошедшими,
+        по умолчанию сегодня.
+    :returns: Количество отмененных заявок каждого типа.
+    """
+    today = today or date.today()
+    stale_duties = KitchenDuty.objects.filter(
+        Q(date__lt=today) | Q(finished=True)
+    ).values("pk")
+    swap_duties_count = (
+        SwapDutiesRequest.objects.filter(status=SWAP_REQUEST_PENDING)
+        .filter(Q(first_duty__in=stale_duties) | Q(second_duty__in=stale_duties))
+        .update(status=SWAP_REQUEST_CANCELED)
+    )
+    swap_people_count = SwapPeopleRequest.objects.filter(
+        status=SWAP_REQUEST_PENDING, duty__in=stale_duties
+    ).update(status=SWAP_REQUEST_CANCELED)
+    return {"swap_duties": swap_duties_count, "swap_people": swap_people_count}
+
+
+def get_existing_schedule(
+    date_start: date, date_end: date
+) -> dict[date, ScheduledDuty]:
+    """Получить дежурства и их дежурных на даты от :date_start до :date_end одним запросом"""
+    existing = {}
+    rows = KitchenDuty.objects.filter(
+        date__gte=date_start, date__lte=date_end
+    ).values_list("pk", "date", "finished", "people")
+    for pk, day, finished, pupil_id in rows:
+        duty = existing.setdefault(day, ScheduledDuty(pk=pk, finished=finished))
+        if pupil_id is not None:
+            duty.people.append(pupil_id)
+    return existing
+
+
+def get_duty_candidates(
+    academic_day: date, schedule: Mapping[date, Iterable[int]]
+) -> list[DutyCandidate]:
+    """
+    Получить проживающих для распределения дежурств в порядке приоритета.
+
+    Приоритет берется из DutyStats за учебный год, к которому относится :academic_day.
+
+    :param schedule: Уже назначенные дежурства, которые нужно учесть в ограничениях.
+    """
+    academic_year = get_academic_year(academic_day)
+    candidates = {
+        pk: DutyCandidate(pk=pk, room_id=room_id, duties_count=duties_count)
+        for pk, room_id, duties_count in UserModel.objects.filter(resident=True)
+        .annotate(
+            current_stats=FilteredRelation(
+                "duty_stats", condition=Q(duty_stats__academic_year=academic_year)
+            ),
+            duties_this_year=Coalesce("current_stats__duties_count", 0),
+        )
+        .order_by("duties_this_year", "room__number")
+        .values_list("pk", "room_id", "duties_this_year")
+    }
+    for day, people in schedule.items():
+        for pupil_id in people:
+            if pupil_id in candidates:
+                candidates[pupil_id].duty_dates.add(day)
+    return list(candidates.values())
+
+
+def _write_duty_schedule(
+    schedule: dict[date, list[int]], existing: Mapping[date, ScheduledDuty]
+) -> list[KitchenDuty]:
+    """Записывает спланированный график в базу данных пакетно"""
+    through_model = KitchenDuty.people.through
+    with atomic():
+        duties = KitchenDuty.objects.bulk_create(
+            KitchenDuty(date=day) for day in schedule if day not in existing
+        )
+        duties.extend(
+            KitchenDuty(pk=existing[day].pk, date=day)
+            for day in schedule
+            if day in existing
+        )
+        through_model.objects.bulk_create(
+            through_model(kitchenduty_id=duty.pk, customuser_id=pupil_id)
+            for duty in duties
+            for pupil_id in schedule[duty.date]
+        )
+        DutyStatsService.duties_assigned(schedule)
+    return duties
@@ -1,6 +1,14 @@
 from django.contrib import admin
 
-from core.apps.laundry.models import LaundryRecord
+from core.apps.laundry.models import (
+    LaundryConfig,
+    LaundryNoShow,
+    LaundryRecord,
+    LaundryRecordArchive,
+    LaundryWaitlistEntry,
+    Machine,
+    SlotTemplate,
+)
 
 
 @admin.register(LaundryRecord)
@@ -9,10 +17,62 @@ class LaundryRecordAdmin(admin.ModelAdmin):
         'record_date',
         'time_start',
         'time_end',
-        'is_available'
+        'machine',
+        'is_available',
+        'checked_in_at'
     )
     list_display_links = (
         'record_date',
         'time_start',
         'time_end',
-    )
\ No newline at end of file
+    )
+    list_filter = ('machine',)
+
+
+class SlotTemplateInline(admin.TabularInline):
+    model = SlotTemplate
+    extra = 0
+    ordering = ('weekday', 'time_start')
+
+
+@admin.register(Machine)
+class MachineAdmin(admin.ModelAdmin):
+    list_display = ('name', 'is_active')
+    inlines = (SlotTemplateInline,)
+
+
+@admin.register(LaundryConfig)
+class LaundryConfigAdmin(admin.ModelAdmin):
+    list_display = ('day_quota', 'week_quota', 'no_show_grace_minutes')
+
+
+@admin.register(LaundryWaitlistEntry)
+class LaundryWaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('record_date', 'user', 'created_at')
+    ordering = ('record_date', 'created_at', 'id')
+
+
+@admin.register(LaundryNoShow)
+class LaundryNoShowAdmin(admin.ModelAdmin):
+    list_display = ('user', 'record_date', 'time_start', 'machine', 'released_at')
+    list_filter = ('machine',)
+    date_hierarchy = 'record_date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(LaundryRecordArchive)
+class LaundryRecordArchiveAdmin(admin.ModelAdmin):
+    list_display = ('record_date', 'time_start', 'time_end', 'machine', 'owner')
+    list_filter = ('machine',)
+    date_hierarchy = 'record_date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -1,5 +1,9 @@
 from rest_framework.exceptions import APIException
-from rest_framework.status import HTTP_400_BAD_REQUEST
+from rest_framework.status import (
+    HTTP_400_BAD_REQUEST,
+    HTTP_403_FORBIDDEN,
+    HTTP_409_CONFLICT,
+)
 
 
 class BaseLaundryException(APIException): ...
@@ -7,3 +11,16 @@ class BaseLaundryException(APIException): ...
 
 class RecordStateException(BaseLaundryException):
     status_code = HTTP_400_BAD_REQUEST
+
+
+class RecordConflictException(RecordStateException):
+    status_code = HTTP_409_CONFLICT
+
+
+class RecordQuotaException(BaseLaundryException):
+    status_code = HTTP_403_FORBIDDEN
+    default_detail = "Превышено количество записей на одного проживающего"
+
+
+class WaitlistConflictException(BaseLaundryException):
+    status_code = HTTP_409_CONFLICT
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("laundry", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="laundryrecord",
+            index=models.Index(
+                fields=["record_date", "time_start", "id"],
+                name="laundry_date_time_id_idx",
+            ),
+        ),
+    ]
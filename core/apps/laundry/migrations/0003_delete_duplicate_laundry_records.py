@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+def delete_duplicates(apps, schema_editor):
+    """
+    Удаляет повторные записи с одинаковыми датой и временем начала.
+
+    Остается занятая запись, если такая есть, иначе самая ранняя.
+    """
+    LaundryRecord = apps.get_model("laundry", "LaundryRecord")
+    kept = set()
+    duplicates = []
+    rows = LaundryRecord.objects.order_by(
+        "record_date", "time_start", "owner_id", "pk"
+    ).values_list("pk", "record_date", "time_start")
+    for pk, record_date, time_start in rows.iterator():
+        if (record_date, time_start) in kept:
+            duplicates.append(pk)
+        kept.add((record_date, time_start))
+    LaundryRecord.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("laundry", "0002_laundryrecord_laundry_date_time_id_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicates, migrations.RunPython.noop),
+    ]
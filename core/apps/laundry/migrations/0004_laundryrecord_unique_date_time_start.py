@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("laundry", "0003_delete_duplicate_laundry_records"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="laundryrecord",
+            constraint=models.UniqueConstraint(
+                fields=("record_date", "time_start"),
+                name="laundry_unique_date_time_start",
+            ),
+        ),
+    ]
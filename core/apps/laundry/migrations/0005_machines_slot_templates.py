@@ -0,0 +1,116 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("laundry", "0004_laundryrecord_unique_date_time_start"),
+    ]
+
+    operations = [
+        # Пустые заготовки шаблонов из 0001 заменены Machine и SlotTemplate
+        migrations.DeleteModel(
+            name="LaundryRecordTemplate",
+        ),
+        migrations.DeleteModel(
+            name="LaundryScheduleTemplate",
+        ),
+        migrations.CreateModel(
+            name="Machine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=64, unique=True, verbose_name="Название"
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True, verbose_name="Используется при создании записей"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Стиральная машина",
+                "verbose_name_plural": "Стиральные машины",
+            },
+        ),
+        migrations.CreateModel(
+            name="SlotTemplate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "weekday",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (0, "Понедельник"),
+                            (1, "Вторник"),
+                            (2, "Среда"),
+                            (3, "Четверг"),
+                            (4, "Пятница"),
+                            (5, "Суббота"),
+                            (6, "Воскресенье"),
+                        ],
+                        verbose_name="День недели",
+                    ),
+                ),
+                ("time_start", models.TimeField(verbose_name="Начало записи")),
+                ("time_end", models.TimeField(verbose_name="Окончание записи")),
+                (
+                    "machine",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="slot_templates",
+                        to="laundry.machine",
+                        verbose_name="Стиральная машина",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Шаблон записи",
+                "verbose_name_plural": "Шаблоны записей",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("machine", "weekday", "time_start"),
+                        name="slottemplate_unique_machine_weekday_time",
+                    ),
+                    models.CheckConstraint(
+                        check=models.Q(("time_start__lt", models.F("time_end"))),
+                        name="slottemplate_time_start_before_end",
+                    ),
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="laundryrecord",
+            name="machine",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="records",
+                to="laundry.machine",
+                verbose_name="Стиральная машина",
+            ),
+        ),
+    ]
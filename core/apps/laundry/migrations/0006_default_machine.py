@@ -0,0 +1,52 @@
+from datetime import time
+
+from django.db import migrations
+
+
+DEFAULT_MACHINE_NAME = "Машина 1"
+
+
+def create_default_machine(apps, schema_editor):
+    """
+    Создает машину с прежним расписанием: каждый день по часу с 8 до 22.
+
+    Существующие записи переносятся на эту машину, чтобы генератор по
+    шаблонам не создал рядом с ними дубликаты.
+    """
+    Machine = apps.get_model("laundry", "Machine")
+    SlotTemplate = apps.get_model("laundry", "SlotTemplate")
+    LaundryRecord = apps.get_model("laundry", "LaundryRecord")
+
+    machine = Machine.objects.create(name=DEFAULT_MACHINE_NAME)
+    SlotTemplate.objects.bulk_create(
+        SlotTemplate(
+            machine=machine,
+            weekday=weekday,
+            time_start=time(hour=hour),
+            time_end=time(hour=hour + 1),
+        )
+        for weekday in range(7)
+        for hour in range(8, 22)
+    )
+    LaundryRecord.objects.filter(machine__isnull=True).update(machine=machine)
+
+
+def delete_default_machine(apps, schema_editor):
+    """Возвращает записи без машины и удаляет машину по умолчанию"""
+    Machine = apps.get_model("laundry", "Machine")
+    LaundryRecord = apps.get_model("laundry", "LaundryRecord")
+
+    LaundryRecord.objects.filter(machine__name=DEFAULT_MACHINE_NAME).update(
+        machine=None
+    )
+    Machine.objects.filter(name=DEFAULT_MACHINE_NAME).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("laundry", "0005_machines_slot_templates"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_default_machine, delete_default_machine),
+    ]
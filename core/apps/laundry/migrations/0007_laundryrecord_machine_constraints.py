@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("laundry", "0006_default_machine"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="laundryrecord",
+            name="laundry_unique_date_time_start",
+        ),
+        migrations.AddConstraint(
+            model_name="laundryrecord",
+            constraint=models.UniqueConstraint(
+                fields=("machine", "record_date", "time_start"),
+                name="laundry_unique_machine_date_time",
+                nulls_distinct=False,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="laundryrecord",
+            index=models.Index(
+                condition=models.Q(("owner__isnull", True)),
+                fields=["record_date", "time_start"],
+                name="laundry_free_date_time_idx",
+            ),
+        ),
+    ]
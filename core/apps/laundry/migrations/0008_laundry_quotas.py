@@ -0,0 +1,54 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("laundry", "0007_laundryrecord_machine_constraints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LaundryConfig",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "day_quota",
+                    models.PositiveSmallIntegerField(
+                        blank=True,
+                        help_text="Пусто - без ограничения",
+                        null=True,
+                        verbose_name="Записей на одного проживающего в день",
+                    ),
+                ),
+                (
+                    "week_quota",
+                    models.PositiveSmallIntegerField(
+                        blank=True,
+                        help_text="Пусто - без ограничения",
+                        null=True,
+                        verbose_name="Записей на одного проживающего в неделю",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Настройки прачечной",
+                "verbose_name_plural": "Настройки прачечной",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="laundryrecord",
+            index=models.Index(
+                fields=["owner", "record_date"], name="laundry_owner_date_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("laundry", "0008_laundry_quotas"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LaundryRecordArchive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("record_date", models.DateField(verbose_name="Дата записи")),
+                ("time_start", models.TimeField(verbose_name="Начало записи")),
+                ("time_end", models.TimeField(verbose_name="Окончание записи")),
+                (
+                    "archived_at",
+                    models.DateTimeField(verbose_name="Дата переноса в архив"),
+                ),
+                (
+                    "machine",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="archived_records",
+                        to="laundry.machine",
+                        verbose_name="Стиральная машина",
+                    ),
+                ),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="archived_laundry_records",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Чья запись",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Архивная запись прачечной",
+                "verbose_name_plural": "Архив записей прачечной",
+                "indexes": [
+                    models.Index(
+                        fields=["record_date", "time_start", "id"],
+                        name="laundry_archive_date_time_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("laundry", "0009_laundry_record_archive"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LaundryWaitlistEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("record_date", models.DateField(verbose_name="Дата записи")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата постановки в очередь"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="laundry_waitlist",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Проживающий",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Очередь прачечной",
+                "verbose_name_plural": "Очередь прачечной",
+                "indexes": [
+                    models.Index(
+                        fields=["record_date", "created_at", "id"],
+                        name="laundry_waitlist_order_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="laundrywaitlistentry",
+            constraint=models.UniqueConstraint(
+                fields=("user", "record_date"), name="laundry_waitlist_unique_user_date"
+            ),
+        ),
+    ]
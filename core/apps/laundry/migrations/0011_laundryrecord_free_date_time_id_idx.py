@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("laundry", "0010_laundry_waitlist"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="laundryrecord",
+            name="laundry_free_date_time_idx",
+        ),
+        migrations.AddIndex(
+            model_name="laundryrecord",
+            index=models.Index(
+                condition=models.Q(("owner__isnull", True)),
+                fields=["record_date", "time_start", "id"],
+                name="laundry_free_date_time_id_idx",
+            ),
+        ),
+    ]
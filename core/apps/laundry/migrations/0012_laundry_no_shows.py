@@ -0,0 +1,79 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("laundry", "0011_laundryrecord_free_date_time_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="laundryconfig",
+            name="no_show_grace_minutes",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Пусто - записи без отметки не освобождаются",
+                null=True,
+                verbose_name="Минут на отметку о приходе после начала записи",
+            ),
+        ),
+        migrations.AddField(
+            model_name="laundryrecord",
+            name="checked_in_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Отметка о приходе"
+            ),
+        ),
+        migrations.CreateModel(
+            name="LaundryNoShow",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("record_date", models.DateField(verbose_name="Дата записи")),
+                ("time_start", models.TimeField(verbose_name="Начало записи")),
+                ("released_at", models.DateTimeField(verbose_name="Дата освобождения")),
+                (
+                    "machine",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="no_shows",
+                        to="laundry.machine",
+                        verbose_name="Стиральная машина",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="laundry_no_shows",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Проживающий",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Неявка в прачечную",
+                "verbose_name_plural": "Неявки в прачечную",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "record_date"],
+                        name="laundry_no_show_user_date_idx",
+                    )
+                ],
+            },
+        ),
+    ]
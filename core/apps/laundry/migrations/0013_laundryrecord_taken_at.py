@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("laundry", "0012_laundry_no_shows"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="laundryrecord",
+            name="taken_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Время записи"
+            ),
+        ),
+    ]
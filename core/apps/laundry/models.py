@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.db import models
 from django.contrib.auth import get_user_model
 
@@ -5,7 +6,114 @@ from django.contrib.auth import get_user_model
 UserModel = get_user_model()
 
 
+WEEKDAY_CHOICES = (
+    (0, "Понедельник"),
+    (1, "Вторник"),
+    (2, "Среда"),
+    (3, "Четверг"),
+    (4, "Пятница"),
+    (5, "Суббота"),
+    (6, "Воскресенье"),
+)
+
+# Ключ кеша лимитов записей, которые LaundryService читает на каждую запись
+LAUNDRY_QUOTAS_CACHE_KEY = "laundry:quotas"
+
+
+class LaundryConfig(models.Model):
+    """Настройки прачечной"""
+
+    day_quota = models.PositiveSmallIntegerField(
+        verbose_name="Записей на одного проживающего в день",
+        null=True,
+        blank=True,
+        help_text="Пусто - без ограничения",
+    )
+    week_quota = models.PositiveSmallIntegerField(
+        verbose_name="Записей на одного проживающего в неделю",
+        null=True,
+        blank=True,
+        help_text="Пусто - без ограничения",
+    )
+    no_show_grace_minutes = models.PositiveSmallIntegerField(
+        verbose_name="Минут на отметку о приходе после начала записи",
+        null=True,
+        blank=True,
+        help_text="Пусто - записи без отметки не освобождаются",
+    )
+
+    class Meta:
+        verbose_name = "Настройки прачечной"
+        verbose_name_plural = "Настройки прачечной"
+
+    def save(self, *args, **kwargs) -> None:
+        super().save(*args, **kwargs)
+        cache.delete(LAUNDRY_QUOTAS_CACHE_KEY)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        cache.delete(LAUNDRY_QUOTAS_CACHE_KEY)
+        return result
+
+
+class Machine(models.Model):
+    """Стиральная машина прачечной"""
+
+    name = models.CharField(max_length=64, unique=True, verbose_name="Название")
+    is_active = models.BooleanField(
+        default=True, verbose_name="Используется при создании записей"
+    )
+
+    class Meta:
+        verbose_name = "Стиральная машина"
+        verbose_name_plural = "Стиральные машины"
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class SlotTemplate(models.Model):
+    """Шаблон записи: машина, день недели и время, по которым создаются записи"""
+
+    machine = models.ForeignKey(
+        Machine,
+        on_delete=models.CASCADE,
+        verbose_name="Стиральная машина",
+        related_name="slot_templates",
+    )
+    weekday = models.PositiveSmallIntegerField(
+        choices=WEEKDAY_CHOICES, verbose_name="День недели"
+    )
+    time_start = models.TimeField(verbose_name="Начало записи")
+    time_end = models.TimeField(verbose_name="Окончание записи")
+
+    class Meta:
+        verbose_name = "Шаблон записи"
+        verbose_name_plural = "Шаблоны записей"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("machine", "weekday", "time_start"),
+                name="slottemplate_unique_machine_weekday_time",
+            ),
+            models.CheckConstraint(
+                check=models.Q(time_start__lt=models.F("time_end")),
+                name="slottemplate_time_start_before_end",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.machine}, {self.get_weekday_display()}: {self.time_start}-{self.time_end}"
+
+
 class LaundryRecord(models.Model):
+    machine = models.ForeignKey(
+        Machine,
+        verbose_name="Стиральная машина",
+        on_delete=models.CASCADE,
+        related_name="records",
+        null=True,
+        blank=True,
+    )
     record_date = models.DateField(verbose_name="Дата записи")
     time_start = models.TimeField(verbose_name="Начало записи")
     time_end = models.TimeField(verbose_name="Окончание записи")
@@ -16,14 +124,157 @@ class LaundryRecord(models.Model):
         null=True,
         blank=True,
     )
+    taken_at = models.DateTimeField(verbose_name="Время записи", null=True, blank=True)
+    checked_in_at = models.DateTimeField(
+        verbose_name="Отметка о приходе", null=True, blank=True
+    )
 
     class Meta:
         verbose_name = "Запись прачечной"
         verbose_name_plural = "Записи прачечной"
+        indexes = [
+            models.Index(
+                fields=("record_date", "time_start", "id"),
+                name="laundry_date_time_id_idx",
+            ),
+            models.Index(
+                fields=("record_date", "time_start", "id"),
+                condition=models.Q(owner__isnull=True),
+                name="laundry_free_date_time_id_idx",
+            ),
+            models.Index(
+                fields=("owner", "record_date"),
+                name="laundry_owner_date_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("machine", "record_date", "time_start"),
+                nulls_distinct=False,
+                name="laundry_unique_machine_date_time",
+            )
+        ]
 
     def __str__(self) -> str:
         return f"{self.time_start}-{self.time_end}"
 
     @property
     def is_available(self) -> bool:
-        return not self.owner
+        return self.owner_id is None
+
+
+class LaundryWaitlistEntry(models.Model):
+    """
+    Место проживающего в очереди на записи прачечной одного дня.
+
+    Освобожденная запись этого дня сразу передается первому в очереди.
+    """
+
+    user = models.ForeignKey(
+        UserModel,
+        verbose_name="Проживающий",
+        on_delete=models.CASCADE,
+        related_name="laundry_waitlist",
+    )
+    record_date = models.DateField(verbose_name="Дата записи")
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name="Дата постановки в очередь"
+    )
+
+    class Meta:
+        verbose_name = "Очередь прачечной"
+        verbose_name_plural = "Очередь прачечной"
+        indexes = [
+            models.Index(
+                fields=("record_date", "created_at", "id"),
+                name="laundry_waitlist_order_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("user", "record_date"),
+                name="laundry_waitlist_unique_user_date",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} - {self.record_date}"
+
+
+class LaundryNoShow(models.Model):
+    """
+    Неявка на запись прачечной: запись не была отмечена вовремя и освобождена
+    задачей release_laundry_no_shows
+    """
+
+    user = models.ForeignKey(
+        UserModel,
+        verbose_name="Проживающий",
+        on_delete=models.CASCADE,
+        related_name="laundry_no_shows",
+    )
+    machine = models.ForeignKey(
+        Machine,
+        verbose_name="Стиральная машина",
+        on_delete=models.SET_NULL,
+        related_name="no_shows",
+        null=True,
+        blank=True,
+    )
+    record_date = models.DateField(verbose_name="Дата записи")
+    time_start = models.TimeField(verbose_name="Начало записи")
+    released_at = models.DateTimeField(verbose_name="Дата освобождения")
+
+    class Meta:
+        verbose_name = "Неявка в прачечную"
+        verbose_name_plural = "Неявки в прачечную"
+        indexes = [
+            models.Index(
+                fields=("user", "record_date"),
+                name="laundry_no_show_user_date_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} - {self.record_date} {self.time_start}"
+
+
+class LaundryRecordArchive(models.Model):
+    """
+    Прошедшая запись прачечной, перенесенная из LaundryRecord задачей
+    archive_laundry_records, чтобы основная таблица оставалась небольшой
+    """
+
+    machine = models.ForeignKey(
+        Machine,
+        verbose_name="Стиральная машина",
+        on_delete=models.SET_NULL,
+        related_name="archived_records",
+        null=True,
+        blank=True,
+    )
+    record_date = models.DateField(verbose_name="Дата записи")
+    time_start = models.TimeField(verbose_name="Начало записи")
+    time_end = models.TimeField(verbose_name="Окончание записи")
+    owner = models.ForeignKey(
+        UserModel,
+        verbose_name="Чья запись",
+        on_delete=models.SET_NULL,
+        related_name="archived_laundry_records",
+        null=True,
+        blank=True,
+    )
+    archived_at = models.DateTimeField(verbose_name="Дата переноса в архив")
+
+    class Meta:
+        verbose_name = "Архивная запись прачечной"
+        verbose_name_plural = "Архив записей прачечной"
+        indexes = [
+            models.Index(
+                fields=("record_date", "time_start", "id"),
+                name="laundry_archive_date_time_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.record_date} {self.time_start}-{self.time_end}"
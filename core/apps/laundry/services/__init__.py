@@ -1,2 +1,3 @@
 from .laundry import *  # noqa: F403
 from .utils import *  # noqa: F403
+from .waitlist import *  # noqa: F403
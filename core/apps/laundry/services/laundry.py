@@ -1,14 +1,69 @@
+from datetime import date, datetime, time, timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import (
+    BooleanField,
+    ExpressionWrapper,
+    F,
+    Func,
+    Min,
+    Q,
+    QuerySet,
+    Subquery,
+)
+from django.db.models.lookups import LessThan
+from django.db.transaction import atomic
 from django.utils import timezone
 from rest_framework.exceptions import PermissionDenied
 
-from core.apps.laundry.exceptions import RecordStateException
-from core.apps.laundry.models import LaundryRecord
+from core.apps.common.events import publish_user_event
+from core.apps.laundry.exceptions import (
+    RecordConflictException,
+    RecordQuotaException,
+    RecordStateException,
+)
+from core.apps.laundry.models import (
+    LAUNDRY_QUOTAS_CACHE_KEY,
+    LaundryConfig,
+    LaundryRecord,
+    LaundryWaitlistEntry,
+)
 from core.apps.users.models import CustomUser
 
 
+# Лимиты записей из LaundryConfig кешируются на это время, сохранение
+# настроек сбрасывает кеш сразу
+LAUNDRY_QUOTAS_TIMEOUT = 60
+
+# Счетчики свободных записей по дням живут в кеше не дольше этого времени,
+# что ограничивает расхождение с таблицей, если изменение прошло мимо сервиса
+LAUNDRY_FREE_COUNT_TIMEOUT = 300
+
+LAUNDRY_NEXT_FREE_COUNT = 5
+
+
 class LaundryService:
     """
     Сервис для работы с заявками в журнале прачечной.
+
+    Запись занимается и освобождается одним условным UPDATE, поэтому из
+    одновременных попыток занять одну запись проходит только одна. Если в
+    LaundryConfig заданы лимиты, они проверяются в том же UPDATE, а строка
+    пользователя блокируется перед ним, чтобы параллельные записи одного
+    проживающего не превысили лимит вместе.
+
+    Освобожденная запись в той же транзакции передается первому из очереди
+    LaundryWaitlistEntry на этот день, у кого не превышены лимиты, и он
+    получает событие promoted.
+
+    Количество свободных записей на день хранится в кеше: после фиксации
+    транзакции счетчик атомарно уменьшается при записи и увеличивается при
+    освобождении, а при промахе пересчитывается из таблицы. Если кеш не
+    общий для процессов (LAUNDRY_CACHE_FREE_COUNTS выключен), счетчик
+    каждый раз читается из таблицы.
     """
 
     def __init__(self, current_user: CustomUser, record: LaundryRecord) -> None:
@@ -51,6 +106,62 @@ class LaundryService:
         today = timezone.now().date()
         return cls.get_users_records(user).filter(record_date=today)
 
+    @classmethod
+    def annotate_is_owned(cls, queryset: QuerySet, user: CustomUser) -> QuerySet:
+        """
+        Добавить к записям признак is_owned: занята ли запись :user.
+
+        Признак вычисляется в базе данных по owner_id, поэтому список записей
+        загружается одним запросом без обращения к владельцам. Проверка на
+        NULL нужна, чтобы для свободной записи получить False, а не NULL.
+        """
+        return queryset.annotate(
+            is_owned=ExpressionWrapper(
+                Q(owner__isnull=False) & Q(owner_id=user.pk),
+                output_field=BooleanField(),
+            )
+        )
+
+    @classmethod
+    def get_upcoming_records(cls, now: datetime) -> QuerySet:
+        """
+        Получить записи, которые начинаются не раньше :now.
+
+        :returns: QuerySet[LaundryRecord] Записи без сортировки.
+        """
+        today = now.date()
+        return LaundryRecord.objects.filter(
+            Q(record_date__gt=today) | Q(time_start__gte=now.time()),
+            record_date__gte=today,
+        )
+
+    @classmethod
+    def get_next_free_records(
+        cls,
+        now: datetime,
+        count: int = LAUNDRY_NEXT_FREE_COUNT,
+        time_from: time | None = None,
+        time_to: time | None = None,
+    ) -> QuerySet:
+        """
+        Получить :count ближайших свободных записей, начиная с :now.
+
+        Запрос идет по частичному индексу свободных записей (record_date,
+        time_start, id), сортировка совпадает с индексом, поэтому читается не
+        больше :count строк подходящего времени, сколько бы дней ни было
+        создано вперед.
+
+        :param time_from: Запись начинается не раньше этого времени суток.
+        :param time_to: Запись заканчивается не позже этого времени суток.
+        :returns: QuerySet[LaundryRecord] Свободные записи по порядку.
+        """
+        queryset = cls.get_upcoming_records(now).filter(owner__isnull=True)
+        if time_from is not None:
+            queryset = queryset.filter(time_start__gte=time_from)
+        if time_to is not None:
+            queryset = queryset.filter(time_end__lte=time_to)
+        return queryset.order_by("record_date", "time_start", "id")[:count]
+
     @classmethod
     def get_today_records_stats(cls) -> str:
         """
@@ -72,42 +183,326 @@ class LaundryService:
 
         :returns: int Количество свободных записей.
         """
-        today = timezone.now().date()
-        return LaundryRecord.objects.filter(owner=None, record_date=today).count()
+        return cls.get_free_records_count(timezone.now().date())
+
+    @classmethod
+    def get_free_records_count(cls, day: date) -> int:
+        """
+        Получить количество свободных записей на :day.
+
+        Обращается к базе данных только при отсутствии счетчика в кеше или
+        без общего кеша (LAUNDRY_CACHE_FREE_COUNTS). Счетчик хранится под текущей версией дня, прочитанной до подсчета:
+        если за время подсчета версию подняли, значение под старой версией
+        больше никто не прочитает.
+        """
+        free_records = LaundryRecord.objects.filter(owner=None, record_date=day)
+        if not settings.LAUNDRY_CACHE_FREE_COUNTS:
+            return free_records.count()
+        key = cls._free_count_key(day)
+        version = cls._get_free_count_version(day)
+        count = cache.get(key, version=version)
+        if count is None:
+            count = free_records.count()
+            # add не перезапишет счетчик, если его уже создал и изменил другой запрос
+            cache.add(key, count, LAUNDRY_FREE_COUNT_TIMEOUT, version=version)
+        return count
+
+    @classmethod
+    def invalidate_free_counts(cls, days: Iterable[date]) -> None:
+        """Сбросить счетчики свободных записей на :days, например после создания записей"""
+        if not settings.LAUNDRY_CACHE_FREE_COUNTS:
+            return
+        for day in days:
+            cls._bump_free_count_version(day)
+
+    @classmethod
+    def _adjust_free_count(cls, day: date, delta: int) -> None:
+        """
+        Изменить счетчик свободных записей на :day после фиксации транзакции.
+
+        Если счетчика нет, параллельный запрос мог посчитать записи до
+        фиксации и сохранить устаревшее значение уже после нее. Поэтому
+        версия дня поднимается, и следующее чтение пересчитает счетчик.
+        """
+        if not settings.LAUNDRY_CACHE_FREE_COUNTS:
+            return
+
+        def adjust() -> None:
+            try:
+                cache.incr(
+                    cls._free_count_key(day),
+                    delta,
+                    version=cls._get_free_count_version(day),
+                )
+            except ValueError:
+                cls._bump_free_count_version(day)
+
+        transaction.on_commit(adjust, robust=True)
+
+    @classmethod
+    def _get_free_count_version(cls, day: date) -> int:
+        return cache.get(cls._free_count_version_key(day), 1)
+
+    @classmethod
+    def _bump_free_count_version(cls, day: date) -> None:
+        key = cls._free_count_version_key(day)
+        # Версия живет дольше счетчиков, поэтому после ее истечения под
+        # начальной версией не может остаться старого счетчика
+        cache.add(key, 1, LAUNDRY_FREE_COUNT_TIMEOUT * 2)
+        cache.incr(key)
+        cache.touch(key, LAUNDRY_FREE_COUNT_TIMEOUT * 2)
+
+    @staticmethod
+    def _free_count_key(day: date) -> str:
+        return f"laundry:free:{day.isoformat()}"
+
+    @staticmethod
+    def _free_count_version_key(day: date) -> str:
+        return f"laundry:free-version:{day.isoformat()}"
+
+    @classmethod
+    def get_quotas(cls) -> tuple[int | None, int | None]:
+        """
+        Получить лимиты записей на день и на неделю, None - без ограничения.
+
+        Лимиты читаются из кеша, при промахе - самые строгие из LaundryConfig.
+        """
+        quotas = cache.get(LAUNDRY_QUOTAS_CACHE_KEY)
+        if quotas is None:
+            quotas = LaundryConfig.objects.aggregate(
+                day_quota=Min("day_quota"), week_quota=Min("week_quota")
+            )
+            quotas = (quotas["day_quota"], quotas["week_quota"])
+            cache.set(LAUNDRY_QUOTAS_CACHE_KEY, quotas, LAUNDRY_QUOTAS_TIMEOUT)
+        return quotas
 
     def take_record(self) -> None:
         """
         Зарезервировать запись.
 
-        :raises RecordStateException: Если запись уже занята.
+        :raises RecordConflictException: Если запись уже занята.
+        :raises RecordQuotaException: Если у пользователя уже максимум записей
+            на этот день или неделю.
         """
-        if not self._record.is_available:
-            raise RecordStateException("Запись уже занята")
-        self._set_owner()
+        quota_condition = self._quota_condition()
+        if self._set_owner(quota_condition):
+            return
+        if quota_condition is not None:
+            owner_id, within_quota = (
+                LaundryRecord.objects.filter(pk=self._record.pk)
+                .annotate(
+                    within_quota=ExpressionWrapper(
+                        quota_condition, output_field=BooleanField()
+                    )
+                )
+                .values_list("owner_id", "within_quota")
+                .first()
+            ) or (None, True)
+            if owner_id is None and not within_quota:
+                raise RecordQuotaException
+        # Свободная запись в пределах лимита значит, что ее заняли и уже
+        # успели освободить
+        raise RecordConflictException("Запись уже занята")
 
-    def _set_owner(self) -> None:
-        """Установить текущего пользователя в качестве владельца текущей записи."""
-        self._record.owner = self._user
-        self._record.save()
+    def _set_owner(self, quota_condition: Q | None = None) -> bool:
+        """
+        Установить текущего пользователя владельцем текущей записи, если она
+        свободна и лимиты пользователя не превышены. Пользователь при этом
+        выходит из очереди на этот день.
+
+        :param quota_condition: Условие из _quota_condition, None - без лимитов.
+        :returns: True, если запись занята текущим пользователем.
+        """
+        with atomic():
+            queryset = LaundryRecord.objects.filter(
+                pk=self._record.pk, owner__isnull=True
+            )
+            if quota_condition is not None:
+                CustomUser.objects.select_for_update().filter(pk=self._user.pk).exists()
+                queryset = queryset.filter(quota_condition)
+            updated = queryset.update(
+                owner=self._user, taken_at=timezone.now(), checked_in_at=None
+            )
+            if updated:
+                LaundryWaitlistEntry.objects.filter(
+                    user=self._user, record_date=self._record.record_date
+                ).delete()
+        if updated:
+            self._record.owner = self._user
+            self._adjust_free_count(self._record.record_date, -1)
+        return bool(updated)
+
+    def _quota_condition(self) -> Q | None:
+        """
+        Условие "лимиты пользователя не превышены" для текущей записи.
+
+        Занятые пользователем записи на день и на неделю считаются
+        подзапросами, поэтому проверка выполняется тем же UPDATE.
+
+        :returns: Q или None, если лимиты не заданы.
+        """
+        day_quota, week_quota = self.get_quotas()
+        record_date = self._record.record_date
+        conditions = []
+        if day_quota is not None:
+            conditions.append(
+                LessThan(self._count_records(record_date=record_date), day_quota)
+            )
+        if week_quota is not None:
+            week_start = record_date - timedelta(days=record_date.weekday())
+            conditions.append(
+                LessThan(
+                    self._count_records(
+                        record_date__range=(week_start, week_start + timedelta(days=6))
+                    ),
+                    week_quota,
+                )
+            )
+        return Q(*conditions) if conditions else None
+
+    def _count_records(self, **filters) -> Subquery:
+        """Подзапрос количества записей текущего пользователя с :filters"""
+        return Subquery(
+            LaundryRecord.objects.filter(owner_id=self._user.pk, **filters)
+            .order_by()
+            .annotate(count=Func(F("pk"), function="COUNT"))
+            .values("count")
+        )
 
     def free_record(self) -> None:
         """
-        Освободить запись.
+        Освободить запись и передать ее первому подходящему из очереди.
 
-        :raises RecordStateException: Если запись уже свободна.
+        :raises RecordConflictException: Если запись уже свободна.
         :raises PermissionDenied: Если текущий пользователь не является владельцем записи.
         """
-        if self._record.is_available:
-            raise RecordStateException("Запись уже свободна")
-        if not self.is_owner_user():
-            raise PermissionDenied("Запись вам не принадлежит")
-        self._remove_owner()
+        if self._remove_owner():
+            return
+        self._record.owner_id = (
+            LaundryRecord.objects.filter(pk=self._record.pk)
+            .values_list("owner_id", flat=True)
+            .first()
+        )
+        if self._record.owner_id is None:
+            raise RecordConflictException("Запись уже свободна")
+        raise PermissionDenied("Запись вам не принадлежит")
+
+    def _remove_owner(self) -> bool:
+        """
+        Удалить владельца текущей записи, если это текущий пользователь.
+
+        :returns: True, если запись освобождена.
+        """
+        with atomic():
+            updated = LaundryRecord.objects.filter(
+                pk=self._record.pk, owner=self._user
+            ).update(owner=None, taken_at=None, checked_in_at=None)
+            if updated:
+                self._record.owner = None
+                self._adjust_free_count(self._record.record_date, 1)
+                self._promote_waitlist()
+        return bool(updated)
+
+    def _promote_waitlist(self) -> CustomUser | None:
+        """
+        Передать текущую запись первому в очереди на ее день.
 
-    def _remove_owner(self) -> None:
-        """Удалить владельца текущей записи."""
-        self._record.owner = None
-        self._record.save()
+        Вызывается в транзакции освобождения, пока строка записи заблокирована,
+        поэтому занять запись в обход очереди нельзя. Блокировки берутся в том
+        же порядке, что и при записи: запись, пользователь, место в очереди.
+        Проживающие, у которых превышены лимиты, пропускаются и остаются в
+        очереди. Проживающие, чью строку уже заблокировало параллельное
+        действие (своя запись или постановка в очередь), тоже пропускаются,
+        так что каждый получает не больше одной записи. Уже начавшаяся
+        запись никому не передается.
+
+        :returns: Новый владелец записи или None, если передать некому.
+        """
+        now = timezone.localtime()
+        if (self._record.record_date, self._record.time_start) < (
+            now.date(),
+            now.time(),
+        ):
+            return None
+        skipped = []
+        while True:
+            entry = (
+                LaundryWaitlistEntry.objects.filter(
+                    record_date=self._record.record_date
+                )
+                .exclude(pk__in=skipped)
+                .order_by("created_at", "id")
+                .values_list("pk", "user_id")
+                .first()
+            )
+            if entry is None:
+                return None
+            entry_id, user_id = entry
+            user = (
+                CustomUser.objects.select_for_update(skip_locked=True)
+                .filter(pk=user_id)
+                .first()
+            )
+            if user is None:
+                skipped.append(entry_id)
+                continue
+            entry_exists = (
+                LaundryWaitlistEntry.objects.select_for_update()
+                .filter(pk=entry_id)
+                .exists()
+            )
+            if not entry_exists:
+                # Проживающий успел занять запись сам или выйти из очереди
+                continue
+            service = LaundryService(user, self._record)
+            if service._set_owner(service._quota_condition()):
+                publish_user_event(
+                    [user.pk],
+                    {
+                        "event": "promoted",
+                        "type": "laundry_record",
+                        "id": self._record.pk,
+                        "record_date": self._record.record_date.isoformat(),
+                    },
+                )
+                return user
+            skipped.append(entry_id)
+
+    def check_in(self) -> None:
+        """
+        Отметить приход на запись.
+
+        Записи без отметки освобождаются задачей release_laundry_no_shows,
+        если в LaundryConfig задано время на отметку.
+
+        :raises RecordStateException: Если сейчас не день записи или запись
+            уже закончилась.
+        :raises RecordConflictException: Если приход уже отмечен.
+        :raises PermissionDenied: Если текущий пользователь не является владельцем записи.
+        """
+        now = timezone.localtime()
+        if (
+            self._record.record_date != now.date()
+            or self._record.time_end <= now.time()
+        ):
+            raise RecordStateException(
+                "Отметиться можно только в день записи до ее окончания"
+            )
+        updated = LaundryRecord.objects.filter(
+            pk=self._record.pk, owner=self._user, checked_in_at__isnull=True
+        ).update(checked_in_at=now)
+        if updated:
+            self._record.checked_in_at = now
+            return
+        owner_id = (
+            LaundryRecord.objects.filter(pk=self._record.pk)
+            .values_list("owner_id", flat=True)
+            .first()
+        )
+        if owner_id != self._user.pk:
+            raise PermissionDenied("Запись вам не принадлежит")
+        raise RecordConflictException("Приход уже отмечен")
 
     def is_owner_user(self) -> bool:
         """Проверить, является ли текущий пользователь владельцем текущей записи."""
-        return self._record.owner == self._user
+        return self._record.owner_id == self._user.pk
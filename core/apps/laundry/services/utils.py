@@ -1,15 +1,179 @@
-from datetime import date, time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+
+from django.db import connection
 from django.db.transaction import atomic
 
-from core.apps.laundry.models import LaundryRecord
+from core.apps.common.utils import date_range
+from core.apps.laundry.models import (
+    LaundryConfig,
+    LaundryNoShow,
+    LaundryRecord,
+    LaundryRecordArchive,
+    SlotTemplate,
+)
+from core.apps.laundry.services.laundry import LaundryService
+
+
+LAUNDRY_DAYS_AHEAD = 7
+LAUNDRY_ARCHIVE_BATCH_SIZE = 5000
+
+# Неотмеченные записи ищутся не дальше этого количества дней назад, чтобы
+# не освобождать старые записи, сделанные до включения отметок
+LAUNDRY_NO_SHOW_LOOKBACK_DAYS = 1
+
+LAUNDRY_NO_SHOW_SQL = """
+WITH released AS (
+    UPDATE {record} record SET owner_id = NULL, taken_at = NULL, checked_in_at = NULL
+    FROM (
+        SELECT id, owner_id FROM {record}
+        WHERE record_date >= %s
+            AND (record_date, time_start) <= (%s, %s)
+            AND owner_id IS NOT NULL
+            AND checked_in_at IS NULL
+            AND (taken_at IS NULL OR taken_at <= %s)
+        FOR UPDATE
+    ) previous
+    WHERE record.id = previous.id
+    RETURNING previous.owner_id, record.machine_id, record.record_date, record.time_start
+)
+INSERT INTO {no_show} (user_id, machine_id, record_date, time_start, released_at)
+SELECT owner_id, machine_id, record_date, time_start, %s FROM released
+RETURNING user_id, record_date
+"""
+
+LAUNDRY_ARCHIVE_SQL = """
+WITH moved AS (
+    DELETE FROM {record} WHERE id IN (
+        SELECT id FROM {record}
+        WHERE record_date < %s
+        ORDER BY record_date, time_start, id
+        LIMIT %s
+    )
+    RETURNING machine_id, record_date, time_start, time_end, owner_id
+)
+INSERT INTO {archive} (machine_id, record_date, time_start, time_end, owner_id, archived_at)
+SELECT machine_id, record_date, time_start, time_end, owner_id, now() FROM moved
+"""
+
+
+def generate_laundry_records(date_start: date, date_end: date) -> int:
+    """
+    Создает записи прачечной на даты от :date_start до :date_end по шаблонам.
+
+    Шаблоны используемых машин читаются одним запросом и раскладываются по
+    дням недели, все записи вставляются одним bulk_create. Уже существующие
+    записи пропускаются благодаря уникальности (machine, record_date,
+    time_start), поэтому повторный или параллельный запуск не создает
+    дубликатов и не трогает занятые записи. Счетчики свободных записей на
+    эти даты сбрасываются.
+
+    :returns: Количество записей, которые должны существовать на эти даты.
+    """
+    templates = defaultdict(list)
+    rows = SlotTemplate.objects.filter(machine__is_active=True).values_list(
+        "weekday", "machine_id", "time_start", "time_end"
+    )
+    for weekday, machine_id, time_start, time_end in rows:
+        templates[weekday].append((machine_id, time_start, time_end))
+
+    records = [
+        LaundryRecord(
+            machine_id=machine_id,
+            record_date=day,
+            time_start=time_start,
+            time_end=time_end,
+        )
+        for day in date_range(date_start, date_end)
+        for machine_id, time_start, time_end in templates[day.weekday()]
+    ]
+    if records:
+        LaundryRecord.objects.bulk_create(records, ignore_conflicts=True)
+        LaundryService.invalidate_free_counts(date_range(date_start, date_end))
+    return len(records)
+
+
+def create_laundry_records(
+    date_start: date | None = None, days_ahead: int = LAUNDRY_DAYS_AHEAD
+) -> int:
+    """
+    Создает записи прачечной на даты от :date_start на :days_ahead дней вперед.
+
+    :param date_start: Первая дата, по умолчанию сегодня.
+    :returns: Количество записей, которые должны существовать на эти даты.
+    """
+    date_start = date_start or date.today()
+    return generate_laundry_records(date_start, date_start + timedelta(days=days_ahead))
+
+
+def archive_past_laundry_records(
+    before: date, batch_size: int = LAUNDRY_ARCHIVE_BATCH_SIZE
+) -> int:
+    """
+    Переносит записи прачечной до :before в LaundryRecordArchive.
+
+    Каждая пачка из :batch_size записей удаляется и вставляется в архив
+    одним запросом (DELETE ... RETURNING внутри INSERT), отдельной
+    транзакцией, чтобы не держать блокировки на всю таблицу при первом
+    запуске. Выбор пачки идет по индексу (record_date, time_start, id).
+
+    :returns: Количество перенесенных записей.
+    """
+    sql = LAUNDRY_ARCHIVE_SQL.format(
+        record=LaundryRecord._meta.db_table,
+        archive=LaundryRecordArchive._meta.db_table,
+    )
+    archived_count = 0
+    while True:
+        with atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, (before, batch_size))
+            moved = cursor.rowcount
+        archived_count += moved
+        if moved < batch_size:
+            return archived_count
+
+
+def release_no_show_laundry_records(now: datetime) -> dict[int, int]:
+    """
+    Освобождает занятые записи без отметки о приходе, у которых к :now
+    истекло время на отметку из LaundryConfig.no_show_grace_minutes.
+    Время на отметку считается от начала записи или от момента, когда ее
+    заняли, если это было позже, поэтому запись, занятая или полученная из
+    очереди после начала, не освобождается сразу.
 
+    Все такие записи освобождаются одним UPDATE, который в том же запросе
+    записывает неявки в LaundryNoShow. Записи выбираются диапазоном по
+    индексу (record_date, time_start) за последние
+    LAUNDRY_NO_SHOW_LOOKBACK_DAYS дней. Освобожденные записи не передаются
+    очереди: их время уже началось. Если время на отметку не задано,
+    ничего не освобождается.
 
-def create_laundry_records_for_today():
-    today = date.today()
-    with atomic():
-        for hour in range(8, 22):
-            LaundryRecord.objects.create(
-                record_date=today,
-                time_start=time(hour=hour, minute=0),
-                time_end=time(hour=hour + 1, minute=0),
-            )
+    :param now: Текущее местное время.
+    :returns: Количество неявок по ID проживающих.
+    """
+    grace_minutes = (
+        LaundryConfig.objects.exclude(no_show_grace_minutes=None)
+        .values_list("no_show_grace_minutes", flat=True)
+        .first()
+    )
+    if grace_minutes is None:
+        return {}
+    deadline = now - timedelta(minutes=grace_minutes)
+    sql = LAUNDRY_NO_SHOW_SQL.format(
+        record=LaundryRecord._meta.db_table,
+        no_show=LaundryNoShow._meta.db_table,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql,
+            (
+                deadline.date() - timedelta(days=LAUNDRY_NO_SHOW_LOOKBACK_DAYS),
+                deadline.date(),
+                deadline.time(),
+                deadline,
+                now,
+            ),
+        )
+        rows = cursor.fetchall()
+    LaundryService.invalidate_free_counts({record_date for _, record_date in rows})
+    return dict(Counter(user_id for user_id, _ in rows))
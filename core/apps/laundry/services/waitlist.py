@@ -0,0 +1,81 @@
+from datetime import date, datetime
+
+from django.db import IntegrityError
+from django.db.models import Q
+from django.db.transaction import atomic
+from rest_framework.exceptions import NotFound
+
+from core.apps.laundry.exceptions import WaitlistConflictException
+from core.apps.laundry.models import LaundryWaitlistEntry
+from core.apps.laundry.services.laundry import LaundryService
+from core.apps.users.models import CustomUser
+
+
+class LaundryWaitlistService:
+    """
+    Сервис для очереди на записи прачечной.
+
+    Встать в очередь можно, только когда на день нет свободных записей,
+    которые еще не начались. Записи из очереди раздает
+    LaundryService.free_record.
+    """
+
+    @classmethod
+    def join(cls, user: CustomUser, record_date: date, now: datetime) -> int:
+        """
+        Поставить :user в очередь на :record_date.
+
+        Свободные записи ищутся в базе данных среди записей, которые
+        начинаются не раньше :now. Строки пользователя и этих записей
+        блокируются в том же порядке, что и при записи, до постановки в
+        очередь, поэтому запись, освобожденная во время проверки, либо будет
+        найдена, либо будет передана по очереди уже с новым проживающим.
+
+        :raises WaitlistConflictException: Если на этот день есть свободные
+            записи или пользователь уже в очереди.
+        :returns: int Место в очереди, начиная с 1.
+        """
+        with atomic():
+            CustomUser.objects.select_for_update().filter(pk=user.pk).exists()
+            owners = (
+                LaundryService.get_upcoming_records(now)
+                .filter(record_date=record_date)
+                .select_for_update()
+                .order_by("pk")
+                .values_list("owner_id", flat=True)
+            )
+            if None in owners:
+                raise WaitlistConflictException("На этот день есть свободные записи")
+            try:
+                with atomic():
+                    entry = LaundryWaitlistEntry.objects.create(
+                        user=user, record_date=record_date
+                    )
+            except IntegrityError:
+                raise WaitlistConflictException("Вы уже в очереди на этот день")
+        return cls.get_position(entry)
+
+    @classmethod
+    def leave(cls, user: CustomUser, record_date: date) -> None:
+        """
+        Убрать :user из очереди на :record_date.
+
+        :raises NotFound: Если пользователь не в очереди.
+        """
+        deleted, _ = LaundryWaitlistEntry.objects.filter(
+            user=user, record_date=record_date
+        ).delete()
+        if not deleted:
+            raise NotFound("Вы не в очереди на этот день")
+
+    @classmethod
+    def get_position(cls, entry: LaundryWaitlistEntry) -> int:
+        """Получить место :entry в очереди, начиная с 1"""
+        return (
+            LaundryWaitlistEntry.objects.filter(record_date=entry.record_date)
+            .filter(
+                Q(created_at__lt=entry.created_at)
+                | Q(created_at=entry.created_at, id__lte=entry.id)
+            )
+            .count()
+        )
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("proposals", "0006_alter_repairproposal_executor"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="repairproposal",
+            index=models.Index(
+                fields=["created_at", "id"], name="proposal_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="repairproposal",
+            index=models.Index(
+                fields=["author", "created_at", "id"],
+                name="proposal_author_created_idx",
+            ),
+        ),
+    ]
@@ -41,6 +41,13 @@ class RepairProposal(models.Model):
     class Meta:
         verbose_name = "Заявка на ремонт"
         verbose_name_plural = "Заявки на ремонт"
+        indexes = [
+            models.Index(fields=("created_at", "id"), name="proposal_created_id_idx"),
+            models.Index(
+                fields=("author", "created_at", "id"),
+                name="proposal_author_created_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Заявка номер {self.pk}."
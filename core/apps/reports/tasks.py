@@ -1,8 +1,23 @@
+import logging
 from datetime import timedelta
+from django.conf import settings
 from django.utils import timezone
 from celery import shared_task
 
-from core.apps.duties.services import generate_duty_schedule
+from core.apps.duties.services import (
+    SwapCycleService,
+    expire_stale_swap_requests,
+    finish_past_duties,
+    generate_duty_schedule,
+)
+from core.apps.laundry.services import (
+    archive_past_laundry_records,
+    create_laundry_records,
+    release_no_show_laundry_records,
+)
+
+
+logger = logging.getLogger(__name__)
 
 
 @shared_task
@@ -10,3 +25,66 @@ def create_duty_schedule():
     date_start = timezone.now().date() + timedelta(days=7)
     date_end = date_start + timedelta(days=6)
     generate_duty_schedule(date_start=date_start, date_end=date_end)
+
+
+@shared_task
+def close_past_duties() -> int:
+    """Завершает все прошедшие дежурства, возвращает количество завершенных"""
+    finished_count = finish_past_duties(today=timezone.now().date())
+    logger.info("Завершено прошедших дежурств: %s", finished_count)
+    return finished_count
+
+
+@shared_task
+def expire_swap_requests() -> dict[str, int]:
+    """Отменяет ожидающие заявки на прошедшие дежурства, возвращает их количество"""
+    expired = expire_stale_swap_requests(today=timezone.now().date())
+    logger.info(
+        "Отменено устаревших заявок: на обмен %s, на замену %s",
+        expired["swap_duties"],
+        expired["swap_people"],
+    )
+    return expired
+
+
+@shared_task
+def match_swap_cycles() -> int:
+    """Исполняет циклы обмена среди ожидающих заявок, возвращает количество циклов"""
+    executed_count = SwapCycleService.match()
+    logger.info("Исполнено циклов обмена дежурствами: %s", executed_count)
+    return executed_count
+
+
+@shared_task
+def create_laundry_slots() -> int:
+    """Создает записи прачечной на неделю вперед, возвращает количество слотов"""
+    slots_count = create_laundry_records(date_start=timezone.now().date())
+    logger.info("Проверено записей прачечной на неделю вперед: %s", slots_count)
+    return slots_count
+
+
+@shared_task
+def archive_laundry_records() -> int:
+    """
+    Переносит в архив записи прачечной старше LAUNDRY_ARCHIVE_AFTER_DAYS дней,
+    возвращает количество перенесенных записей
+    """
+    before = timezone.now().date() - timedelta(days=settings.LAUNDRY_ARCHIVE_AFTER_DAYS)
+    archived_count = archive_past_laundry_records(before=before)
+    logger.info("Перенесено в архив записей прачечной: %s", archived_count)
+    return archived_count
+
+
+@shared_task
+def release_laundry_no_shows() -> dict[int, int]:
+    """
+    Освобождает записи прачечной без отметки о приходе, возвращает количество
+    неявок по ID проживающих
+    """
+    no_shows = release_no_show_laundry_records(now=timezone.localtime())
+    logger.info(
+        "Освобождено записей прачечной без отметки: %s, проживающих: %s",
+        sum(no_shows.values()),
+        len(no_shows),
+    )
+    return no_shows
@@ -192,8 +192,65 @@ CELERY_BEAT_SCHEDULE = {
         "task": "core.apps.reports.tasks.create_duty_schedule",
         "schedule": crontab(minute=0, hour=4, day_of_week=1),
     },
+    "close_past_duties": {
+        "task": "core.apps.reports.tasks.close_past_duties",
+        "schedule": crontab(minute=30, hour=0),
+    },
+    "expire_swap_requests": {
+        "task": "core.apps.reports.tasks.expire_swap_requests",
+        "schedule": crontab(minute=45, hour=0),
+    },
+    "create_laundry_slots": {
+        "task": "core.apps.reports.tasks.create_laundry_slots",
+        "schedule": crontab(minute=15, hour=0),
+    },
+    "archive_laundry_records": {
+        "task": "core.apps.reports.tasks.archive_laundry_records",
+        "schedule": crontab(minute=0, hour=1),
+    },
+    "release_laundry_no_shows": {
+        "task": "core.apps.reports.tasks.release_laundry_no_shows",
+        "schedule": crontab(minute="*/5"),
+    },
+    "match_swap_cycles": {
+        "task": "core.apps.reports.tasks.match_swap_cycles",
+        "schedule": crontab(minute="*/15"),
+    },
 }
 
+# Laundry settings
+# Записи прачечной старше этого количества дней переносятся в архив
+
+LAUNDRY_ARCHIVE_AFTER_DAYS = env.int("LAUNDRY_ARCHIVE_AFTER_DAYS", default=90)
+
+# Cache settings
+# По умолчанию кеш в памяти процесса, с CACHE_REDIS_URL - общий кеш в Redis.
+# Кеш в памяти у каждого процесса свой: изменения из других воркеров и задач
+# Celery до него не доходят, поэтому при нескольких процессах нужен
+# CACHE_REDIS_URL. Без него счетчики свободных записей прачечной не
+# кешируются, а лимиты из LaundryConfig в других процессах обновляются с
+# задержкой до LAUNDRY_QUOTAS_TIMEOUT
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+if CACHE_REDIS_URL := env("CACHE_REDIS_URL", default=None):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": CACHE_REDIS_URL,
+    }
+
+LAUNDRY_CACHE_FREE_COUNTS = CACHE_REDIS_URL is not None
+
+# Events settings
+# Без EVENTS_REDIS_URL события доставляются только внутри одного процесса:
+# события из задач Celery (например, match_swap_cycles) и из других
+# воркеров не дойдут до подписчиков
+
+EVENTS_REDIS_URL = env("EVENTS_REDIS_URL", default=None)
+
 # REST framework settings
 
 REST_FRAMEWORK = {
@@ -225,5 +282,9 @@ LOGGING = {
             "handlers": ["console"],
             "level": "DEBUG",
         },
+        "core.apps.reports.tasks": {
+            "handlers": ["console"],
+            "level": "INFO",
+        },
     },
 }
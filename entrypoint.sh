@@ -1 +1 @@
-python manage.py migrate && python manage.py collectstatic --no-input && gunicorn core.project.wsgi:application --bind 0.0.0.0:8000
\ No newline at end of file
+python manage.py migrate && python manage.py collectstatic --no-input && gunicorn core.project.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000
\ No newline at end of file
@@ -0,0 +1,32 @@
+from asgiref.sync import async_to_sync
+
+from core.apps.common.events import LocalEventBroker
+
+
+def test_local_broker_delivers_to_channel_subscribers():
+    """Тестирует, что событие получают только подписчики его канала"""
+    broker = LocalEventBroker()
+
+    async def receive() -> tuple:
+        async with (
+            await broker.subscribe("user:1") as first,
+            await broker.subscribe("user:2") as second,
+        ):
+            broker.publish("user:1", {"event": "created"})
+            return await first.get(timeout=1), await second.get(timeout=0.01)
+
+    assert async_to_sync(receive)() == ({"event": "created"}, None)
+
+
+def test_local_broker_unsubscribes_on_close():
+    """Тестирует, что после закрытия подписки канал удаляется"""
+    broker = LocalEventBroker()
+
+    async def subscribe_and_close() -> None:
+        async with await broker.subscribe("user:1"):
+            pass
+
+    async_to_sync(subscribe_and_close)()
+    broker.publish("user:1", {"event": "created"})
+
+    assert broker._subscriptions == {}
@@ -0,0 +1,152 @@
+import json
+from base64 import b64encode
+from datetime import date, time, timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+import pytest
+
+from core.api.v1.pagination import KeysetPagination
+from core.apps.laundry.models import LaundryRecord
+
+
+@pytest.fixture
+def many_laundry_records() -> list[LaundryRecord]:
+    """60 записей на 6 дней, по 10 записей с одинаковой датой на каждый день"""
+    records = []
+    for day in range(6):
+        for hour in (9, 10):
+            for minute in range(0, 50, 10):
+                records.append(
+                    LaundryRecord(
+                        record_date=date.today() + timedelta(days=day),
+                        time_start=time(hour=hour, minute=minute),
+                        time_end=time(hour=hour + 1, minute=minute),
+                    )
+                )
+    return LaundryRecord.objects.bulk_create(records)
+
+
+def expected_order(records: list[LaundryRecord]) -> list[int]:
+    return [
+        record.pk
+        for record in sorted(records, key=lambda r: (r.record_date, r.time_start, r.pk))
+    ]
+
+
+@pytest.mark.django_db
+def test_legacy_mode_returns_full_list(user_client, many_laundry_records):
+    """Тестирует, что без page_size и cursor ответ остается полным списком"""
+    url = reverse("laundry_records-list")
+    response = user_client.get(url)
+
+    assert response.status_code == HTTP_200_OK
+    data = response.json()
+    assert isinstance(data, list)
+    assert len(data) > KeysetPagination.page_size
+    assert [record["pk"] for record in data] == expected_order(many_laundry_records)
+    assert "Link" not in response
+
+
+@pytest.mark.django_db
+def test_cursor_without_page_size_returns_list_with_link_header(
+    user_client, many_laundry_records
+):
+    """Тестирует, что с одним cursor ответ остается списком, а ссылки передаются в Link"""
+    url = reverse("laundry_records-list")
+    next_url = user_client.get(f"{url}?page_size=10").json()["next"]
+    next_url = next_url.replace("page_size=10&", "").replace("&page_size=10", "")
+
+    response = user_client.get(next_url)
+
+    assert response.status_code == HTTP_200_OK
+    page = response.json()
+    assert isinstance(page, list)
+    assert len(page) == KeysetPagination.page_size
+    assert [record["pk"] for record in page] == expected_order(many_laundry_records)[
+        10:60
+    ]
+    assert 'rel="prev"' in response["Link"]
+    assert 'rel="next"' not in response["Link"]
+
+
+@pytest.mark.django_db
+def test_envelope_mode_walks_forward_and_back(user_client, many_laundry_records):
+    """Тестирует обход всех страниц вперед и назад при записях с одинаковым временем"""
+    url = reverse("laundry_records-list")
+    pages = []
+    next_url = f"{url}?page_size=7"
+    while next_url:
+        data = user_client.get(next_url).json()
+        pages.append([record["pk"] for record in data["results"]])
+        next_url = data["next"]
+
+    assert [pk for page in pages for pk in page] == expected_order(many_laundry_records)
+    assert all(len(page) == 7 for page in pages[:-1])
+
+    previous_pages = []
+    previous_url = data["previous"]
+    while previous_url:
+        data = user_client.get(previous_url).json()
+        previous_pages.append([record["pk"] for record in data["results"]])
+        previous_url = data["previous"]
+
+    assert previous_pages == pages[-2::-1]
+
+
+@pytest.mark.django_db
+def test_page_query_does_not_use_offset(user_client, many_laundry_records):
+    """Тестирует, что следующая страница выбирается по ключу, а не смещением"""
+    url = reverse("laundry_records-list")
+    next_url = user_client.get(f"{url}?page_size=10").json()["next"]
+
+    with CaptureQueriesContext(connection) as context:
+        response = user_client.get(next_url)
+
+    assert response.status_code == HTTP_200_OK
+    sql = " ".join(query["sql"] for query in context.captured_queries)
+    assert "OFFSET" not in sql
+    assert "LIMIT 11" in sql
+
+
+@pytest.mark.django_db
+def test_invalid_cursor(user_client):
+    """Тестирует, что поврежденный курсор приводит к 404"""
+    url = reverse("laundry_records-list")
+    response = user_client.get(url, {"cursor": "not a cursor"})
+
+    assert response.status_code == HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    "url_name, position",
+    (
+        ("laundry_records-list", ["notadate", "x", "y"]),
+        ("laundry_records-list", ["2024-01-01", "10:00", "x"]),
+        ("laundry_records-list", ["2024-01-01", "10:00", None]),
+        ("requests-swaps-list", ["2024-01-01T10:00:00+00:00", [1], "swap_people"]),
+    ),
+)
+@pytest.mark.django_db
+def test_tampered_cursor(user_client, url_name, position):
+    """Тестирует, что курсор с некорректными значениями ключа приводит к 404"""
+    payload = json.dumps({"p": position, "r": 0}).encode()
+    cursor = b64encode(payload, altchars=b"-_").decode()
+    response = user_client.get(reverse(url_name), {"cursor": cursor})
+
+    assert response.status_code == HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_duty_records_envelope(user_client, test_duties):
+    """Тестирует пагинацию дежурств по (date, id) в порядке убывания даты"""
+    url = reverse("duty-records-list")
+    data = user_client.get(url, {"page_size": 3}).json()
+
+    dates = [duty["date"] for duty in data["results"]]
+    assert len(dates) == 3
+    assert dates == sorted(dates, reverse=True)
+    assert data["previous"] is None
+    assert data["next"] is not None
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from datetime import date, time, timedelta
 from django.test import Client
 import pytest
@@ -6,7 +7,7 @@ import pytest
 from rest_framework.test import APIClient
 
 from core.apps.duties.models import KitchenDuty, KitchenDutyConfig
-from core.apps.laundry.models import LaundryRecord
+from core.apps.laundry.models import LaundryRecord, Machine, SlotTemplate
 from core.apps.proposals.models import RepairProposal
 from core.apps.rooms.models import Block, Room, RoomRecord
 from core.apps.users.models import CustomUser
@@ -15,6 +16,12 @@ from core.apps.users.models import CustomUser
 UserModel = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кеш в памяти процесса общий для всех тестов, поэтому очищается перед каждым"""
+    cache.clear()
+
+
 @pytest.fixture
 def client() -> APIClient:
     return APIClient()
@@ -63,6 +70,26 @@ def test_laundry_records() -> list[LaundryRecord]:
     return records
 
 
+@pytest.fixture
+def test_machines() -> list[Machine]:
+    """4 машины, по будням записи по 45 минут каждый час с 8 до 22"""
+    machines = Machine.objects.bulk_create(
+        Machine(name=f"Машина #{i}") for i in range(1, 5)
+    )
+    SlotTemplate.objects.bulk_create(
+        SlotTemplate(
+            machine=machine,
+            weekday=weekday,
+            time_start=time(hour=hour),
+            time_end=time(hour=hour, minute=45),
+        )
+        for machine in machines
+        for weekday in range(5)
+        for hour in range(8, 22)
+    )
+    return machines
+
+
 @pytest.fixture
 def test_room(user_for_client) -> Room:
     block = Block.objects.create(floor=1)
@@ -143,7 +170,7 @@ def test_duties(test_users) -> list[KitchenDuty]:
 def test_user_with_finished_duties() -> CustomUser:
     user = CustomUser.objects.create(username="user_with_duties123")
     for i in range(1, 11):
-        duty = KitchenDuty.objects.create(date=date.today() + timedelta(days=i))
+        duty = KitchenDuty.objects.create(date=date.today() - timedelta(days=i))
         duty.people.add(user)
         duty.finished = True
         duty.save()
@@ -3,6 +3,10 @@ from rest_framework.status import HTTP_200_OK
 from datetime import date, timedelta
 import pytest
 
+from core.apps.duties.models import KitchenDuty
+from core.apps.rooms.models import Block, Room
+from core.apps.users.models import CustomUser
+
 
 @pytest.mark.django_db
 def test_list(user_client, test_duties):
@@ -53,3 +57,62 @@ def test_nearest_duty(client, test_duties):
         response.json()[0].get("pk")
         == test_user.kitchen_duties.order_by("-date").first().pk
     )
+
+
+DUTY_RECORDS_QUERY_BUDGETS = {
+    "duty-records-list": 2,
+    "duty-records-my-duties": 2,
+    "duty-records-nearest-duty": 2,
+    "duty-records-duties-to-swap": 4,
+}
+
+
+def create_duties_with_people(days: int, people_per_day: int) -> list[KitchenDuty]:
+    """Создает дежурства на :days дней вперед, в каждом :people_per_day дежурных с комнатами"""
+    block = Block.objects.create(floor=1)
+    duties = []
+    for day in range(days):
+        duty = KitchenDuty.objects.create(date=date.today() + timedelta(days=day))
+        for i in range(people_per_day):
+            room = Room.objects.create(number=f"{day}-{i}", block=block)
+            duty.people.add(
+                CustomUser.objects.create(username=f"pupil#{day}-{i}", room=room)
+            )
+        duties.append(duty)
+    return duties
+
+
+def assert_query_budget(client, url_name, args, budget, django_assert_num_queries):
+    """Проверяет, что запрос к :url_name укладывается ровно в :budget запросов к БД"""
+    url = reverse(url_name, args=args)
+    with django_assert_num_queries(budget):
+        response = client.get(url)
+    assert response.status_code == HTTP_200_OK
+    return response
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("days", (3, 28))
+@pytest.mark.parametrize("url_name", DUTY_RECORDS_QUERY_BUDGETS)
+def test_query_budget(client, url_name, days, django_assert_num_queries):
+    """Тестирует, что количество запросов не зависит от количества дежурств и дежурных"""
+    duties = create_duties_with_people(days=days, people_per_day=3)
+    test_user = duties[0].people.first()
+    for duty in duties[1:]:
+        duty.people.add(test_user)
+    client.force_authenticate(test_user)
+    args = (duties[0].pk,) if url_name == "duty-records-duties-to-swap" else ()
+
+    response = assert_query_budget(
+        client,
+        url_name,
+        args,
+        DUTY_RECORDS_QUERY_BUDGETS[url_name],
+        django_assert_num_queries,
+    )
+
+    assert all(
+        person["room"] is not None
+        for duty in response.json()
+        for person in duty["people"]
+    )
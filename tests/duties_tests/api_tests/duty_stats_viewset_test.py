@@ -0,0 +1,40 @@
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+import pytest
+
+from core.apps.duties.services import DutyStatsService
+
+
+@pytest.mark.django_db
+def test_list(user_client, test_duties, django_assert_max_num_queries):
+    """Тестирует получение статистики дежурств за текущий учебный год"""
+    DutyStatsService.rebuild()
+    url = reverse("duty-stats-list")
+
+    with django_assert_max_num_queries(3):
+        response = user_client.get(url)
+
+    assert response.status_code == HTTP_200_OK
+    data = response.json()
+    assert len(data) == DutyStatsService.get_for_year().count()
+    assert data[0]["duties_count"] >= data[-1]["duties_count"]
+
+
+@pytest.mark.django_db
+def test_my_stats(user_client, user_for_client, test_duties):
+    """Тестирует получение статистики текущего пользователя"""
+    DutyStatsService.rebuild()
+    url = reverse("duty-stats-my-stats")
+    response = user_client.get(url)
+
+    assert response.status_code == HTTP_200_OK
+    data = response.json()
+    assert all(item["resident"]["pk"] == user_for_client.pk for item in data)
+
+
+@pytest.mark.django_db
+def test_list_wrong_year(user_client):
+    url = reverse("duty-stats-list")
+    response = user_client.get(url, {"year": "abc"})
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
@@ -3,6 +3,11 @@ import pytest
 
 from rest_framework.status import HTTP_201_CREATED, HTTP_200_OK
 
+from core.apps.duties.choices import (
+    SWAP_REQUEST_ACCEPTED,
+    SWAP_REQUEST_CANCELED,
+    SWAP_REQUEST_PENDING,
+)
 from core.apps.duties.models import SwapDutiesRequest
 
 
@@ -229,3 +234,69 @@ def test_get_incoming_requests(client, test_duties):
     response = client.get(url)
 
     assert response.json()[0].get("pk") == swap_request.pk
+
+
+@pytest.mark.django_db
+def test_get_incoming_requests_only_pending(client, test_duties):
+    """Тестирует, что во входящих остаются только заявки, ожидающие ответа"""
+    test_duty = test_duties[4]
+    test_user = test_duty.people.first()
+    duty_to_swap = test_duties[5]
+    user_to_swap = duty_to_swap.people.first()
+
+    requests = {
+        status: SwapDutiesRequest.objects.create(
+            first_user=user_to_swap,
+            first_duty=duty_to_swap,
+            second_user=test_user,
+            second_duty=test_duty,
+            status=status,
+        )
+        for status in (
+            SWAP_REQUEST_PENDING,
+            SWAP_REQUEST_ACCEPTED,
+            SWAP_REQUEST_CANCELED,
+        )
+    }
+
+    client.force_authenticate(test_user)
+    url = reverse("duty-swaps-get-incoming-requests")
+    data = client.get(url).json()
+
+    assert [item["pk"] for item in data] == [requests[SWAP_REQUEST_PENDING].pk]
+    assert data[0]["status"] == SWAP_REQUEST_PENDING
+    assert data[0]["accepted"] is False
+
+
+@pytest.mark.django_db
+def test_batch_cancel(client, test_duties, django_assert_max_num_queries):
+    """
+    Тестирует пакетную отмену исходящих запросов на обмен: загрузка заявок,
+    блокировка всех дежурств и всех заявок выполняются по одному запросу
+    на пакет, остальные запросы - на каждую заявку
+    """
+    initiator_duty = test_duties[4]
+    initiator = initiator_duty.people.first()
+    requests = [
+        SwapDutiesRequest.objects.create(
+            first_user=initiator,
+            first_duty=initiator_duty,
+            second_user=duty.people.first(),
+            second_duty=duty,
+        )
+        for duty in test_duties[5:9]
+    ]
+    client.force_authenticate(initiator)
+
+    url = reverse("duty-swaps-batch")
+    with django_assert_max_num_queries(5 + 4 * len(requests)):
+        response = client.post(
+            url,
+            {"ids": [request.pk for request in requests], "operation": "cancel"},
+            format="json",
+        )
+
+    assert response.status_code == HTTP_200_OK
+    assert all(result["success"] for result in response.json())
+    assert all(result["status"] == SWAP_REQUEST_CANCELED for result in response.json())
+    assert not SwapDutiesRequest.objects.filter(status=SWAP_REQUEST_PENDING).exists()
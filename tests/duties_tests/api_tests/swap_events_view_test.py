@@ -0,0 +1,67 @@
+import json
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient
+from django.urls import reverse
+import pytest
+
+from core.apps.duties.services import SwapPeopleService
+
+
+def parse_event(chunk: bytes) -> dict:
+    """Получить данные события из сообщения SSE"""
+    lines = chunk.decode().splitlines()
+    return json.loads(next(line for line in lines if line.startswith("data: "))[6:])
+
+
+@pytest.mark.django_db
+def test_swap_events_requires_authentication():
+    """Тестирует, что поток событий недоступен анонимному пользователю"""
+    response = async_to_sync(AsyncClient().get)(reverse("swap-events"))
+
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_swap_events_rejects_wsgi(client, test_user):
+    """Тестирует, что под WSGI поток событий отклоняется, а не зависает"""
+    client.force_login(test_user)
+    response = client.get(reverse("swap-events"))
+
+    assert response.status_code == 501
+
+
+@pytest.mark.django_db
+def test_swap_events_stream(
+    test_duties, test_users, django_capture_on_commit_callbacks
+):
+    """Тестирует, что адресат получает события о создании и отмене заявки"""
+    duty = test_duties[0]
+    initiator = duty.people.first()
+    target = test_users[-1]
+
+    def create() -> None:
+        with django_capture_on_commit_callbacks(execute=True):
+            request = SwapPeopleService.create(initiator, duty, target)
+        with django_capture_on_commit_callbacks(execute=True):
+            SwapPeopleService(initiator, request).cancel()
+
+    async def listen() -> tuple:
+        client = AsyncClient()
+        await client.aforce_login(target)
+        response = await client.get(reverse("swap-events"))
+        chunks = aiter(response.streaming_content)
+        retry = await anext(chunks)
+        await sync_to_async(create)()
+        created, canceled = await anext(chunks), await anext(chunks)
+        await chunks.aclose()
+        return response, retry, created, canceled
+
+    response, retry, created, canceled = async_to_sync(listen)()
+
+    assert response["Content-Type"] == "text/event-stream"
+    assert retry.startswith(b"retry:")
+    assert created.startswith(b"event: created\n")
+    assert parse_event(created)["type"] == "swap_people"
+    assert parse_event(canceled)["event"] == "canceled"
+    assert parse_event(canceled)["id"] == parse_event(created)["id"]
@@ -1,8 +1,13 @@
 from django.urls import reverse
 import pytest
 
-from rest_framework.status import HTTP_201_CREATED, HTTP_200_OK
+from rest_framework.status import HTTP_201_CREATED, HTTP_200_OK, HTTP_400_BAD_REQUEST
 
+from core.apps.duties.choices import (
+    SWAP_REQUEST_ACCEPTED,
+    SWAP_REQUEST_DECLINED,
+    SWAP_REQUEST_PENDING,
+)
 from core.apps.duties.models import SwapPeopleRequest
 
 
@@ -179,3 +184,66 @@ def test_get_incoming_requests(client, user_for_client, test_duties):
 
     assert response.status_code == HTTP_200_OK
     assert response.json()[0].get("pk") == swap_request.pk, print(response.json())
+
+
+@pytest.mark.django_db
+def test_batch_accept(user_client, user_for_client, test_users, test_duties):
+    """
+    Тестирует пакетное принятие запросов на замену с результатом по каждой заявке.
+    """
+    accepted = [
+        SwapPeopleRequest.objects.create(
+            duty=test_duties[i], current_user=test_users[i], to_swap=user_for_client
+        )
+        for i in (1, 2)
+    ]
+    declined = SwapPeopleRequest.objects.create(
+        duty=test_duties[3],
+        current_user=test_users[3],
+        to_swap=user_for_client,
+        status=SWAP_REQUEST_DECLINED,
+    )
+    foreign = SwapPeopleRequest.objects.create(
+        duty=test_duties[4], current_user=test_users[4], to_swap=test_users[5]
+    )
+    ids = [request.pk for request in (*accepted, declined, foreign)] + [0]
+
+    url = reverse("people-swaps-batch")
+    response = user_client.post(url, {"ids": ids, "operation": "accept"}, format="json")
+
+    assert response.status_code == HTTP_200_OK
+    results = response.json()
+    assert [result["pk"] for result in results] == ids
+    assert [result["success"] for result in results] == [
+        True,
+        True,
+        False,
+        False,
+        False,
+    ]
+    assert [result["status"] for result in results] == [
+        SWAP_REQUEST_ACCEPTED,
+        SWAP_REQUEST_ACCEPTED,
+        SWAP_REQUEST_DECLINED,
+        SWAP_REQUEST_PENDING,
+        None,
+    ]
+    assert all(result["detail"] for result in results[2:])
+    for i in (1, 2):
+        assert user_for_client in test_duties[i].people.all()
+        assert test_users[i] not in test_duties[i].people.all()
+    foreign.refresh_from_db()
+    assert foreign.status == SWAP_REQUEST_PENDING
+
+
+@pytest.mark.django_db
+def test_batch_invalid_operation(user_client):
+    """
+    Тестирует, что неизвестная операция и пустой список отклоняются.
+    """
+    url = reverse("people-swaps-batch")
+
+    response = user_client.post(url, {"ids": [1], "operation": "swap"}, format="json")
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    response = user_client.post(url, {"ids": [], "operation": "accept"}, format="json")
+    assert response.status_code == HTTP_400_BAD_REQUEST
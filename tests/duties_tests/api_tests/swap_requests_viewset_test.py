@@ -1,7 +1,8 @@
 from django.urls import reverse
-from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 import pytest
 
+from core.apps.duties.choices import SWAP_REQUEST_ACCEPTED, SWAP_REQUEST_DECLINED
 from core.apps.duties.models import SwapDutiesRequest, SwapPeopleRequest
 
 
@@ -32,5 +33,76 @@ def test_list(client, user_for_client, test_duties):
 
     assert response.status_code == HTTP_200_OK
     assert len(response.json()) == 2
-    assert response.json()[0].get("pk") == swap_people_request.pk
-    assert response.json()[1].get("pk") == swap_duties_request.pk
+    assert response.json()[0].get("pk") == swap_duties_request.pk
+    assert response.json()[0].get("type") == "swap_duties"
+    assert response.json()[1].get("pk") == swap_people_request.pk
+    assert response.json()[1].get("type") == "swap_people"
+
+
+def create_incoming_requests(test_duties, test_user, count: int) -> list:
+    """Создает :count входящих заявок для :test_user от разных проживающих, чередуя типы"""
+    other_duties = [duty for duty in test_duties if duty != test_duties[6]]
+    requests = []
+    for i in range(count):
+        duty_to_swap = other_duties[i % len(other_duties)]
+        user_to_swap = duty_to_swap.people.first()
+        if i % 2:
+            requests.append(
+                SwapPeopleRequest.objects.create(
+                    duty=duty_to_swap, current_user=user_to_swap, to_swap=test_user
+                )
+            )
+        else:
+            requests.append(
+                SwapDutiesRequest.objects.create(
+                    first_duty=duty_to_swap,
+                    first_user=user_to_swap,
+                    second_duty=test_duties[6],
+                    second_user=test_user,
+                )
+            )
+    return requests
+
+
+@pytest.mark.django_db
+def test_list_pages(client, test_duties, django_assert_num_queries):
+    """Тестирует постраничный обход входящих заявок от новых к старым"""
+    test_user = test_duties[6].people.first()
+    client.force_authenticate(test_user)
+    requests = create_incoming_requests(test_duties, test_user, count=11)
+
+    url = reverse("requests-swaps-list")
+    received = []
+    next_url = f"{url}?page_size=4"
+    while next_url:
+        with django_assert_num_queries(6):
+            data = client.get(next_url).json()
+        received.extend((item["type"], item["pk"]) for item in data["results"])
+        next_url = data["next"]
+
+    expected = [
+        ("swap_people" if isinstance(r, SwapPeopleRequest) else "swap_duties", r.pk)
+        for r in reversed(requests)
+    ]
+    assert received == expected
+
+
+@pytest.mark.django_db
+def test_list_status_filter(client, test_duties):
+    """Тестирует фильтрацию входящих заявок по статусу"""
+    test_user = test_duties[6].people.first()
+    client.force_authenticate(test_user)
+    requests = create_incoming_requests(test_duties, test_user, count=4)
+    requests[0].status = SWAP_REQUEST_DECLINED
+    requests[0].save()
+    requests[1].status = SWAP_REQUEST_ACCEPTED
+    requests[1].save()
+
+    url = reverse("requests-swaps-list")
+    pending = client.get(url, {"status": "pending"}).json()
+    declined = client.get(url, {"status": "declined"}).json()
+
+    assert [item["pk"] for item in pending] == [requests[3].pk, requests[2].pk]
+    assert [item["pk"] for item in declined] == [requests[0].pk]
+    response = client.get(url, {"status": "unknown"})
+    assert response.status_code == HTTP_400_BAD_REQUEST
@@ -1,6 +1,19 @@
 from datetime import date, timedelta
-from core.apps.duties.models import KitchenDuty
-from core.apps.duties.services import generate_duty_schedule
+from time import perf_counter
+from core.apps.common.services import get_academic_year
+from core.apps.duties.choices import SWAP_REQUEST_CANCELED, SWAP_REQUEST_PENDING
+from core.apps.duties.models import (
+    DutyStats,
+    KitchenDuty,
+    SwapDutiesRequest,
+    SwapPeopleRequest,
+)
+from core.apps.duties.services import (
+    expire_stale_swap_requests,
+    finish_past_duties,
+    generate_duty_schedule,
+)
+from core.apps.users.models import CustomUser
 import pytest
 
 
@@ -54,3 +67,190 @@ def test_generate_schedule_success_with_duties_count_priority(
         test_user_with_finished_duties.kitchen_duties.filter(finished=True).count()
         == 10
     )
+
+
+@pytest.mark.django_db
+def test_generate_schedule_bulk_queries(
+    default_duties_config, django_assert_num_queries
+):
+    """
+    Тестирует, что генерация графика на год для 2000 проживающих
+    выполняется фиксированным количеством запросов и укладывается по времени.
+
+    Запросы: чтение конфигурации, существующих дежурств и кандидатов,
+    вставка дежурств, дежурных и строк статистики, обновление счетчиков
+    статистики на каждый из двух учебных годов, которые захватывает график,
+    и SAVEPOINT транзакции. Количество не зависит от числа проживающих.
+    """
+    CustomUser.objects.bulk_create(
+        CustomUser(username=f"resident#{i}") for i in range(2000)
+    )
+    start = date.today()
+    end = start + timedelta(days=364)
+
+    started_at = perf_counter()
+    with django_assert_num_queries(10):
+        generate_duty_schedule(start, end)
+    elapsed = perf_counter() - started_at
+
+    assert KitchenDuty.objects.count() == 365
+    assert (
+        KitchenDuty.people.through.objects.count()
+        == 365 * default_duties_config.people_per_day
+    )
+    assert elapsed < 2
+
+
+@pytest.mark.django_db
+def test_generate_schedule_idempotent(
+    test_users_with_rooms, default_duties_config, django_assert_num_queries
+):
+    """
+    Тестирует, что повторная генерация на те же даты не создает дубликатов
+    и ограничивается чтением конфигурации и одним запросом на сравнение.
+    """
+    start = date.today()
+    end = start + timedelta(days=59)
+    generate_duty_schedule(start, end)
+    assignments = set(KitchenDuty.people.through.objects.values_list("pk", flat=True))
+
+    with django_assert_num_queries(2):
+        assert generate_duty_schedule(start, end) == []
+
+    assert KitchenDuty.objects.count() == 60
+    assert (
+        set(KitchenDuty.people.through.objects.values_list("pk", flat=True))
+        == assignments
+    )
+
+
+@pytest.mark.django_db
+def test_generate_schedule_tops_up_understaffed(
+    test_users_with_rooms, default_duties_config
+):
+    """
+    Тестирует, что повторная генерация добирает людей только в неполные незавершенные дежурства.
+    """
+    start = date.today()
+    end = start + timedelta(days=6)
+    generate_duty_schedule(start, end)
+
+    understaffed = KitchenDuty.objects.get(date=start + timedelta(days=2))
+    moved_out = understaffed.people.first()
+    understaffed.people.remove(moved_out)
+    finished = KitchenDuty.objects.get(date=start + timedelta(days=4))
+    finished.people.remove(finished.people.first())
+    finished.finish()
+    untouched = set(
+        KitchenDuty.people.through.objects.exclude(
+            kitchenduty=understaffed
+        ).values_list("pk", flat=True)
+    )
+
+    updated = generate_duty_schedule(start, end)
+
+    assert [duty.pk for duty in updated] == [understaffed.pk]
+    assert understaffed.people.count() == default_duties_config.people_per_day
+    assert finished.people.count() == default_duties_config.people_per_day - 1
+    assert untouched <= set(
+        KitchenDuty.people.through.objects.values_list("pk", flat=True)
+    )
+    assert KitchenDuty.objects.count() == 7
+
+
+@pytest.mark.django_db
+def test_generate_schedule_fills_missing_dates(
+    test_users_with_rooms, default_duties_config
+):
+    """
+    Тестирует, что генерация создает только отсутствующие даты.
+    """
+    start = date.today()
+    KitchenDuty.objects.create(date=start + timedelta(days=1)).people.add(
+        *test_users_with_rooms[0][:2]
+    )
+
+    created = generate_duty_schedule(start, start + timedelta(days=2))
+
+    assert sorted(duty.date for duty in created) == [start, start + timedelta(days=2)]
+    assert KitchenDuty.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_finish_past_duties(test_users, test_duties, django_assert_max_num_queries):
+    """
+    Тестирует закрытие всех прошедших дежурств одним запросом
+    с обновлением статистики дежурных.
+    """
+    today = date.today()
+    past_duties = []
+    for i in range(1, 6):
+        duty = KitchenDuty.objects.create(date=today - timedelta(days=i))
+        duty.people.add(test_users[0], test_users[i])
+        past_duties.append(duty)
+    past_duties[0].finish()
+
+    with django_assert_max_num_queries(8):
+        assert finish_past_duties(today) == 4
+
+    assert not KitchenDuty.objects.filter(date__lt=today, finished=False).exists()
+    assert not KitchenDuty.objects.filter(date__gte=today, finished=True).exists()
+    assert finish_past_duties(today) == 0
+    for user in test_users[2:6]:
+        stats = DutyStats.objects.get(
+            user=user, academic_year=get_academic_year(today - timedelta(days=2))
+        )
+        assert stats.finished_duties_count == 1
+
+
+@pytest.mark.django_db
+def test_expire_stale_swap_requests(test_users, test_duties, django_assert_num_queries):
+    """
+    Тестирует отмену ожидающих заявок на прошедшие и завершенные дежурства
+    двумя запросами, заявки на будущие дежурства не меняются.
+    """
+    today = date.today()
+    past_duty = KitchenDuty.objects.create(date=today - timedelta(days=1))
+    past_duty.people.add(test_users[0])
+    test_duties[1].finish()
+
+    stale = [
+        SwapDutiesRequest.objects.create(
+            first_duty=past_duty,
+            first_user=test_users[0],
+            second_duty=test_duties[2],
+            second_user=test_users[2],
+        ),
+        SwapDutiesRequest.objects.create(
+            first_duty=test_duties[2],
+            first_user=test_users[2],
+            second_duty=test_duties[1],
+            second_user=test_users[1],
+        ),
+        SwapPeopleRequest.objects.create(
+            duty=past_duty, current_user=test_users[0], to_swap=test_users[3]
+        ),
+    ]
+    fresh = [
+        SwapDutiesRequest.objects.create(
+            first_duty=test_duties[2],
+            first_user=test_users[2],
+            second_duty=test_duties[3],
+            second_user=test_users[3],
+        ),
+        SwapPeopleRequest.objects.create(
+            duty=test_duties[3], current_user=test_users[3], to_swap=test_users[4]
+        ),
+    ]
+
+    with django_assert_num_queries(2):
+        expired = expire_stale_swap_requests(today)
+
+    assert expired == {"swap_duties": 2, "swap_people": 1}
+    for request in stale:
+        request.refresh_from_db()
+        assert request.status == SWAP_REQUEST_CANCELED
+    for request in fresh:
+        request.refresh_from_db()
+        assert request.status == SWAP_REQUEST_PENDING
+    assert expire_stale_swap_requests(today) == {"swap_duties": 0, "swap_people": 0}
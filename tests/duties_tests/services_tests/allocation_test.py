@@ -0,0 +1,89 @@
+from collections import Counter
+from datetime import date, timedelta
+from time import perf_counter
+
+from core.apps.duties.services import (
+    DistinctRoomsConstraint,
+    DutyCandidate,
+    HeapDutyAllocator,
+    MinimumGapConstraint,
+    NoBackToBackConstraint,
+)
+
+
+def test_allocate_rebalances_by_duties_count():
+    """Тестирует, что проживающий с большим количеством дежурств назначается только после выравнивания"""
+    candidates = [DutyCandidate(pk=i) for i in range(4)]
+    candidates.append(DutyCandidate(pk=100, duties_count=3))
+    start = date.today()
+    demand = {start + timedelta(days=i): 2 for i in range(6)}
+
+    schedule = HeapDutyAllocator().allocate(candidates, demand)
+
+    counts = Counter(pk for people in schedule.values() for pk in people)
+    assert counts[100] == 0
+    assert set(counts.values()) == {3}
+
+
+def test_allocate_no_back_to_back():
+    """Тестирует, что проживающий не дежурит два дня подряд, в том числе на стыке с прошлым графиком"""
+    start = date.today()
+    candidates = [DutyCandidate(pk=i) for i in range(4)]
+    candidates[0].duty_dates.add(start - timedelta(days=1))
+    demand = {start + timedelta(days=i): 2 for i in range(10)}
+
+    schedule = HeapDutyAllocator(constraints=(NoBackToBackConstraint(),)).allocate(
+        candidates, demand
+    )
+
+    assert 0 not in schedule[start]
+    for day, people in schedule.items():
+        assert len(people) == 2
+        assert not set(people) & set(schedule.get(day + timedelta(days=1), ()))
+
+
+def test_allocate_distinct_rooms():
+    """Тестирует, что в один день не дежурят двое из одной комнаты"""
+    candidates = [DutyCandidate(pk=i, room_id=i // 2) for i in range(6)]
+    start = date.today()
+    demand = {start + timedelta(days=i): 3 for i in range(6)}
+
+    schedule = HeapDutyAllocator(constraints=(DistinctRoomsConstraint(),)).allocate(
+        candidates, demand
+    )
+
+    for people in schedule.values():
+        assert len({pk // 2 for pk in people}) == len(people) == 3
+
+
+def test_allocate_strict_leaves_day_understaffed():
+    """Тестирует, что в строгом режиме ограничения не нарушаются даже при нехватке людей"""
+    candidates = [DutyCandidate(pk=i) for i in range(2)]
+    start = date.today()
+    demand = {start: 2, start + timedelta(days=1): 2}
+
+    strict = HeapDutyAllocator(constraints=(NoBackToBackConstraint(),), strict=True)
+    relaxed = HeapDutyAllocator(constraints=(NoBackToBackConstraint(),))
+
+    assert strict.allocate(candidates, demand)[start + timedelta(days=1)] == []
+    candidates = [DutyCandidate(pk=i) for i in range(2)]
+    assert len(relaxed.allocate(candidates, demand)[start + timedelta(days=1)]) == 2
+
+
+def test_allocate_year_for_thousands_of_residents():
+    """Тестирует, что распределение на год для 2000 проживающих занимает меньше секунды"""
+    candidates = [DutyCandidate(pk=i, room_id=i // 3) for i in range(2000)]
+    start = date.today()
+    demand = {start + timedelta(days=i): 8 for i in range(365)}
+    allocator = HeapDutyAllocator(
+        constraints=(MinimumGapConstraint(min_days=7), DistinctRoomsConstraint())
+    )
+
+    started_at = perf_counter()
+    schedule = allocator.allocate(candidates, demand)
+    elapsed = perf_counter() - started_at
+
+    assert elapsed < 1
+    assert sum(len(people) for people in schedule.values()) == 365 * 8
+    counts = Counter(pk for people in schedule.values() for pk in people)
+    assert max(counts.values()) - min(counts.values()) <= 1
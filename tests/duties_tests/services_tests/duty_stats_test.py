@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+
+from django.core.management import call_command
+import pytest
+
+from core.apps.common.services import get_academic_year
+from core.apps.duties.models import DutyStats, KitchenDuty, SwapDutiesRequest
+from core.apps.duties.services import (
+    DutyStatsService,
+    KitchenDutyService,
+    SwapDutiesService,
+    generate_duty_schedule,
+)
+
+
+def get_stats(user, day: date) -> DutyStats:
+    return DutyStats.objects.get(user=user, academic_year=get_academic_year(day))
+
+
+@pytest.mark.django_db
+def test_stats_updated_on_schedule_generation(
+    test_users_with_rooms, default_duties_config
+):
+    """Тестирует, что генерация графика увеличивает количество назначенных дежурств"""
+    start = date.today()
+    generate_duty_schedule(start, start + timedelta(days=9))
+
+    for user in test_users_with_rooms[0]:
+        assert get_stats(user, start).duties_count == user.kitchen_duties.count()
+
+
+@pytest.mark.django_db
+def test_stats_updated_on_finish(test_duty, test_user_for_duty):
+    """Тестирует, что завершение дежурства учитывается в статистике один раз"""
+    duty_service = KitchenDutyService(test_duty)
+    duty_service.finish()
+    duty_service.finish()
+
+    assert get_stats(test_user_for_duty, test_duty.date).finished_duties_count == 1
+
+
+@pytest.mark.django_db
+def test_stats_updated_on_swap_request_accept(test_duties, test_users):
+    """Тестирует, что обмен дежурствами переносит их в статистике"""
+    DutyStatsService.rebuild()
+    user1, user2 = test_users[:2]
+    duty1, duty2 = test_duties[:2]
+    swap_request = SwapDutiesRequest.objects.create(
+        first_duty=duty1, first_user=user1, second_duty=duty2, second_user=user2
+    )
+
+    SwapDutiesService(user2, swap_request).accept()
+
+    assert get_stats(user1, duty1.date).duties_count == 1
+    assert get_stats(user2, duty2.date).duties_count == 1
+
+    swap_rebuilt = {
+        (stats.user_id, stats.academic_year): stats.duties_count
+        for stats in DutyStats.objects.all()
+    }
+    DutyStatsService.rebuild()
+    assert swap_rebuilt == {
+        (stats.user_id, stats.academic_year): stats.duties_count
+        for stats in DutyStats.objects.all()
+    }
+
+
+@pytest.mark.django_db
+def test_rebuild_duty_stats_command(test_user_with_finished_duties, test_duties):
+    """Тестирует пересчет статистики с нуля командой управления"""
+    DutyStats.objects.all().delete()
+
+    call_command("rebuild_duty_stats")
+
+    duty_dates = test_user_with_finished_duties.kitchen_duties.values_list(
+        "date", flat=True
+    )
+    for academic_year in {get_academic_year(day) for day in duty_dates}:
+        stats = DutyStats.objects.get(
+            user=test_user_with_finished_duties, academic_year=academic_year
+        )
+        assert stats.duties_count == stats.finished_duties_count
+        assert stats.duties_count == (
+            KitchenDuty.objects.filter(
+                people=test_user_with_finished_duties,
+                date__in=[
+                    day for day in duty_dates if get_academic_year(day) == academic_year
+                ],
+            ).count()
+        )
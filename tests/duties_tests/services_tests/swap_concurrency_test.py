@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+from django.db import connection
+import pytest
+
+from core.apps.duties.exceptions import SwapRequestStatusException
+from core.apps.duties.models import SwapDutiesRequest, SwapPeopleRequest
+from core.apps.duties.services import SwapDutiesService, SwapPeopleService
+
+
+THREADS = 50
+
+
+def run_concurrently(action, count: int = THREADS) -> list[str]:
+    """
+    Выполнить :action одновременно в :count потоках, у каждого свое соединение.
+
+    :returns: "ok" или имя класса исключения для каждого потока.
+    """
+    barrier = Barrier(count)
+
+    def worker(index: int) -> str:
+        try:
+            barrier.wait()
+            action(index)
+            return "ok"
+        except SwapRequestStatusException as exception:
+            return type(exception).__name__
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        return list(executor.map(worker, range(count)))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_accept_swap_duties(test_duties, test_users):
+    """Тестирует, что из 50 одновременных принятий заявки на обмен проходит одно"""
+    user1, user2 = test_users[:2]
+    duty1, duty2 = user1.kitchen_duties.first(), user2.kitchen_duties.first()
+    swap_request = SwapDutiesRequest.objects.create(
+        first_duty=duty1, first_user=user1, second_duty=duty2, second_user=user2
+    )
+
+    def accept(index: int) -> None:
+        request = SwapDutiesService.get_by_id(id=swap_request.pk)
+        SwapDutiesService(user2, request).accept()
+
+    results = run_concurrently(accept)
+
+    assert results.count("ok") == 1
+    assert results.count("SwapRequestStatusException") == THREADS - 1
+    assert list(duty1.people.all()) == [user2]
+    assert list(duty2.people.all()) == [user1]
+    swap_request.refresh_from_db()
+    assert swap_request.accepted is True
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_accept_and_cancel_swap_people(test_duties, test_users):
+    """Тестирует, что принятие и отмена одной заявки на замену не проходят вместе"""
+    duty = test_duties[0]
+    current_user = duty.people.first()
+    target = test_users[-1]
+    swap_request = SwapPeopleRequest.objects.create(
+        duty=duty, current_user=current_user, to_swap=target
+    )
+
+    def accept_or_cancel(index: int) -> None:
+        request = SwapPeopleService.get_by_id(id=swap_request.pk)
+        if index % 2:
+            SwapPeopleService(target, request).accept()
+        else:
+            SwapPeopleService(current_user, request).cancel()
+
+    results = run_concurrently(accept_or_cancel)
+
+    assert results.count("ok") == 1
+    swap_request.refresh_from_db()
+    assert [swap_request.accepted, swap_request.canceled].count(True) == 1
+    if swap_request.accepted:
+        assert target in duty.people.all()
+        assert current_user not in duty.people.all()
+    else:
+        assert current_user in duty.people.all()
+        assert target not in duty.people.all()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_overlapping_batches(test_duties, test_users):
+    """
+    Тестирует, что пакеты, принимающие заявки по одним дежурствам в разном
+    порядке, не блокируют друг друга взаимно
+    """
+    first_duty, second_duty = test_duties[:2]
+    first_duty.people.add(test_users[2])
+    second_duty.people.add(test_users[3])
+    first_target, second_target = test_users[-2:]
+    first_batch = [
+        SwapPeopleRequest.objects.create(
+            duty=duty, current_user=duty.people.order_by("pk")[0], to_swap=first_target
+        ).pk
+        for duty in (first_duty, second_duty)
+    ]
+    second_batch = [
+        SwapPeopleRequest.objects.create(
+            duty=duty, current_user=duty.people.order_by("pk")[1], to_swap=second_target
+        ).pk
+        for duty in (second_duty, first_duty)
+    ]
+
+    def accept(index: int) -> None:
+        if index % 2:
+            results = SwapPeopleService.batch(first_target, first_batch, "accept")
+        else:
+            results = SwapPeopleService.batch(second_target, second_batch, "accept")
+        assert all(result.success for result in results)
+
+    assert run_concurrently(accept, count=2) == ["ok", "ok"]
+    assert set(first_duty.people.all()) == {first_target, second_target}
+    assert set(second_duty.people.all()) == {first_target, second_target}
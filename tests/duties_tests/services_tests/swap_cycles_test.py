@@ -0,0 +1,128 @@
+from random import Random
+from time import perf_counter
+
+import pytest
+
+from core.apps.duties.choices import SWAP_REQUEST_ACCEPTED, SWAP_REQUEST_PENDING
+from core.apps.duties.models import SwapDutiesRequest
+from core.apps.duties.services import (
+    SwapCycleService,
+    SwapEdge,
+    SwapHolding,
+    find_swap_cycles,
+)
+
+
+def ring(users: list[int], first_request_id: int = 0) -> list[SwapEdge]:
+    """Заявки, в которых каждый проживающий хочет дежурство следующего по кругу"""
+    holdings = [SwapHolding(user_id=user, duty_id=user) for user in users]
+    return [
+        SwapEdge(
+            request_id=first_request_id + i,
+            source=holding,
+            target=holdings[(i + 1) % len(holdings)],
+        )
+        for i, holding in enumerate(holdings)
+    ]
+
+
+def test_find_three_cycle():
+    """Тестирует, что находится цикл из трех заявок"""
+    edges = ring([1, 2, 3])
+
+    assert find_swap_cycles(edges) == [edges]
+
+
+def test_find_cycles_respects_max_length():
+    """Тестирует, что циклы длиннее max_length не исполняются"""
+    edges = ring([1, 2, 3, 4, 5])
+
+    assert find_swap_cycles(edges, max_length=4) == []
+    assert find_swap_cycles(edges, max_length=5) == [edges]
+
+
+def test_find_cycles_prefers_short_and_disjoint():
+    """Тестирует, что предпочитается короткий цикл, а проживающие не повторяются"""
+    long_cycle = ring([1, 2, 3])
+    short_cycle = [
+        SwapEdge(10, SwapHolding(1, 1), SwapHolding(2, 2)),
+        SwapEdge(11, SwapHolding(2, 2), SwapHolding(1, 1)),
+    ]
+
+    cycles = find_swap_cycles(long_cycle + short_cycle)
+
+    assert cycles == [[long_cycle[0], short_cycle[1]]]
+
+
+def test_find_cycles_skips_user_already_on_duty():
+    """Тестирует, что проживающий не получает дежурство, на котором уже стоит"""
+    edges = ring([1, 2, 3])
+
+    assert find_swap_cycles(edges, duty_people={2: {2, 1}}) == []
+
+
+def test_find_cycles_benchmark():
+    """Тестирует поиск циклов в синтетическом графе из 5000 заявок быстрее секунды"""
+    random = Random(42)
+    holdings = [SwapHolding(user_id=i, duty_id=i) for i in range(2000)]
+    edges = []
+    for request_id in range(5000):
+        source, target = random.sample(holdings, 2)
+        edges.append(SwapEdge(request_id, source, target))
+
+    started_at = perf_counter()
+    cycles = find_swap_cycles(edges, max_length=4)
+    elapsed = perf_counter() - started_at
+
+    assert elapsed < 1
+    assert cycles
+    users = [edge.source.user_id for cycle in cycles for edge in cycle]
+    assert len(users) == len(set(users))
+    for cycle in cycles:
+        assert 2 <= len(cycle) <= 4
+        for edge, following in zip(cycle, cycle[1:] + cycle[:1]):
+            assert edge.target == following.source
+
+
+def create_ring_requests(test_duties, size: int) -> list[SwapDutiesRequest]:
+    """Создает заявки, где дежурный каждого дежурства хочет дежурство следующего"""
+    duties = test_duties[:size]
+    people = [duty.people.first() for duty in duties]
+    return [
+        SwapDutiesRequest.objects.create(
+            first_duty=duties[i],
+            first_user=people[i],
+            second_duty=duties[(i + 1) % size],
+            second_user=people[(i + 1) % size],
+        )
+        for i in range(size)
+    ]
+
+
+@pytest.mark.django_db
+def test_match_executes_cycle(test_duties):
+    """Тестирует исполнение цикла обмена из трех заявок"""
+    people = [duty.people.first() for duty in test_duties[:3]]
+    requests = create_ring_requests(test_duties, size=3)
+
+    assert SwapCycleService.match() == 1
+
+    for i, duty in enumerate(test_duties[:3]):
+        assert list(duty.people.all()) == [people[(i - 1) % 3]]
+    for request in requests:
+        request.refresh_from_db()
+        assert request.status == SWAP_REQUEST_ACCEPTED
+
+
+@pytest.mark.django_db
+def test_match_skips_stale_cycle(test_duties, test_users):
+    """Тестирует, что цикл не исполняется частично, если дежурные сменились"""
+    requests = create_ring_requests(test_duties, size=3)
+    test_duties[1].people.set([test_users[-1]])
+
+    assert SwapCycleService.execute_cycle(SwapCycleService.get_pending_edges()) is False
+
+    assert test_duties[0].people.first() == requests[0].first_user
+    for request in requests:
+        request.refresh_from_db()
+        assert request.status == SWAP_REQUEST_PENDING
@@ -1,4 +1,5 @@
 import pytest
+from rest_framework.exceptions import NotFound
 
 from core.apps.duties.exceptions import DutySwapException, SwapRequestStatusException
 from core.apps.duties.models import SwapDutiesRequest
@@ -134,3 +135,47 @@ def test_swap_duties_cancel_success(test_duties, test_users):
     assert swap_request.accepted is False
     assert swap_request.declined is False
     assert swap_request.canceled is True
+
+
+@pytest.mark.django_db
+def test_swap_duties_creation_error_not_on_duty(test_duties, test_users):
+    """Ошибка создания заявки, если инициатор не стоит на своем дежурстве"""
+    user1, user2 = test_users[:2]
+
+    with pytest.raises(DutySwapException):
+        SwapDutiesService.create(
+            initiator_duty=test_duties[2],
+            initiator=user1,
+            target_duty=test_duties[1],
+            target=user2,
+        )
+
+
+@pytest.mark.django_db
+def test_swap_duties_creation_not_found(test_duties, test_users):
+    """Ошибка создания заявки на несуществующее дежурство"""
+    user1, user2 = test_users[:2]
+
+    with pytest.raises(NotFound):
+        SwapDutiesService.create(
+            initiator_duty=test_duties[0].pk,
+            initiator=user1,
+            target_duty=0,
+            target=user2.pk,
+        )
+
+
+@pytest.mark.django_db
+def test_swap_duties_duplicate_pending(test_duties, test_users):
+    """Тестирует, что повторная ожидающая заявка на обмен не создается"""
+    user1, user2 = test_users[:2]
+    kwargs = dict(
+        initiator_duty=test_duties[0],
+        initiator=user1,
+        target_duty=test_duties[1],
+        target=user2,
+    )
+    SwapDutiesService.create(**kwargs)
+
+    with pytest.raises(DutySwapException):
+        SwapDutiesService.create(**kwargs)
@@ -126,3 +126,36 @@ def test_swap_people_self(test_duties, test_users):
 
     assert user1 not in target_duty.people.all()
     assert user2 not in target_duty.people.all()
+
+
+@pytest.mark.django_db
+def test_swap_people_create_validates_in_one_query(
+    test_duties, test_users, django_assert_num_queries
+):
+    """Тестирует, что проверки при создании заявки выполняются одним запросом"""
+    target_duty = test_duties[0]
+    user1, user2 = test_users[:2]
+
+    # Запрос проверки, затем точка сохранения, вставка и ее освобождение
+    with django_assert_num_queries(4):
+        SwapPeopleService.create(
+            initiator=user1, target=user2.pk, initiator_duty=target_duty.pk
+        )
+
+
+@pytest.mark.django_db
+def test_swap_people_duplicate_pending(test_duties, test_users):
+    """Тестирует, что повторная ожидающая заявка не создается, а после отмены можно"""
+    target_duty = test_duties[0]
+    user1, user2 = test_users[:2]
+    swap_request = SwapPeopleService.create(
+        initiator=user1, target=user2, initiator_duty=target_duty
+    )
+
+    with pytest.raises(DutySwapException):
+        SwapPeopleService.create(
+            initiator=user1, target=user2, initiator_duty=target_duty
+        )
+
+    SwapPeopleService(user1, swap_request).cancel()
+    SwapPeopleService.create(initiator=user1, target=user2, initiator_duty=target_duty)
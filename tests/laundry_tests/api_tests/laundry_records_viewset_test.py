@@ -1,21 +1,31 @@
-from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST, HTTP_403_FORBIDDEN
+from datetime import date, time, timedelta
+
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_400_BAD_REQUEST,
+    HTTP_403_FORBIDDEN,
+    HTTP_404_NOT_FOUND,
+    HTTP_409_CONFLICT,
+)
 from django.urls import reverse
+from django.utils import timezone
 import pytest
 
-from core.apps.laundry.models import LaundryRecord
+from core.apps.laundry.models import LaundryRecord, LaundryWaitlistEntry
+from core.apps.laundry.services.utils import generate_laundry_records
 
 
 @pytest.mark.django_db
-def test_today_records_list_create_laundry_records(user_client):
+def test_today_records_list_read_only(user_client):
     """
-    Тестирует автоматическое создание записей при получении.
+    Тестирует, что получение записей на сегодня не создает новых записей.
     """
     url = reverse("laundry_records-today-records-list")
-    assert not LaundryRecord.objects.exists()
     response = user_client.get(url)
 
     assert response.status_code == HTTP_200_OK
-    assert len(response.json()) > 0
+    assert response.json() == []
+    assert not LaundryRecord.objects.exists()
 
 
 @pytest.mark.django_db
@@ -49,6 +59,34 @@ def test_get_records_list(user_client, test_laundry_records):
     assert len(response.json()) == len(test_laundry_records)
 
 
+@pytest.mark.django_db
+def test_get_records_list_date_range(user_client, test_laundry_records):
+    """
+    Тестирует фильтрацию всех записей по периоду.
+    """
+    today = date.today()
+    url = reverse("laundry_records-list")
+
+    response = user_client.get(url, {"date_from": today.isoformat()})
+    assert len(response.json()) == len(test_laundry_records) - 1
+
+    yesterday = (today - timedelta(days=1)).isoformat()
+    response = user_client.get(url, {"date_from": yesterday, "date_to": yesterday})
+    assert [record["pk"] for record in response.json()] == [test_laundry_records[0].pk]
+
+
+@pytest.mark.django_db
+def test_get_records_list_invalid_date(user_client):
+    """
+    Тестирует ошибку при дате не в формате ГГГГ-ММ-ДД.
+    """
+    url = reverse("laundry_records-list")
+    response = user_client.get(url, {"date_to": "18.10.2026"})
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert "date_to" in response.json()
+
+
 @pytest.mark.django_db
 def test_reserve_record_success(user_client, test_laundry_records):
     """
@@ -69,7 +107,7 @@ def test_reserve_record_success(user_client, test_laundry_records):
 def test_reserve_record_error(user_client, test_user, test_laundry_records):
     """
     Тестирует случай, когда пользователь пытается зарезервировать запис, которая уже занята.
-    Это вызывает ошибку с кодом :400:
+    Это вызывает ошибку с кодом :409:
     """
     record_to_test = test_laundry_records[3]
     record_to_test.owner = test_user
@@ -78,7 +116,7 @@ def test_reserve_record_error(user_client, test_user, test_laundry_records):
     url = reverse("laundry_records-take-record", args=(record_to_test.pk,))
     response = user_client.post(url)
 
-    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert response.status_code == HTTP_409_CONFLICT
     assert response.json()["detail"] == "Запись уже занята"
 
 
@@ -115,14 +153,14 @@ def test_free_record_success(user_client, user_for_client, test_laundry_records)
 def test_free_record_error_already_free(user_client, test_laundry_records):
     """
     Тестирует ошибку при попытке отмены резервирования.
-    В этом случае возвращает ответ со статусом :400:
+    В этом случае возвращает ответ со статусом :409:
     """
     record_to_test = test_laundry_records[3]
 
     url = reverse("laundry_records-free-record", args=(record_to_test.pk,))
     response = user_client.post(url)
 
-    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert response.status_code == HTTP_409_CONFLICT
     record_to_test.refresh_from_db()
     assert record_to_test.owner is None
 
@@ -142,3 +180,141 @@ def test_free_record_error_not_owned(user_client, test_user, test_laundry_record
     assert response.status_code == HTTP_403_FORBIDDEN
     record_to_test.refresh_from_db()
     assert record_to_test.owner == test_user
+
+
+@pytest.mark.django_db
+def test_today_records_list_ownership(
+    user_client, user_for_client, test_user, test_laundry_records
+):
+    """
+    Тестирует признаки is_owned и is_available в списке записей на сегодня.
+    """
+    test_laundry_records[1].owner = user_for_client
+    test_laundry_records[1].save()
+    test_laundry_records[2].owner = test_user
+    test_laundry_records[2].save()
+
+    url = reverse("laundry_records-today-records-list")
+    response = user_client.get(url)
+
+    flags = [(row["is_owned"], row["is_available"]) for row in response.json()]
+    assert flags[:3] == [(True, False), (False, False), (False, True)]
+
+
+@pytest.mark.django_db
+def test_today_records_list_single_query(
+    user_client, test_user, test_machines, django_assert_num_queries
+):
+    """
+    Тестирует, что список записей на сегодня загружается одним запросом
+    независимо от количества записей и их владельцев.
+    """
+    today = date.today()
+    generate_laundry_records(today, today)
+    LaundryRecord.objects.filter(time_start__hour__lt=12).update(owner=test_user)
+
+    url = reverse("laundry_records-today-records-list")
+    with django_assert_num_queries(1):
+        response = user_client.get(url)
+
+    assert response.status_code == HTTP_200_OK
+    assert len(response.json()) == LaundryRecord.objects.count()
+
+
+@pytest.mark.django_db
+def test_join_and_leave_waitlist(user_client, user_for_client, test_user):
+    """
+    Тестирует постановку в очередь на сегодня и выход из нее.
+    """
+    LaundryRecord.objects.create(
+        record_date=date.today(),
+        time_start=time(hour=8),
+        time_end=time(hour=9),
+        owner=test_user,
+    )
+
+    response = user_client.post(reverse("laundry_records-join-waitlist"))
+    assert response.status_code == HTTP_200_OK
+    assert response.json()["position"] == 1
+    assert LaundryWaitlistEntry.objects.filter(user=user_for_client).exists()
+
+    url = reverse("laundry_records-leave-waitlist")
+    response = user_client.post(url)
+    assert response.status_code == HTTP_200_OK
+    assert not LaundryWaitlistEntry.objects.exists()
+
+    response = user_client.post(url)
+    assert response.status_code == HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_join_waitlist_errors(user_client):
+    """
+    Тестирует ошибки постановки в очередь: есть свободные записи (409)
+    и прошедший день (400).
+    """
+    tomorrow = timezone.localdate() + timedelta(days=1)
+    LaundryRecord.objects.create(
+        record_date=tomorrow, time_start=time(hour=8), time_end=time(hour=9)
+    )
+    url = reverse("laundry_records-join-waitlist")
+
+    response = user_client.post(url, {"record_date": tomorrow.isoformat()})
+    assert response.status_code == HTTP_409_CONFLICT
+
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    response = user_client.post(url, {"record_date": yesterday})
+    assert response.status_code == HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_next_free_records(user_client, test_user, test_machines):
+    """
+    Тестирует ближайшие свободные записи с количеством и окном времени суток.
+    """
+    today = date.today()
+    generate_laundry_records(today, today + timedelta(days=7))
+    LaundryRecord.objects.filter(time_start__hour=20).update(owner=test_user)
+
+    url = reverse("laundry_records-next-free-records")
+    response = user_client.get(
+        url, {"count": 3, "time_from": "20:00", "time_to": "21:45"}
+    )
+
+    assert response.status_code == HTTP_200_OK
+    data = response.json()
+    assert len(data) == 3
+    assert all(record["time_start"] == "21:00:00" for record in data)
+    assert all(record["is_available"] for record in data)
+
+
+@pytest.mark.django_db
+def test_next_free_records_invalid_params(user_client):
+    """
+    Тестирует ошибки параметров ближайших свободных записей.
+    """
+    url = reverse("laundry_records-next-free-records")
+
+    assert user_client.get(url, {"count": 0}).status_code == HTTP_400_BAD_REQUEST
+    assert user_client.get(url, {"time_from": "9"}).status_code == HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_check_in(user_client, user_for_client):
+    """
+    Тестирует отметку прихода на свою запись.
+    """
+    record = LaundryRecord.objects.create(
+        record_date=timezone.localdate(),
+        time_start=time(hour=0),
+        time_end=time.max,
+        owner=user_for_client,
+    )
+
+    url = reverse("laundry_records-check-in", args=(record.pk,))
+    response = user_client.post(url)
+
+    assert response.status_code == HTTP_200_OK
+    record.refresh_from_db()
+    assert record.checked_in_at is not None
+    assert user_client.post(url).status_code == HTTP_409_CONFLICT
@@ -0,0 +1,47 @@
+from datetime import date, time, timedelta
+
+import pytest
+
+from core.apps.laundry.models import LaundryRecord, LaundryRecordArchive
+from core.apps.laundry.services import archive_past_laundry_records
+
+
+@pytest.mark.django_db
+def test_archive_past_laundry_records(test_user, test_laundry_records):
+    """
+    Тестирует перенос прошедших записей в архив пачками с сохранением владельца.
+    """
+    today = date.today()
+    old_records = LaundryRecord.objects.bulk_create(
+        LaundryRecord(
+            record_date=today - timedelta(days=100 + day),
+            time_start=time(hour=10),
+            time_end=time(hour=11),
+            owner=test_user if day == 0 else None,
+        )
+        for day in range(5)
+    )
+
+    archived_count = archive_past_laundry_records(
+        before=today - timedelta(days=90), batch_size=2
+    )
+
+    assert archived_count == len(old_records)
+    assert not LaundryRecord.objects.filter(pk__in=[r.pk for r in old_records]).exists()
+    assert LaundryRecord.objects.count() == len(test_laundry_records)
+    archived = LaundryRecordArchive.objects.order_by("-record_date")
+    assert [record.record_date for record in archived] == [
+        record.record_date for record in old_records
+    ]
+    assert archived[0].owner == test_user
+    assert archived[0].archived_at is not None
+
+
+@pytest.mark.django_db
+def test_archive_past_laundry_records_nothing_to_move(test_laundry_records):
+    """
+    Тестирует, что записи не старше границы остаются в основной таблице.
+    """
+    assert archive_past_laundry_records(before=date.today() - timedelta(days=1)) == 0
+    assert LaundryRecord.objects.count() == len(test_laundry_records)
+    assert not LaundryRecordArchive.objects.exists()
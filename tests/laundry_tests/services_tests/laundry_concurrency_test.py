@@ -0,0 +1,66 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time
+from threading import Barrier
+from time import perf_counter
+
+from django.db import connection
+import pytest
+
+from core.apps.laundry.exceptions import RecordConflictException
+from core.apps.laundry.models import LaundryRecord
+from core.apps.laundry.services import LaundryService
+from core.apps.users.models import CustomUser
+
+
+THREADS = 30
+SLOTS = 10
+TAKES = 600
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_take_record_benchmark():
+    """
+    Тестирует, что при сотнях одновременных попыток занять записи у каждой
+    записи ровно один владелец, а остальные попытки получают конфликт.
+    """
+    records = LaundryRecord.objects.bulk_create(
+        LaundryRecord(
+            record_date=date.today(),
+            time_start=time(hour=8 + i),
+            time_end=time(hour=9 + i),
+        )
+        for i in range(SLOTS)
+    )
+    users = CustomUser.objects.bulk_create(
+        CustomUser(username=f"laundry#{i}") for i in range(TAKES)
+    )
+    barrier = Barrier(THREADS)
+
+    def worker(index: int) -> list[tuple[int, int]]:
+        """Занимает записи по очереди, возвращает (id записи, id пользователя) побед"""
+        won = []
+        try:
+            barrier.wait()
+            for attempt in range(index, TAKES, THREADS):
+                record, user = records[attempt % SLOTS], users[attempt]
+                try:
+                    LaundryService(user, record).take_record()
+                except RecordConflictException:
+                    continue
+                won.append((record.pk, user.pk))
+            return won
+        finally:
+            connection.close()
+
+    started_at = perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        wins = [win for won in executor.map(worker, range(THREADS)) for win in won]
+    elapsed = perf_counter() - started_at
+
+    assert TAKES / elapsed > 100
+    assert Counter(record_id for record_id, _ in wins) == {
+        record.pk: 1 for record in records
+    }
+    owners = dict(LaundryRecord.objects.values_list("pk", "owner_id"))
+    assert owners == dict(wins)
@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time
+from random import Random
+from threading import Barrier
+
+from django.core.cache import cache
+from django.db import connection
+import pytest
+from rest_framework.exceptions import PermissionDenied
+
+from core.apps.laundry.exceptions import RecordConflictException
+from core.apps.laundry.models import LaundryRecord
+from core.apps.laundry.services import LaundryService
+from core.apps.users.models import CustomUser
+
+
+THREADS = 20
+
+
+@pytest.fixture(autouse=True)
+def cache_free_counts(settings) -> None:
+    """Счетчики кешируются, как при общем кеше в Redis"""
+    settings.LAUNDRY_CACHE_FREE_COUNTS = True
+
+
+@pytest.mark.django_db
+def test_free_records_count_cached(test_laundry_records, django_assert_num_queries):
+    """Тестирует, что счетчик читается из базы данных только при холодном кеше"""
+    with django_assert_num_queries(1):
+        assert LaundryService.get_today_records_count() == 12
+    with django_assert_num_queries(0):
+        assert LaundryService.get_today_records_count() == 12
+
+
+@pytest.mark.django_db
+def test_free_records_count_without_shared_cache(
+    settings, test_user, test_laundry_records, django_assert_num_queries
+):
+    """Тестирует, что без общего кеша счетчик каждый раз читается из базы данных"""
+    settings.LAUNDRY_CACHE_FREE_COUNTS = False
+    with django_assert_num_queries(1):
+        assert LaundryService.get_today_records_count() == 12
+
+    LaundryService(test_user, test_laundry_records[3]).take_record()
+    with django_assert_num_queries(1):
+        assert LaundryService.get_today_records_count() == 11
+
+
+@pytest.mark.django_db
+def test_free_records_count_adjusted(
+    test_user, test_laundry_records, django_capture_on_commit_callbacks
+):
+    """Тестирует, что запись и освобождение меняют счетчик без пересчета"""
+    record = test_laundry_records[3]
+    assert LaundryService.get_today_records_count() == 12
+
+    with django_capture_on_commit_callbacks(execute=True):
+        LaundryService(test_user, record).take_record()
+    assert LaundryService.get_today_records_count() == 11
+
+    with django_capture_on_commit_callbacks(execute=True):
+        LaundryService(test_user, record).free_record()
+    assert LaundryService.get_today_records_count() == 12
+
+
+@pytest.mark.django_db(transaction=True)
+def test_free_records_count_consistent_under_concurrency():
+    """
+    Тестирует, что после одновременных записей, освобождений и чтений
+    счетчик совпадает с количеством свободных записей в таблице.
+    Кеш в начале пуст, поэтому счетчик создается чтениями во время гонки.
+    """
+    today = date.today()
+    records = LaundryRecord.objects.bulk_create(
+        LaundryRecord(record_date=today, time_start=time(hour=h), time_end=time(hour=h))
+        for h in range(24)
+    )
+    users = CustomUser.objects.bulk_create(
+        CustomUser(username=f"counter#{i}") for i in range(THREADS)
+    )
+    barrier = Barrier(THREADS)
+
+    def worker(index: int) -> None:
+        random = Random(index)
+        try:
+            barrier.wait()
+            for _ in range(30):
+                record = random.choice(records)
+                service = LaundryService(users[index], record)
+                if random.random() < 0.2:
+                    LaundryService.get_free_records_count(today)
+                    continue
+                try:
+                    if random.random() < 0.6:
+                        service.take_record()
+                    else:
+                        service.free_record()
+                except (RecordConflictException, PermissionDenied):
+                    continue
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        list(executor.map(worker, range(THREADS)))
+
+    free = LaundryRecord.objects.filter(record_date=today, owner=None).count()
+    assert free < len(records)
+    assert LaundryService.get_free_records_count(today) == free
+
+
+@pytest.mark.django_db
+def test_free_records_count_recounted_after_missed_incr(
+    test_user, test_laundry_records, django_capture_on_commit_callbacks
+):
+    """
+    Тестирует, что промах изменения счетчика при холодном кеше не оставляет
+    устаревшее значение, сохраненное параллельным чтением.
+    """
+    today = date.today()
+    key = LaundryService._free_count_key(today)
+    version = LaundryService._get_free_count_version(today)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        LaundryService(test_user, test_laundry_records[3]).take_record()
+    # Параллельный запрос посчитал записи до фиксации и сохранил счетчик после нее
+    cache.add(key, 12, version=version)
+
+    assert LaundryService.get_today_records_count() == 11
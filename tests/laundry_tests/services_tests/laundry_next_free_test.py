@@ -0,0 +1,84 @@
+from datetime import date, datetime, time, timedelta
+
+from django.db import connection
+import pytest
+
+from core.apps.laundry.models import LaundryRecord, Machine
+from core.apps.laundry.services import LaundryService
+from core.apps.laundry.services.utils import generate_laundry_records
+
+
+@pytest.fixture
+def next_week_records(test_machines) -> date:
+    """Записи 4 машин на неделю со следующего понедельника"""
+    Machine.objects.exclude(pk__in=[machine.pk for machine in test_machines]).update(
+        is_active=False
+    )
+    monday = date.today() + timedelta(days=7 - date.today().weekday())
+    generate_laundry_records(monday, monday + timedelta(days=6))
+    return monday
+
+
+@pytest.mark.django_db
+def test_next_free_records_order(test_user, next_week_records):
+    """Тестирует, что возвращаются ближайшие свободные записи после текущего момента"""
+    monday = next_week_records
+    LaundryRecord.objects.filter(
+        record_date=monday, time_start__lt=time(hour=13)
+    ).update(owner=test_user)
+
+    records = list(
+        LaundryService.get_next_free_records(
+            datetime.combine(monday, time(hour=11, minute=30)), count=6
+        )
+    )
+
+    assert [(record.record_date, record.time_start) for record in records] == [
+        (monday, time(hour=13)),
+    ] * 4 + [(monday, time(hour=14))] * 2
+    assert all(record.owner_id is None for record in records)
+
+
+@pytest.mark.django_db
+def test_next_free_records_time_window(next_week_records):
+    """Тестирует окно времени суток: запись целиком внутри окна, дни переходят"""
+    monday = next_week_records
+
+    records = list(
+        LaundryService.get_next_free_records(
+            datetime.combine(monday, time(hour=20)),
+            count=8,
+            time_from=time(hour=9),
+            time_to=time(hour=10, minute=45),
+        )
+    )
+
+    assert [(record.record_date, record.time_start) for record in records] == [
+        (monday + timedelta(days=1), time(hour=9)),
+    ] * 4 + [(monday + timedelta(days=1), time(hour=10))] * 4
+
+
+@pytest.mark.django_db
+def test_next_free_records_uses_partial_index(test_user, next_week_records):
+    """
+    Тестирует, что поиск идет по частичному индексу свободных записей, когда
+    большая часть записей занята
+    """
+    LaundryRecord.objects.filter(
+        record_date__lt=next_week_records + timedelta(days=4)
+    ).update(owner=test_user)
+    queryset = LaundryService.get_next_free_records(
+        datetime.combine(next_week_records, time(hour=12)), time_from=time(hour=18)
+    )
+
+    with connection.cursor() as cursor:
+        # Статистика могла остаться от других тестов
+        cursor.execute(f"ANALYZE {LaundryRecord._meta.db_table}")
+        # На нескольких сотнях строк сортировка дешевле любого индекса,
+        # поэтому планировщик выбирает между индексами с нужным порядком
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_sort = off")
+    plan = queryset.explain()
+
+    assert "laundry_free_date_time_id_idx" in plan
+    assert "Sort" not in plan
@@ -0,0 +1,127 @@
+from datetime import date, datetime, time, timedelta
+
+from django.utils import timezone
+from rest_framework.exceptions import PermissionDenied
+import pytest
+
+from core.apps.laundry.exceptions import RecordConflictException, RecordStateException
+from core.apps.laundry.models import LaundryConfig, LaundryNoShow, LaundryRecord
+from core.apps.laundry.services import LaundryService, release_no_show_laundry_records
+
+
+def create_record(day: date, hour: int, owner=None, **fields) -> LaundryRecord:
+    return LaundryRecord.objects.create(
+        record_date=day,
+        time_start=time(hour=hour),
+        time_end=time(hour=hour, minute=45),
+        owner=owner,
+        **fields,
+    )
+
+
+@pytest.mark.django_db
+def test_release_no_show_records(test_users, django_assert_num_queries):
+    """
+    Тестирует, что записи без отметки после времени на отметку освобождаются
+    одним запросом, а неявки считаются по проживающим.
+    """
+    LaundryConfig.objects.create(no_show_grace_minutes=15)
+    day = date.today() + timedelta(days=1)
+    now = timezone.make_aware(datetime.combine(day, time(hour=12, minute=20)))
+    first, second, third = test_users[:3]
+    no_shows = [
+        create_record(day, 10, first),
+        create_record(day, 12, first),
+        create_record(day - timedelta(days=1), 21, second),
+    ]
+    kept = [
+        create_record(day, 11, third, checked_in_at=now),
+        create_record(day, 13, third),
+        create_record(day - timedelta(days=3), 10, third),
+        create_record(day, 9),
+    ]
+
+    with django_assert_num_queries(2):
+        counts = release_no_show_laundry_records(now=now)
+
+    assert counts == {first.pk: 2, second.pk: 1}
+    assert not LaundryRecord.objects.filter(
+        pk__in=[record.pk for record in no_shows], owner__isnull=False
+    ).exists()
+    for record in kept:
+        owner_id = record.owner_id
+        record.refresh_from_db()
+        assert record.owner_id == owner_id
+    assert LaundryNoShow.objects.filter(user=first).count() == 2
+    assert LaundryNoShow.objects.get(user=second).time_start == time(hour=21)
+
+
+@pytest.mark.django_db
+def test_release_no_show_counts_grace_from_late_booking(test_user):
+    """
+    Тестирует, что время на отметку для записи, занятой после ее начала,
+    считается от момента записи.
+    """
+    LaundryConfig.objects.create(no_show_grace_minutes=15)
+    day = date.today() + timedelta(days=1)
+    now = timezone.make_aware(datetime.combine(day, time(hour=10, minute=20)))
+    record = create_record(day, 10)
+    LaundryService(test_user, record).take_record()
+    assert LaundryRecord.objects.get(pk=record.pk).taken_at is not None
+    LaundryRecord.objects.filter(pk=record.pk).update(
+        taken_at=now - timedelta(minutes=5)
+    )
+
+    assert release_no_show_laundry_records(now=now) == {}
+    assert not LaundryNoShow.objects.exists()
+
+    later = now + timedelta(minutes=11)
+    assert release_no_show_laundry_records(now=later) == {test_user.pk: 1}
+    record.refresh_from_db()
+    assert record.owner is None
+    assert record.taken_at is None
+
+
+@pytest.mark.django_db
+def test_release_no_show_records_disabled(test_user):
+    """Тестирует, что без времени на отметку записи не освобождаются"""
+    LaundryConfig.objects.create(day_quota=2)
+    record = create_record(date.today() - timedelta(days=1), 10, test_user)
+
+    assert release_no_show_laundry_records(now=timezone.localtime()) == {}
+    record.refresh_from_db()
+    assert record.owner == test_user
+
+
+@pytest.mark.django_db
+def test_check_in(test_user, test_users):
+    """Тестирует отметку прихода владельцем записи"""
+    record = LaundryRecord.objects.create(
+        record_date=timezone.localdate(),
+        time_start=time(hour=0),
+        time_end=time.max,
+        owner=test_user,
+    )
+
+    with pytest.raises(PermissionDenied):
+        LaundryService(test_users[0], record).check_in()
+    LaundryService(test_user, record).check_in()
+    with pytest.raises(RecordConflictException):
+        LaundryService(test_user, record).check_in()
+
+    record.refresh_from_db()
+    assert record.checked_in_at is not None
+
+
+@pytest.mark.django_db
+def test_check_in_other_day(test_user):
+    """Тестирует, что отметиться заранее нельзя, а при освобождении отметка сбрасывается"""
+    record = create_record(timezone.localdate() + timedelta(days=1), 10, test_user)
+
+    with pytest.raises(RecordStateException):
+        LaundryService(test_user, record).check_in()
+
+    LaundryRecord.objects.filter(pk=record.pk).update(checked_in_at=timezone.now())
+    LaundryService(test_user, record).free_record()
+    record.refresh_from_db()
+    assert record.checked_in_at is None
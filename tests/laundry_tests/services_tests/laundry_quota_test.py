@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+from threading import Barrier
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from core.apps.laundry.exceptions import RecordConflictException, RecordQuotaException
+from core.apps.laundry.models import LaundryConfig, LaundryRecord
+from core.apps.laundry.services import LaundryService
+
+
+def create_records(day: date, count: int) -> list[LaundryRecord]:
+    return LaundryRecord.objects.bulk_create(
+        LaundryRecord(
+            record_date=day,
+            time_start=time(hour=8 + i),
+            time_end=time(hour=9 + i),
+        )
+        for i in range(count)
+    )
+
+
+@pytest.mark.django_db
+def test_take_record_day_quota(test_user):
+    """Тестирует, что сверх дневного лимита запись не занимается"""
+    LaundryConfig.objects.create(day_quota=1)
+    monday = date.today() + timedelta(days=7 - date.today().weekday())
+    first, second = create_records(monday, 2)
+    (other_day,) = create_records(monday + timedelta(days=1), 1)
+
+    LaundryService(test_user, first).take_record()
+    with pytest.raises(RecordQuotaException):
+        LaundryService(test_user, second).take_record()
+    LaundryService(test_user, other_day).take_record()
+
+    second.refresh_from_db()
+    assert second.owner is None
+
+
+@pytest.mark.django_db
+def test_take_record_week_quota(test_user):
+    """Тестирует недельный лимит: следующая неделя считается отдельно"""
+    LaundryConfig.objects.create(week_quota=2)
+    monday = date.today() + timedelta(days=7 - date.today().weekday())
+    records = [create_records(monday + timedelta(days=i), 1)[0] for i in (0, 6, 5, 7)]
+
+    LaundryService(test_user, records[0]).take_record()
+    LaundryService(test_user, records[1]).take_record()
+    with pytest.raises(RecordQuotaException):
+        LaundryService(test_user, records[2]).take_record()
+    LaundryService(test_user, records[3]).take_record()
+
+
+@pytest.mark.django_db
+def test_take_record_taken_is_conflict(test_user, test_users):
+    """Тестирует, что занятая запись дает конфликт, а не ошибку лимита"""
+    LaundryConfig.objects.create(day_quota=0)
+    (record,) = create_records(date.today(), 1)
+    record.owner = test_users[0]
+    record.save()
+
+    with pytest.raises(RecordConflictException):
+        LaundryService(test_user, record).take_record()
+
+
+@pytest.mark.django_db
+def test_take_record_without_quotas_skips_user_lock(test_user):
+    """Тестирует, что без лимитов запись занимается без блокировки пользователя"""
+    LaundryConfig.objects.create()
+    (record,) = create_records(date.today(), 1)
+    LaundryService.get_quotas()
+
+    with CaptureQueriesContext(connection) as context:
+        LaundryService(test_user, record).take_record()
+
+    sql = [query["sql"] for query in context.captured_queries]
+    assert not any("FOR UPDATE" in query for query in sql)
+    assert sum(query.startswith("UPDATE") for query in sql) == 1
+
+
+@pytest.mark.django_db
+def test_quotas_cache_reset_on_config_save(test_user):
+    """Тестирует, что изменение настроек сразу применяется к лимитам"""
+    config = LaundryConfig.objects.create()
+    first, second = create_records(date.today(), 2)
+    assert LaundryService.get_quotas() == (None, None)
+
+    config.day_quota = 1
+    config.save()
+    LaundryService(test_user, first).take_record()
+    with pytest.raises(RecordQuotaException):
+        LaundryService(test_user, second).take_record()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_take_record_respects_quota(test_user):
+    """Тестирует, что одновременные записи одного проживающего не превышают лимит"""
+    LaundryConfig.objects.create(day_quota=2)
+    records = create_records(date.today(), 12)
+    barrier = Barrier(len(records))
+
+    def take(record: LaundryRecord) -> bool:
+        try:
+            barrier.wait()
+            LaundryService(test_user, record).take_record()
+            return True
+        except RecordQuotaException:
+            return False
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=len(records)) as executor:
+        results = list(executor.map(take, records))
+
+    assert results.count(True) == 2
+    assert LaundryRecord.objects.filter(owner=test_user).count() == 2
@@ -0,0 +1,58 @@
+from datetime import date, time, timedelta
+
+import pytest
+
+from core.apps.laundry.models import LaundryRecord
+from core.apps.laundry.services import generate_laundry_records
+
+
+def next_monday() -> date:
+    today = date.today()
+    return today + timedelta(days=7 - today.weekday())
+
+
+@pytest.mark.django_db
+def test_generate_laundry_records(test_machines, django_assert_num_queries):
+    """Тестирует создание записей на неделю по шаблонам машин за два запроса"""
+    monday = next_monday()
+
+    with django_assert_num_queries(2):
+        generate_laundry_records(monday, monday + timedelta(days=6))
+
+    records = LaundryRecord.objects.filter(machine__in=test_machines)
+    assert records.count() == 4 * 5 * 14
+    assert records.filter(record_date=monday).count() == 4 * 14
+    assert not records.filter(record_date__gte=monday + timedelta(days=5)).exists()
+    assert records.filter(time_end=time(hour=21, minute=45)).count() == 4 * 5
+
+
+@pytest.mark.django_db
+def test_generate_laundry_records_idempotent(test_machines, test_user):
+    """Тестирует, что повторный запуск не создает дубликатов и не трогает занятые записи"""
+    monday = next_monday()
+    generate_laundry_records(monday, monday + timedelta(days=1))
+    taken = LaundryRecord.objects.get(
+        machine=test_machines[0], record_date=monday, time_start=time(hour=10)
+    )
+    taken.owner = test_user
+    taken.save()
+
+    generate_laundry_records(monday, monday + timedelta(days=2))
+
+    records = LaundryRecord.objects.filter(machine__in=test_machines)
+    assert records.count() == 4 * 3 * 14
+    taken.refresh_from_db()
+    assert taken.owner == test_user
+
+
+@pytest.mark.django_db
+def test_generate_laundry_records_skips_inactive_machines(test_machines):
+    """Тестирует, что для неиспользуемых машин записи не создаются"""
+    monday = next_monday()
+    test_machines[0].is_active = False
+    test_machines[0].save()
+
+    generate_laundry_records(monday, monday)
+
+    assert not LaundryRecord.objects.filter(machine=test_machines[0]).exists()
+    assert LaundryRecord.objects.filter(machine=test_machines[1]).count() == 14
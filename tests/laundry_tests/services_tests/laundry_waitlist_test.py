@@ -0,0 +1,243 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from threading import Barrier
+
+from django.db import connection
+from django.utils import timezone
+import pytest
+
+from core.apps.laundry.exceptions import WaitlistConflictException
+from core.apps.laundry.models import LaundryConfig, LaundryRecord, LaundryWaitlistEntry
+from core.apps.laundry.services import LaundryService, LaundryWaitlistService
+
+
+def tomorrow() -> date:
+    return timezone.localdate() + timedelta(days=1)
+
+
+def create_taken_records(owners: list) -> list[LaundryRecord]:
+    return LaundryRecord.objects.bulk_create(
+        LaundryRecord(
+            record_date=tomorrow(),
+            time_start=time(hour=8 + i),
+            time_end=time(hour=9 + i),
+            owner=owner,
+        )
+        for i, owner in enumerate(owners)
+    )
+
+
+@pytest.mark.django_db
+def test_join_waitlist_with_free_records(test_users):
+    """
+    Тестирует, что в очередь нельзя встать, пока есть свободные записи,
+    которые еще не начались, а прошедшие свободные записи не мешают.
+    """
+    create_taken_records([None, test_users[0], None])
+    now = timezone.make_aware(datetime.combine(tomorrow(), time(hour=9, minute=30)))
+
+    with pytest.raises(WaitlistConflictException):
+        LaundryWaitlistService.join(test_users[1], tomorrow(), now)
+
+    later = now.replace(hour=10, minute=30)
+    assert LaundryWaitlistService.join(test_users[1], tomorrow(), later) == 1
+
+
+@pytest.mark.django_db
+def test_join_waitlist_position(test_users):
+    """Тестирует места в очереди и повторную постановку"""
+    create_taken_records(test_users[:1])
+
+    assert (
+        LaundryWaitlistService.join(test_users[1], tomorrow(), timezone.localtime())
+        == 1
+    )
+    assert (
+        LaundryWaitlistService.join(test_users[2], tomorrow(), timezone.localtime())
+        == 2
+    )
+    with pytest.raises(WaitlistConflictException):
+        LaundryWaitlistService.join(test_users[1], tomorrow(), timezone.localtime())
+
+
+@pytest.mark.django_db
+def test_free_record_promotes_first_waiting(test_users, monkeypatch):
+    """Тестирует, что освобожденная запись сразу достается первому в очереди"""
+    events = []
+    monkeypatch.setattr(
+        "core.apps.laundry.services.laundry.publish_user_event",
+        lambda user_ids, event: events.append((user_ids, event)),
+    )
+    owner, first, second = test_users[:3]
+    (record,) = create_taken_records([owner])
+    LaundryWaitlistService.join(first, tomorrow(), timezone.localtime())
+    LaundryWaitlistService.join(second, tomorrow(), timezone.localtime())
+
+    LaundryService(owner, record).free_record()
+
+    record.refresh_from_db()
+    assert record.owner == first
+    assert list(LaundryWaitlistEntry.objects.values_list("user", flat=True)) == [
+        second.pk
+    ]
+    assert events == [
+        (
+            [first.pk],
+            {
+                "event": "promoted",
+                "type": "laundry_record",
+                "id": record.pk,
+                "record_date": tomorrow().isoformat(),
+            },
+        )
+    ]
+
+
+@pytest.mark.django_db
+def test_free_record_skips_waiting_over_quota(test_users):
+    """Тестирует, что проживающий с исчерпанным лимитом пропускается, но остается в очереди"""
+    LaundryConfig.objects.create(day_quota=1)
+    owner, over_quota, second = test_users[:3]
+    record, _ = create_taken_records([owner, over_quota])
+    LaundryWaitlistEntry.objects.create(user=over_quota, record_date=tomorrow())
+    LaundryWaitlistEntry.objects.create(user=second, record_date=tomorrow())
+
+    LaundryService(owner, record).free_record()
+
+    record.refresh_from_db()
+    assert record.owner == second
+    assert list(LaundryWaitlistEntry.objects.values_list("user", flat=True)) == [
+        over_quota.pk
+    ]
+
+
+@pytest.mark.django_db
+def test_take_record_leaves_waitlist(test_users):
+    """Тестирует, что занявший запись выходит из очереди на этот день"""
+    owner, waiting = test_users[:2]
+    record, free = create_taken_records([owner, None])
+    LaundryWaitlistEntry.objects.create(user=waiting, record_date=tomorrow())
+
+    LaundryService(waiting, free).take_record()
+    LaundryService(owner, record).free_record()
+
+    record.refresh_from_db()
+    assert record.owner is None
+    assert not LaundryWaitlistEntry.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_free_records_promote_each_waiting_once(test_users):
+    """Тестирует, что при одновременном освобождении каждый из очереди получает одну запись"""
+    owners, waiting = test_users[:5], test_users[5:10]
+    records = create_taken_records(owners)
+    LaundryWaitlistEntry.objects.bulk_create(
+        LaundryWaitlistEntry(user=user, record_date=tomorrow()) for user in waiting
+    )
+    barrier = Barrier(len(records))
+
+    def free(index: int) -> None:
+        try:
+            barrier.wait()
+            LaundryService(owners[index], records[index]).free_record()
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=len(records)) as executor:
+        list(executor.map(free, range(len(records))))
+
+    new_owners = LaundryRecord.objects.values_list("owner", flat=True)
+    assert sorted(new_owners) == sorted(user.pk for user in waiting)
+    assert not LaundryWaitlistEntry.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_free_and_take_by_waiting(test_users):
+    """
+    Тестирует, что освобождение записи с передачей проживающему из очереди
+    и его собственная запись на другую запись одновременно не блокируют
+    друг друга взаимно
+    """
+    LaundryConfig.objects.create(day_quota=5)
+    owner, waiting, next_waiting = test_users[:3]
+    for _ in range(10):
+        LaundryRecord.objects.all().delete()
+        LaundryWaitlistEntry.objects.all().delete()
+        record, other = create_taken_records([owner, None])
+        LaundryWaitlistEntry.objects.create(user=waiting, record_date=tomorrow())
+        LaundryWaitlistEntry.objects.create(user=next_waiting, record_date=tomorrow())
+        barrier = Barrier(2)
+
+        def act(index: int) -> None:
+            try:
+                barrier.wait()
+                if index:
+                    LaundryService(owner, record).free_record()
+                else:
+                    LaundryService(waiting, other).take_record()
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(act, range(2)))
+
+        record.refresh_from_db()
+        other.refresh_from_db()
+        assert other.owner == waiting
+        assert record.owner in (waiting, next_waiting)
+
+
+@pytest.mark.django_db
+def test_free_started_record_not_promoted(test_users):
+    """Тестирует, что уже начавшаяся запись не передается первому в очереди"""
+    owner, waiting = test_users[:2]
+    yesterday = timezone.localdate() - timedelta(days=1)
+    record = LaundryRecord.objects.create(
+        record_date=yesterday,
+        time_start=time(hour=8),
+        time_end=time(hour=9),
+        owner=owner,
+    )
+    LaundryWaitlistEntry.objects.create(user=waiting, record_date=yesterday)
+
+    LaundryService(owner, record).free_record()
+
+    record.refresh_from_db()
+    assert record.owner is None
+    assert LaundryWaitlistEntry.objects.filter(user=waiting).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_join_and_free(test_users):
+    """
+    Тестирует, что запись, освобожденная во время постановки в очередь,
+    не остается свободной при успешной постановке
+    """
+    owner, waiting = test_users[:2]
+    for _ in range(10):
+        LaundryRecord.objects.all().delete()
+        LaundryWaitlistEntry.objects.all().delete()
+        (record,) = create_taken_records([owner])
+        barrier = Barrier(2)
+
+        def act(index: int) -> bool:
+            try:
+                barrier.wait()
+                if index:
+                    LaundryService(owner, record).free_record()
+                    return True
+                try:
+                    LaundryWaitlistService.join(
+                        waiting, tomorrow(), timezone.localtime()
+                    )
+                except WaitlistConflictException:
+                    return False
+                return True
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            joined, _ = executor.map(act, range(2))
+
+        record.refresh_from_db()
+        assert record.owner == (waiting if joined else None)